@@ -2,26 +2,43 @@ import io
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_weather_response_formats import \
+    AllianderWeatherResponseFormats
 from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_weather_sources import \
     AllianderWeatherSources
 from alliander_predictive_maintenance.connection.circuit_weather_retriever.icircuit_weather_retriever import \
     ICircuitWeatherRetriever
+from alliander_predictive_maintenance.connection.readers.abstraction.dataframe_validator import DataFrameValidator
 from alliander_predictive_maintenance.constants import INVALID_ENUM_INPUT, HTTP_ERROR_COULD_NOT_GET_DATA
 from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
 from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
 
 
-class AllianderCircuitWeatherRetriever(ICircuitWeatherRetriever):
-    def __init__(self, alliander_weather_source: AllianderWeatherSources):
+class AllianderCircuitWeatherRetriever(ICircuitWeatherRetriever, DataFrameValidator):
+    RETRY_STATUS_CODES = [429, 500, 502, 503, 504]
+
+    def __init__(self, alliander_weather_source: AllianderWeatherSources,
+                 weather_api: str = r"https://weather.appx.cloud/api/v2",
+                 timeout: float = 60, max_retries: int = 3, backoff_factor: float = 0.5, pool_maxsize: int = 10,
+                 response_format: AllianderWeatherResponseFormats = AllianderWeatherResponseFormats.CSV):
         """
         Initialize the CircuitWeather class.
 
         Args:
             :param alliander_weather_source: either Climate Data Storage or KNMI weather data from the Alliander Weather API
+            :param weather_api: base URL of the Alliander Weather API
+            :param timeout: seconds to wait for the API to connect and to respond
+            :param max_retries: number of retries on connection errors and rate limit or server errors
+            :param backoff_factor: factor of the exponential backoff between retries, in seconds
+            :param pool_maxsize: number of connections kept alive for reuse
+            :param response_format: format of the weather data sent by the API
         """
         super().__init__()
-        self.__weather_api = r"https://weather.appx.cloud/api/v2"
+        self.__weather_api = weather_api
         if alliander_weather_source == AllianderWeatherSources.KNMI:
             self.__source_id = "knmi"
             self.__model_id = "daggegevens"
@@ -30,8 +47,17 @@ class AllianderCircuitWeatherRetriever(ICircuitWeatherRetriever):
             self.__model_id = "era5sl"
         else:
             raise ValueError(f"{INVALID_ENUM_INPUT}: {alliander_weather_source}")
+        if not isinstance(response_format, AllianderWeatherResponseFormats):
+            raise ValueError(f"{INVALID_ENUM_INPUT}: {response_format}")
 
         self.__weather_url = f"{self.__weather_api}/weather/sources/{self.__source_id}/models/{self.__model_id}"
+        self.__timeout = timeout
+        self.__response_format = response_format
+        self.__session = self.__create_session(max_retries, backoff_factor, pool_maxsize)
+
+    @property
+    def weather_source_name(self) -> str:
+        return f"{self.__source_id}_{self.__model_id}"
 
     def get_weather(self, circuit_coordinate: CircuitCoordinate, time_window: TimeWindow) -> pd.DataFrame:
         """ Get weather from the Alliander Weather API
@@ -40,18 +66,59 @@ class AllianderCircuitWeatherRetriever(ICircuitWeatherRetriever):
         :param time_window: Time window of data acquisition
         :return: pandas dataframe of weather
         """
-        params = {
+        with instrumentation.span("weather_request", weather_source=self.weather_source_name):
+            response = self.__session.get(self.__weather_url,
+                                          params=self._create_params(circuit_coordinate, time_window),
+                                          timeout=self.__timeout)
+        instrumentation.count("weather_bytes_fetched", len(response.content), weather_source=self.weather_source_name)
+        if response.status_code == 200:
+            return self._parse_weather(response.content)
+        else:
+            raise requests.HTTPError(f"{HTTP_ERROR_COULD_NOT_GET_DATA}: {response.status_code} {response.content}")
+
+    @property
+    def _weather_url(self) -> str:
+        return self.__weather_url
+
+    def _create_params(self, circuit_coordinate: CircuitCoordinate, time_window: TimeWindow) -> dict:
+        """ Create the query parameters of a weather request
+
+        :param circuit_coordinate: Rijksdriehoeks or Lat/Lon coordinates
+        :param time_window: Time window of data acquisition
+        :return: dict of query parameters
+        """
+        return {
             "begin": time_window.start_date,
             "end": time_window.end_date,
             "lat": circuit_coordinate.x,
             "lon": circuit_coordinate.y,
             "units": "human",
-            "response_format": "csv"
+            "response_format": self.__response_format.value
         }
-        response = requests.get(self.__weather_url, params=params)
-        if response.status_code == 200:
-            weather_data_frame = pd.read_csv(io.BytesIO(response.content))
-            weather_data_frame.time = pd.to_datetime(weather_data_frame.time)
-            return weather_data_frame
-        else:
-            raise requests.HTTPError(f"{HTTP_ERROR_COULD_NOT_GET_DATA}: {response.status_code} {response.content}")
+
+    def _parse_weather(self, content: bytes) -> pd.DataFrame:
+        """ Parse the weather data sent by the API
+
+        :param content: decompressed content of the response
+        :return: pandas dataframe of weather
+        """
+        if self.__response_format == AllianderWeatherResponseFormats.PARQUET:
+            return self._enforce_schema(pd.read_parquet(io.BytesIO(content)), self.SCHEMA)
+        return self._read_csv_with_schema(io.BytesIO(content), self.SCHEMA)
+
+    def __create_session(self, max_retries: int, backoff_factor: float, pool_maxsize: int) -> requests.Session:
+        """ Create a session that keeps connections alive, retries with backoff and accepts compressed responses
+
+        :param max_retries: number of retries on connection errors and rate limit or server errors
+        :param backoff_factor: factor of the exponential backoff between retries, in seconds
+        :param pool_maxsize: number of connections kept alive for reuse
+        :return: a requests session
+        """
+        retry = Retry(total=max_retries, backoff_factor=backoff_factor, status_forcelist=self.RETRY_STATUS_CODES,
+                      allowed_methods=["GET"], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        return session
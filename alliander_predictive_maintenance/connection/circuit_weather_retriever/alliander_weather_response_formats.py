@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class AllianderWeatherResponseFormats(Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
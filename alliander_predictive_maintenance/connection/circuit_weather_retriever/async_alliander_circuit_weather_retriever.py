@@ -0,0 +1,145 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Coroutine, Any
+
+import httpx
+import pandas as pd
+import requests
+
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_circuit_weather_retriever import \
+    AllianderCircuitWeatherRetriever
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_weather_response_formats import \
+    AllianderWeatherResponseFormats
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_weather_sources import \
+    AllianderWeatherSources
+from alliander_predictive_maintenance.constants import HTTP_ERROR_COULD_NOT_GET_DATA, \
+    COORDINATES_AND_TIME_WINDOWS_LENGTH
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
+
+
+class AsyncAllianderCircuitWeatherRetriever(AllianderCircuitWeatherRetriever):
+    """ A weather retriever that requests the weather of many circuits concurrently from the Alliander Weather API """
+
+    def __init__(self, alliander_weather_source: AllianderWeatherSources,
+                 weather_api: str = r"https://weather.appx.cloud/api/v2",
+                 timeout: float = 60, max_retries: int = 3, backoff_factor: float = 0.5, max_concurrency: int = 8,
+                 response_format: AllianderWeatherResponseFormats = AllianderWeatherResponseFormats.CSV):
+        """
+        Initialize the AsyncAllianderCircuitWeatherRetriever class.
+
+        Args:
+            :param alliander_weather_source: either Climate Data Storage or KNMI weather data from the Alliander Weather API
+            :param weather_api: base URL of the Alliander Weather API
+            :param timeout: seconds to wait for the API to connect and to respond
+            :param max_retries: number of retries on connection errors and rate limit or server errors
+            :param backoff_factor: factor of the exponential backoff between retries, in seconds
+            :param max_concurrency: maximum number of concurrent requests
+            :param response_format: format of the weather data sent by the API
+        """
+        super().__init__(alliander_weather_source, weather_api=weather_api, timeout=timeout, max_retries=max_retries,
+                         backoff_factor=backoff_factor, pool_maxsize=max_concurrency, response_format=response_format)
+        self.__timeout = timeout
+        self.__max_retries = max_retries
+        self.__backoff_factor = backoff_factor
+        self.__max_concurrency = max_concurrency
+
+    def get_weather(self, circuit_coordinate: CircuitCoordinate, time_window: TimeWindow) -> pd.DataFrame:
+        """ Get weather from the Alliander Weather API
+
+        :param circuit_coordinate: Rijksdriehoeks or Lat/Lon coordinates
+        :param time_window: Time window of data acquisition
+        :return: pandas dataframe of weather
+        """
+        return self.get_weather_many([circuit_coordinate], [time_window])[0]
+
+    def get_weather_many(self, circuit_coordinates: List[CircuitCoordinate],
+                         time_windows: List[TimeWindow]) -> List[pd.DataFrame]:
+        """ Get the weather of many circuits concurrently
+
+        :param circuit_coordinates: Rijksdriehoeks or Lat/Lon coordinates of the circuits
+        :param time_windows: Time windows of data acquisition, one for each coordinate
+        :return: list of pandas dataframes of weather, in the order of the coordinates
+        """
+        return self.__run(self.get_weather_many_async(circuit_coordinates, time_windows))
+
+    async def get_weather_many_async(self, circuit_coordinates: List[CircuitCoordinate],
+                                     time_windows: List[TimeWindow]) -> List[pd.DataFrame]:
+        """ Get the weather of many circuits concurrently, with at most max_concurrency requests at once
+
+        :param circuit_coordinates: Rijksdriehoeks or Lat/Lon coordinates of the circuits
+        :param time_windows: Time windows of data acquisition, one for each coordinate
+        :return: list of pandas dataframes of weather, in the order of the coordinates
+        """
+        if len(circuit_coordinates) != len(time_windows):
+            raise ValueError(COORDINATES_AND_TIME_WINDOWS_LENGTH.format(coordinates=len(circuit_coordinates),
+                                                                        time_windows=len(time_windows)))
+        semaphore = asyncio.Semaphore(self.__max_concurrency)
+        limits = httpx.Limits(max_connections=self.__max_concurrency,
+                              max_keepalive_connections=self.__max_concurrency)
+        async with httpx.AsyncClient(timeout=self.__timeout, limits=limits) as client:
+            return await asyncio.gather(*[self.__get_weather_async(client, semaphore, circuit_coordinate, time_window)
+                                          for circuit_coordinate, time_window in zip(circuit_coordinates,
+                                                                                     time_windows)])
+
+    @staticmethod
+    def get_weather_many_for_retrievers(weather_retrievers: List["AsyncAllianderCircuitWeatherRetriever"],
+                                        circuit_coordinates: List[CircuitCoordinate],
+                                        time_windows: List[TimeWindow]) -> List[List[pd.DataFrame]]:
+        """ Get the weather of many circuits from several weather sources, all concurrently
+
+        :param weather_retrievers: retrievers of the weather sources, for instance KNMI and CDS
+        :param circuit_coordinates: Rijksdriehoeks or Lat/Lon coordinates of the circuits
+        :param time_windows: Time windows of data acquisition, one for each coordinate
+        :return: for each retriever a list of pandas dataframes of weather, in the order of the coordinates
+        """
+        async def gather_weather():
+            return await asyncio.gather(*[weather_retriever.get_weather_many_async(circuit_coordinates, time_windows)
+                                          for weather_retriever in weather_retrievers])
+        return AsyncAllianderCircuitWeatherRetriever.__run(gather_weather())
+
+    async def __get_weather_async(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                                  circuit_coordinate: CircuitCoordinate, time_window: TimeWindow) -> pd.DataFrame:
+        """ Get weather from the Alliander Weather API, retrying with backoff on connection errors and rate limit or
+        server errors
+
+        :param client: HTTP client with a connection pool
+        :param semaphore: semaphore limiting the number of concurrent requests
+        :param circuit_coordinate: Rijksdriehoeks or Lat/Lon coordinates
+        :param time_window: Time window of data acquisition
+        :return: pandas dataframe of weather
+        """
+        params = {key: str(value) for key, value in self._create_params(circuit_coordinate, time_window).items()}
+        for attempt in range(self.__max_retries + 1):
+            is_last_attempt = attempt == self.__max_retries
+            try:
+                async with semaphore:
+                    with instrumentation.span("weather_request", weather_source=self.weather_source_name):
+                        response = await client.get(self._weather_url, params=params)
+            except httpx.TransportError:
+                if is_last_attempt:
+                    raise
+            else:
+                instrumentation.count("weather_bytes_fetched", len(response.content),
+                                      weather_source=self.weather_source_name)
+                if response.status_code == 200:
+                    return self._parse_weather(response.content)
+                if response.status_code not in self.RETRY_STATUS_CODES or is_last_attempt:
+                    raise requests.HTTPError(
+                        f"{HTTP_ERROR_COULD_NOT_GET_DATA}: {response.status_code} {response.content}")
+            await asyncio.sleep(self.__backoff_factor * 2 ** attempt)
+
+    @staticmethod
+    def __run(coroutine: Coroutine) -> Any:
+        """ Run a coroutine to completion, also when it is called from a running event loop such as in Jupyter
+
+        :param coroutine: the coroutine to run
+        :return: the result of the coroutine
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coroutine)
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coroutine).result()
@@ -0,0 +1,163 @@
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import List, Optional, Set, Tuple
+
+import pandas as pd
+
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.icircuit_weather_retriever import \
+    ICircuitWeatherRetriever
+from alliander_predictive_maintenance.constants import INVALID_PATH
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
+
+
+class CachedCircuitWeatherRetriever(ICircuitWeatherRetriever):
+    """ A weather retriever that caches the weather of another weather retriever on local disk.
+    The cache is keyed by weather source, coordinate and day. Only the days that are not cached yet are retrieved,
+    the weather is stored in Parquet files. """
+    WEATHER_FILE = "weather.parquet"
+    CACHED_DAYS_FILE = "cached_days.json"
+
+    def __init__(self, weather_retriever: ICircuitWeatherRetriever, circuit_weather_absolute_folder: Path,
+                 max_cached_entries: Optional[int] = None):
+        """
+        Initialize the CachedCircuitWeatherRetriever class.
+
+        :param weather_retriever: weather retriever to cache the weather of
+        :param circuit_weather_absolute_folder: folder of the cache
+        :param max_cached_entries: maximum number of source and coordinate combinations in the cache. The least
+            recently used entries are evicted first. If None, nothing is evicted.
+        """
+        super().__init__()
+        if not circuit_weather_absolute_folder.is_dir():
+            raise ValueError(INVALID_PATH.format(path=circuit_weather_absolute_folder))
+        self.__weather_retriever = weather_retriever
+        self.__circuit_weather_absolute_folder = circuit_weather_absolute_folder
+        self.__max_cached_entries = max_cached_entries
+        self.__lock = threading.Lock()
+
+    @property
+    def weather_source_name(self) -> str:
+        return self.__weather_retriever.weather_source_name
+
+    def get_weather(self, circuit_coordinate: CircuitCoordinate, time_window: TimeWindow) -> pd.DataFrame:
+        """ Get weather from the cache, only the days that are not cached yet are retrieved.
+        The weather of all days in the time window is returned.
+
+        :param circuit_coordinate: Rijksdriehoeks or Lat/Lon coordinates
+        :param time_window: Time window of data acquisition
+        :return: pandas dataframe of weather
+        """
+        entry_folder = self.__get_entry_folder(circuit_coordinate)
+        days = pd.date_range(self.__day_of(time_window.start_date), self.__day_of(time_window.end_date), freq="D")
+        with self.__lock:
+            weather, cached_days = self.__load_entry(entry_folder)
+        missing_days = [day for day in days if day not in cached_days]
+        instrumentation.count("cache_hits", len(days) - len(missing_days), cache="weather_days")
+        instrumentation.count("cache_misses", len(missing_days), cache="weather_days")
+
+        retrieved_weather = [weather]
+        for first_day, last_day in self.__group_consecutive_days(missing_days):
+            day_weather = self.__weather_retriever.get_weather(
+                circuit_coordinate, TimeWindow(first_day, last_day + pd.Timedelta(days=1)))
+            retrieved_weather.append(day_weather[self.__days_of(day_weather).isin(
+                pd.date_range(first_day, last_day, freq="D"))])
+
+        with self.__lock:
+            if len(missing_days) > 0:
+                weather, cached_days = self.__load_entry(entry_folder)
+                weather = pd.concat([frame for frame in retrieved_weather[1:] + [weather] if len(frame) > 0] or
+                                    retrieved_weather[1:], ignore_index=True)
+                weather = weather.drop_duplicates(subset=self.TIME_COLUMN).sort_values(self.TIME_COLUMN,
+                                                                                         ignore_index=True)
+                self.__save_entry(entry_folder, weather, cached_days.union(missing_days))
+                self.__evict()
+            else:
+                # mark the entry as recently used
+                os.utime(entry_folder / self.CACHED_DAYS_FILE)
+        return weather[self.__days_of(weather).isin(days)].reset_index(drop=True)
+
+    def __get_entry_folder(self, circuit_coordinate: CircuitCoordinate) -> Path:
+        """ Get the folder of a cache entry
+
+        :param circuit_coordinate: Rijksdriehoeks or Lat/Lon coordinates
+        :return: the folder of the cache entry
+        """
+        return (self.__circuit_weather_absolute_folder / self.weather_source_name /
+                f"{circuit_coordinate.x}_{circuit_coordinate.y}")
+
+    def __load_entry(self, entry_folder: Path) -> Tuple[pd.DataFrame, Set[pd.Timestamp]]:
+        """ Load the cached weather and the cached days of a cache entry
+
+        :param entry_folder: the folder of the cache entry
+        :return: the cached weather and the set of cached days
+        """
+        if not (entry_folder / self.CACHED_DAYS_FILE).is_file():
+            return pd.DataFrame(columns=[self.TIME_COLUMN]), set()
+        with open(entry_folder / self.CACHED_DAYS_FILE) as file:
+            cached_days = {pd.Timestamp(day) for day in json.load(file)}
+        return pd.read_parquet(entry_folder / self.WEATHER_FILE), cached_days
+
+    def __save_entry(self, entry_folder: Path, weather: pd.DataFrame, cached_days: Set[pd.Timestamp]) -> None:
+        """ Save the weather and the cached days of a cache entry
+
+        :param entry_folder: the folder of the cache entry
+        :param weather: the weather to cache
+        :param cached_days: the days the weather is cached for
+        """
+        entry_folder.mkdir(parents=True, exist_ok=True)
+        weather.to_parquet(entry_folder / self.WEATHER_FILE, index=False)
+        # the cached days are written last, so an interrupted write does not mark days as cached
+        with open(entry_folder / self.CACHED_DAYS_FILE, "w") as file:
+            json.dump(sorted(day.strftime("%Y-%m-%d") for day in cached_days), file)
+
+    def __evict(self) -> None:
+        """ Remove the least recently used cache entries if there are more than the maximum number of entries """
+        if self.__max_cached_entries is None:
+            return
+        cached_days_files = sorted(self.__circuit_weather_absolute_folder.glob(f"*/*/{self.CACHED_DAYS_FILE}"),
+                                   key=lambda path: path.stat().st_mtime)
+        for cached_days_file in cached_days_files[:max(0, len(cached_days_files) - self.__max_cached_entries)]:
+            shutil.rmtree(cached_days_file.parent, ignore_errors=True)
+
+    @staticmethod
+    def __day_of(timestamp: pd.Timestamp) -> pd.Timestamp:
+        """ Get the day of a timestamp, like the days of the weather rows: timezone-aware timestamps are converted to
+        UTC without a timezone, like the cached days
+
+        :param timestamp: a timestamp
+        :return: the day without a timezone
+        """
+        if timestamp.tz is not None:
+            timestamp = timestamp.tz_convert(None)
+        return timestamp.normalize()
+
+    def __days_of(self, weather: pd.DataFrame) -> pd.Series:
+        """ Get the day of every row of a weather dataframe
+
+        :param weather: weather dataframe with a time column
+        :return: series of days
+        """
+        times = pd.to_datetime(weather[self.TIME_COLUMN])
+        if times.dt.tz is not None:
+            times = times.dt.tz_convert(None)
+        return times.dt.normalize()
+
+    @staticmethod
+    def __group_consecutive_days(days: List[pd.Timestamp]) -> List[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """ Group sorted days into ranges of consecutive days
+
+        :param days: sorted days
+        :return: list of (first day, last day) tuples
+        """
+        day_ranges = []
+        for day in days:
+            if day_ranges and day - day_ranges[-1][1] == pd.Timedelta(days=1):
+                day_ranges[-1] = (day_ranges[-1][0], day)
+            else:
+                day_ranges.append((day, day))
+        return day_ranges
@@ -1,13 +1,21 @@
 import abc
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
+from alliander_predictive_maintenance.connection.readers.abstraction.data_frame_schema import DataFrameSchema
+from alliander_predictive_maintenance.constants import DATETIME_FORMAT
 from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
 from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
 
 
 class ICircuitWeatherRetriever(metaclass=abc.ABCMeta):
+    TIME_COLUMN = "time"
+    # the weather measurements are float32, the coordinates keep their precision
+    SCHEMA = DataFrameSchema(dtypes={"lat": np.float64, "lon": np.float64},
+                             datetime_formats={TIME_COLUMN: DATETIME_FORMAT}, float_dtype=np.float32)
+
     @classmethod
     def __subclasshook__(cls, subclass):
         return (hasattr(subclass, 'get_weather') and
@@ -17,6 +25,11 @@ class ICircuitWeatherRetriever(metaclass=abc.ABCMeta):
     def __init__(self):
         self._weather: Optional[pd.DataFrame] = None
 
+    @property
+    def weather_source_name(self) -> str:
+        """ Name of the weather source, used to tell apart cached weather of different sources """
+        return type(self).__name__
+
     @abc.abstractmethod
     def get_weather(self, circuit_coordinate: CircuitCoordinate, time_window: TimeWindow) -> pd.DataFrame:
         """ Get weather of the specified API
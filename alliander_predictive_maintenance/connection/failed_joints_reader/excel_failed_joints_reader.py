@@ -14,14 +14,10 @@ class ExcelFailedJointsReader(IFailedJointsReader, IExcelReader):
         self.__failed_joints_data_frame = None
 
     def load(self, absolute_data_file_path: Path) -> None:
-        data_frame = pd.read_excel(absolute_data_file_path,
-                                   parse_dates=[self.DATETIME_COLUMN],
-                                   dtype={self.LOCATION_FRACTIONAL_TIME_COLUMN: float,
-                                          self.LOCATION_COLUMN: float,
-                                          self.CIRCUIT_ID_COLUMN: int,
-                                          self.PRIORITY_COLUMN: float})
+        data_frame = pd.read_excel(absolute_data_file_path, dtype=self.SCHEMA.dtypes)
         if not self._data_frame_has_valid_structure(data_frame, self.MANDATORY_COLUMNS):
             raise TypeError(f"{COLUMNS_DO_NOT_MATCH_MANDATORY} {self.MANDATORY_COLUMNS}")
+        data_frame = self._enforce_schema(data_frame, self.SCHEMA)
         data_frame.dropna(subset=self.DATETIME_COLUMN, inplace=True)
         data_frame = data_frame[data_frame[self.LOCATION_COLUMN] > 0]
         self.__failed_joints_data_frame = data_frame.set_index(self.DATETIME_COLUMN)
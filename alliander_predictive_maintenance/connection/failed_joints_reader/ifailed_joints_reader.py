@@ -1,7 +1,11 @@
 import abc
 
+import numpy as np
 import pandas as pd
 
+from alliander_predictive_maintenance.connection.readers.abstraction.data_frame_schema import DataFrameSchema
+from alliander_predictive_maintenance.constants import DATETIME_FORMAT
+
 
 class IFailedJointsReader(metaclass=abc.ABCMeta):
     DATETIME_COLUMN = "Date/time (UTC)"
@@ -11,6 +15,9 @@ class IFailedJointsReader(metaclass=abc.ABCMeta):
     LOCATION_FRACTIONAL_TIME_COLUMN = "locationFt"
     MANDATORY_COLUMNS = [DATETIME_COLUMN, LOCATION_COLUMN, CIRCUIT_ID_COLUMN, PRIORITY_COLUMN,
                          LOCATION_FRACTIONAL_TIME_COLUMN]
+    SCHEMA = DataFrameSchema(dtypes={LOCATION_COLUMN: np.float32, CIRCUIT_ID_COLUMN: int, PRIORITY_COLUMN: float,
+                                     LOCATION_FRACTIONAL_TIME_COLUMN: float},
+                             datetime_formats={DATETIME_COLUMN: DATETIME_FORMAT})
 
     @classmethod
     def __subclasshook__(cls, subclass):
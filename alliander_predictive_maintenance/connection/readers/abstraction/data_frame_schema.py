@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+
+@dataclass(frozen=True)
+class DataFrameSchema:
+    """ The dtypes a reader enforces when it loads a dataframe. Columns that are missing are ignored.
+    dtypes: dtype per column, like float32 for measurements and category for repeated names.
+    datetime_formats: format per datetime column, parsed explicitly instead of inferred.
+    float_dtype: dtype of the float columns that are not in dtypes, or None to keep them. """
+    dtypes: Dict[str, Any] = field(default_factory=dict)
+    datetime_formats: Dict[str, str] = field(default_factory=dict)
+    float_dtype: Optional[Any] = None
@@ -2,6 +2,9 @@ import abc
 from typing import List
 
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_float_dtype
+
+from alliander_predictive_maintenance.connection.readers.abstraction.data_frame_schema import DataFrameSchema
 
 
 class DataFrameValidator(metaclass=abc.ABCMeta):
@@ -24,3 +27,51 @@ class DataFrameValidator(metaclass=abc.ABCMeta):
         :param circuit_id_column: the column of the dataframe to check the circuit id for
         """
         return circuit_id in data_frame[circuit_id_column].values
+
+    def _read_csv_with_schema(self, file_path_or_buffer, data_frame_schema: DataFrameSchema, **kwargs) -> pd.DataFrame:
+        """ Read a CSV file with the dtypes of a schema. The dtypes are applied while parsing, so no float64 or object
+        columns are created for them.
+
+        :param file_path_or_buffer: path or buffer of the CSV file
+        :param data_frame_schema: the schema to enforce
+        :param kwargs: other arguments of pd.read_csv
+        :return: the dataframe with the schema enforced
+        """
+        data_frame = pd.read_csv(file_path_or_buffer, dtype=data_frame_schema.dtypes, **kwargs)
+        return self._enforce_schema(data_frame, data_frame_schema)
+
+    def _enforce_schema(self, data_frame: pd.DataFrame, data_frame_schema: DataFrameSchema) -> pd.DataFrame:
+        """ Convert the columns of a dataframe to the dtypes of a schema, without modifying the dataframe
+
+        :param data_frame: dataframe to convert
+        :param data_frame_schema: the schema to enforce
+        :return: the converted dataframe, or the dataframe itself if it already has the dtypes
+        """
+        dtypes = {column: dtype for column, dtype in data_frame_schema.dtypes.items()
+                  if column in data_frame.columns and data_frame[column].dtype != dtype}
+        if data_frame_schema.float_dtype is not None:
+            dtypes.update({column: data_frame_schema.float_dtype for column in data_frame.columns
+                           if column not in data_frame_schema.dtypes and is_float_dtype(data_frame[column]) and
+                           data_frame[column].dtype != data_frame_schema.float_dtype})
+        datetime_columns = [column for column in data_frame_schema.datetime_formats
+                            if column in data_frame.columns and not is_datetime64_any_dtype(data_frame[column])]
+        if not dtypes and not datetime_columns:
+            return data_frame
+        data_frame = data_frame.astype(dtypes)
+        for column in datetime_columns:
+            data_frame[column] = self._parse_datetime(data_frame[column], data_frame_schema.datetime_formats[column])
+        return data_frame
+
+    @staticmethod
+    def _parse_datetime(values: pd.Series, datetime_format: str) -> pd.Series:
+        """ Parse datetimes with an explicit format, which is much faster than inferring the format of every value.
+        Values in another format are still parsed by inference.
+
+        :param values: the values to parse
+        :param datetime_format: the expected format, like `%Y-%m-%d %H:%M:%S`
+        :return: the datetimes
+        """
+        try:
+            return pd.to_datetime(values, format=datetime_format)
+        except (ValueError, TypeError):
+            return pd.to_datetime(values)
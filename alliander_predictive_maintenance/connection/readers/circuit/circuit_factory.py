@@ -1,12 +1,22 @@
-from typing import Dict
+import os
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
 
 import pandas as pd
 
 from alliander_predictive_maintenance.connection.readers.circuit.icircuit_config_reader import ICircuitConfigReader
 from alliander_predictive_maintenance.connection.readers.circuit.icircuit_coordinates_reader import ICircuitCoordinatesReader
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_cube_reader import \
+    ICircuitPartialDischargeCubeReader
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_location_index_reader import \
+    ICircuitPartialDischargeLocationIndexReader
 from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_reader import ICircuitPartialDischargeReader
 from alliander_predictive_maintenance.connection.circuit_weather_retriever.icircuit_weather_retriever import ICircuitWeatherRetriever
 from alliander_predictive_maintenance.conversion.data_types.circuit import Circuit
+from alliander_predictive_maintenance.conversion.data_types.circuit_creation_result import CircuitCreationResult
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_cube import PartialDischargeCube
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_location_index import \
+    PartialDischargeLocationIndex
 from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
 from alliander_predictive_maintenance.constants import NOTIMPLEMENTEDERROR_AWS
 
@@ -19,13 +29,19 @@ class CircuitFactory:
                  cds_weather_retriever: ICircuitWeatherRetriever,
                  knmi_weather_retriever: ICircuitWeatherRetriever,
                  csv_partial_discharge_storage: ICircuitPartialDischargeReader,
-                 csv_circuit_config_reader: ICircuitConfigReader):
+                 csv_circuit_config_reader: ICircuitConfigReader,
+                 partial_discharge_cube_reader: Optional[ICircuitPartialDischargeCubeReader] = None):
+        """
+        :param partial_discharge_cube_reader: reader of the pre-aggregated partial discharge cubes of the circuits, or
+            None to create joints from the partial discharge events only
+        """
         self.__config = config
         self.__circuit_coordinates_reader = circuit_coordinates_reader
         self.__cds_weather_retriever = cds_weather_retriever
         self.__knmi_weather_retriever = knmi_weather_retriever
         self.__csv_partial_discharge_storage = csv_partial_discharge_storage
         self.__csv_circuit_config_reader = csv_circuit_config_reader
+        self.__partial_discharge_cube_reader = partial_discharge_cube_reader
         self._circuit_weather = None
 
     def create_circuit(self, circuit_id: int) -> Circuit:
@@ -34,12 +50,88 @@ class CircuitFactory:
         :param circuit_id: ID of the circuit
         :return: Circuit object
         """
+        return self.__create_circuit(circuit_id, lambda: self.__load_partial_discharge_data(str(circuit_id)))
+
+    def create_circuits(self, circuit_ids: Iterable[int], max_workers: Optional[int] = None,
+                        parse_in_processes: bool = True,
+                        max_pending_circuits: Optional[int] = None) -> Iterator[CircuitCreationResult]:
+        """ Create Circuit objects for many circuit IDs concurrently. The coordinates, config and weather are loaded
+        on a thread pool, while the partial discharge data is parsed on a process pool. The results are yielded as
+        soon as a circuit is finished, so not in the order of circuit_ids. A circuit that fails is reported in its
+        result and does not stop the other circuits. Circuits that are not started yet are cancelled when the
+        iteration is stopped.
+
+        :param circuit_ids: IDs of the circuits
+        :param max_workers: maximum number of circuits that are created at the same time
+        :param parse_in_processes: parse the partial discharge data on a process pool instead of the thread pool
+        :param max_pending_circuits: maximum number of circuits that are submitted but not yielded. This bounds the
+            memory use and the work that is done after the iteration is stopped. Defaults to twice the number of
+            threads.
+        :return: an iterator of a CircuitCreationResult per circuit
+        """
+        max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        max_pending_circuits = max_pending_circuits or 2 * max_workers
+        circuit_ids = iter(circuit_ids)
+        process_pool = ProcessPoolExecutor(max_workers=max_workers) if parse_in_processes else None
+        thread_pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            pending_futures: Dict[Future, int] = {}
+            while True:
+                for circuit_id in circuit_ids:
+                    future = thread_pool.submit(self.__create_circuit_in_batch, circuit_id, process_pool)
+                    pending_futures[future] = circuit_id
+                    if len(pending_futures) >= max_pending_circuits:
+                        break
+                if not pending_futures:
+                    return
+                done_futures, _ = wait(pending_futures, return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    circuit_id = pending_futures.pop(future)
+                    try:
+                        yield CircuitCreationResult(circuit_id=circuit_id, circuit=future.result())
+                    except Exception as error:
+                        yield CircuitCreationResult(circuit_id=circuit_id, error=error)
+        finally:
+            # the parsing is cancelled first, so threads that wait for a cancelled parse finish at once
+            if process_pool is not None:
+                process_pool.shutdown(cancel_futures=True)
+            thread_pool.shutdown(cancel_futures=True)
+
+    def __create_circuit_in_batch(self, circuit_id: int, process_pool: Optional[Executor]) -> Circuit:
+        """ Create a Circuit object while its partial discharge data is parsed on the process pool
+
+        :param circuit_id: ID of the circuit
+        :param process_pool: process pool to parse the partial discharge data on, or None to parse it in this thread
+        :return: Circuit object
+        """
+        if process_pool is None or isinstance(self.__csv_partial_discharge_storage,
+                                              ICircuitPartialDischargeLocationIndexReader):
+            # a location index is memory-mapped, so there is nothing to gain from loading it in another process
+            return self.create_circuit(circuit_id)
+        # submit the parsing first, so it overlaps with loading the coordinates and config
+        partial_discharge_future = process_pool.submit(
+            self.__csv_partial_discharge_storage.get_partial_discharge_data_for_circuit, str(circuit_id))
+        return self.__create_circuit(circuit_id, lambda: self.__wait_for_partial_discharge_data(partial_discharge_future))
+
+    def __create_circuit(self, circuit_id: int,
+                         load_partial_discharge_data: Callable[[], Union[pd.DataFrame, PartialDischargeLocationIndex]]
+                         ) -> Circuit:
+        """ Create a Circuit object from an circuit ID
+
+        :param circuit_id: ID of the circuit
+        :param load_partial_discharge_data: function that returns the partial discharge data of the circuit
+        :return: Circuit object
+        """
         circuit_coordinate = self.__circuit_coordinates_reader.get_circuit_coordinate(circuit_id)
         circuit_config = self.__load_circuit_config(str(circuit_id))
         circuit_length = circuit_config[ICircuitConfigReader.CUMULATIVE_LENGTH_COLUMN].max()
-        partial_discharge_data = self.__load_partial_discharge_data(str(circuit_id))
-        time_window = TimeWindow(partial_discharge_data[ICircuitPartialDischargeReader.DATETIME_COLUMN].min(),
-                                 partial_discharge_data[ICircuitPartialDischargeReader.DATETIME_COLUMN].max())
+        partial_discharge_data = load_partial_discharge_data()
+        if isinstance(partial_discharge_data, PartialDischargeLocationIndex):
+            time_window = TimeWindow(pd.Timestamp(partial_discharge_data.datetimes.min()),
+                                     pd.Timestamp(partial_discharge_data.datetimes.max()))
+        else:
+            time_window = TimeWindow(partial_discharge_data[ICircuitPartialDischargeReader.DATETIME_COLUMN].min(),
+                                     partial_discharge_data[ICircuitPartialDischargeReader.DATETIME_COLUMN].max())
         circuit_knmi_weather = self.__knmi_weather_retriever.get_weather(circuit_coordinate, time_window)
         circuit_cds_weather = self.__cds_weather_retriever.get_weather(circuit_coordinate, time_window)
         return Circuit(circuit_id=circuit_id,
@@ -48,21 +140,52 @@ class CircuitFactory:
                        circuit_coordinate=circuit_coordinate,
                        partial_discharge=partial_discharge_data,
                        time_window=time_window,
-                       circuit_length=circuit_length)
+                       circuit_length=circuit_length,
+                       partial_discharge_cubes=self.__load_partial_discharge_cubes(str(circuit_id)))
 
-    def __load_partial_discharge_data(self, circuit_id: str) -> pd.DataFrame:
-        """ Load a partial discharge dataframe from CSV or S3
+    @staticmethod
+    def __wait_for_partial_discharge_data(partial_discharge_future: Future) -> pd.DataFrame:
+        """ Wait for partial discharge data that is parsed on the process pool
 
-        :param circuit_id: ID of the circuit
+        :param partial_discharge_future: future of the parsed partial discharge dataframe
         :return: dataframe of partial discharge
         """
         try:
-            partial_discharge_data = self.__csv_partial_discharge_storage.get_partial_discharge_data_for_circuit(
-                circuit_id)
+            return partial_discharge_future.result()
+        except FileNotFoundError:
+            raise NotImplementedError(NOTIMPLEMENTEDERROR_AWS.format(data="partial discharge"))
+
+    def __load_partial_discharge_data(self, circuit_id: str) -> Union[pd.DataFrame, PartialDischargeLocationIndex]:
+        """ Load a partial discharge dataframe from CSV or S3, or the location index if the storage provides one
+
+        :param circuit_id: ID of the circuit
+        :return: dataframe or location index of partial discharge
+        """
+        try:
+            if isinstance(self.__csv_partial_discharge_storage, ICircuitPartialDischargeLocationIndexReader):
+                partial_discharge_data = \
+                    self.__csv_partial_discharge_storage.get_partial_discharge_location_index_for_circuit(circuit_id)
+            else:
+                partial_discharge_data = self.__csv_partial_discharge_storage.get_partial_discharge_data_for_circuit(
+                    circuit_id)
         except FileNotFoundError:
             raise NotImplementedError(NOTIMPLEMENTEDERROR_AWS.format(data="partial discharge"))
         return partial_discharge_data
 
+    def __load_partial_discharge_cubes(self, circuit_id: str) -> List[PartialDischargeCube]:
+        """ Load the partial discharge cubes of a circuit, a circuit without cubes creates its joints from the
+        partial discharge events
+
+        :param circuit_id: ID of the circuit
+        :return: the partial discharge cubes, empty if there are none
+        """
+        if self.__partial_discharge_cube_reader is None:
+            return []
+        try:
+            return self.__partial_discharge_cube_reader.get_partial_discharge_cubes_for_circuit(circuit_id)
+        except FileNotFoundError:
+            return []
+
     def __load_circuit_config(self, circuit_id: str) -> pd.DataFrame:
         """ Load a circuit configuration from CSV or S3
 
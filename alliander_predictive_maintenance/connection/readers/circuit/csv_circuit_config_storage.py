@@ -30,7 +30,7 @@ class CsvCircuitConfigStorage(ICircuitConfigReader, DataFrameValidator):
         if not os.path.isfile(absolute_data_file_path):
             raise FileNotFoundError(CIRCUIT_CONFIG_FILE_NOT_FOUND.format(path=absolute_data_file_path))
 
-        data_frame = pd.read_csv(absolute_data_file_path)
+        data_frame = self._read_csv_with_schema(absolute_data_file_path, self.SCHEMA)
         if not self._data_frame_has_valid_structure(data_frame, self.MANDATORY_COLUMNS):
             raise TypeError(f"{COLUMNS_DO_NOT_MATCH_MANDATORY} {self.MANDATORY_COLUMNS}")
         return data_frame
@@ -1,36 +1,102 @@
 import os.path
 from pathlib import Path
+from typing import Optional, Iterator, Tuple
 
 import pandas as pd
 
 from alliander_predictive_maintenance.connection.readers.abstraction.dataframe_validator import DataFrameValidator
 from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_reader import ICircuitPartialDischargeReader
 from alliander_predictive_maintenance.constants import COLUMNS_DO_NOT_MATCH_MANDATORY, \
-    PARTIAL_DISCHARGE_DATA_FILE_NOT_FOUND, INVALID_PATH
+    PARTIAL_DISCHARGE_DATA_FILE_NOT_FOUND, INVALID_PATH, PARTIAL_DISCHARGE_CSV_CHUNK_SIZE
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
 
 
 class CsvCircuitPartialDischargeStorage(ICircuitPartialDischargeReader, DataFrameValidator):
     """
-    A class for loading partial discharge data from a csv file
+    A class for loading partial discharge data from a csv file. Charge and location are read as float32.
     """
-    def __init__(self, partial_discharge_data_absolute_root_folder: Path):
+
+    def __init__(self, partial_discharge_data_absolute_root_folder: Path, chunk_size: Optional[int] = None):
+        """
+        :param partial_discharge_data_absolute_root_folder: folder with a CSV file per circuit
+        :param chunk_size: number of rows to read at once. If None, files are read at once unless filters are given.
+        """
         if not partial_discharge_data_absolute_root_folder.is_dir():
             raise ValueError(INVALID_PATH.format(path=partial_discharge_data_absolute_root_folder))
         self.partial_discharge_data_absolute_root_folder = partial_discharge_data_absolute_root_folder
+        self.chunk_size = chunk_size
+
+    def get_partial_discharge_data_for_circuit(self, circuit_id: str, time_window: Optional[TimeWindow] = None,
+                                               location_range: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+        """Get the partial discharge data for the loaded circuit
+
+        :param circuit_id: the circuit id to load
+        :param time_window: only read the events within this time window
+        :param location_range: only read the events within this (minimum, maximum) location range
+        """
+        if self.chunk_size is None and time_window is None and location_range is None:
+            return self.__read_partial_discharge_csv_file(circuit_id)
+        chunks = list(self.get_partial_discharge_chunks_for_circuit(circuit_id, time_window, location_range))
+        if len(chunks) == 0:
+            return self.__empty_partial_discharge_data_frame()
+        return pd.concat(chunks, ignore_index=True)
+
+    def get_partial_discharge_chunks_for_circuit(self, circuit_id: str, time_window: Optional[TimeWindow] = None,
+                                                 location_range: Optional[Tuple[float, float]] = None) -> \
+            Iterator[pd.DataFrame]:
+        """Stream the partial discharge data of a circuit in compact chunks. Only the mandatory columns are read.
+        The memory use is bounded by the chunk size.
+
+        :param circuit_id: circuit id to get the partial discharge data for
+        :param time_window: only yield the events within this time window
+        :param location_range: only yield the events within this (minimum, maximum) location range
+        :return: an iterator of partial discharge dataframes
+        """
+        partial_discharge_data_file_path = self.__get_partial_discharge_csv_file_path(circuit_id)
+        header = pd.read_csv(partial_discharge_data_file_path, nrows=0)
+        if not self._data_frame_has_valid_structure(header, self.MANDATORY_COLUMNS):
+            raise TypeError(f"{COLUMNS_DO_NOT_MATCH_MANDATORY} {self.MANDATORY_COLUMNS}")
 
-    def get_partial_discharge_data_for_circuit(self, circuit_id: str) -> pd.DataFrame:
-        return self.__read_partial_discharge_csv_file(circuit_id)
+        with pd.read_csv(partial_discharge_data_file_path, usecols=self.MANDATORY_COLUMNS,
+                         dtype=self.SCHEMA.dtypes,
+                         chunksize=self.chunk_size or PARTIAL_DISCHARGE_CSV_CHUNK_SIZE) as reader:
+            for chunk in reader:
+                instrumentation.count("partial_discharge_rows_read", len(chunk), format="csv")
+                chunk = self._enforce_schema(chunk[self.MANDATORY_COLUMNS], self.SCHEMA)
+                if time_window is not None:
+                    chunk = chunk[chunk[self.DATETIME_COLUMN].between(time_window.start_date, time_window.end_date)]
+                if location_range is not None:
+                    chunk = chunk[chunk[self.LOCATION_COLUMN].between(*location_range)]
+                if len(chunk) > 0:
+                    yield chunk
 
     def __read_partial_discharge_csv_file(self, circuit_id: str) -> pd.DataFrame:
         """Read the Partial Discharge CSV file
 
+        :param circuit_id: circuit id to get the partial discharge data for
+        """
+        partial_discharge_data_file_path = self.__get_partial_discharge_csv_file_path(circuit_id)
+        with instrumentation.span("partial_discharge_csv_read"):
+            data_frame = self._read_csv_with_schema(partial_discharge_data_file_path, self.SCHEMA)
+        instrumentation.count("partial_discharge_rows_read", len(data_frame), format="csv")
+        if not self._data_frame_has_valid_structure(data_frame, self.MANDATORY_COLUMNS):
+            raise TypeError(f"{COLUMNS_DO_NOT_MATCH_MANDATORY} {self.MANDATORY_COLUMNS}")
+        return data_frame
+
+    def __get_partial_discharge_csv_file_path(self, circuit_id: str) -> Path:
+        """Get the path of the Partial Discharge CSV file
+
         :param circuit_id: circuit id to get the partial discharge data for
         """
         partial_discharge_data_file_path = self.partial_discharge_data_absolute_root_folder / f"{circuit_id}.csv"
         if not os.path.isfile(partial_discharge_data_file_path):
             raise FileNotFoundError(PARTIAL_DISCHARGE_DATA_FILE_NOT_FOUND.format(path=partial_discharge_data_file_path))
+        return partial_discharge_data_file_path
 
-        data_frame = pd.read_csv(partial_discharge_data_file_path, parse_dates=[self.DATETIME_COLUMN])
-        if not self._data_frame_has_valid_structure(data_frame, self.MANDATORY_COLUMNS):
-            raise TypeError(f"{COLUMNS_DO_NOT_MATCH_MANDATORY} {self.MANDATORY_COLUMNS}")
-        return data_frame
+    def __empty_partial_discharge_data_frame(self) -> pd.DataFrame:
+        """Create an empty partial discharge dataframe with the dtypes of the schema """
+        data_frame = pd.DataFrame({self.DATETIME_COLUMN: pd.Series(dtype="datetime64[ns]")})
+        for column, dtype in self.SCHEMA.dtypes.items():
+            data_frame[column] = pd.Series(dtype=dtype)
+        return data_frame[self.MANDATORY_COLUMNS]
@@ -2,6 +2,8 @@ import abc
 
 import pandas as pd
 
+from alliander_predictive_maintenance.connection.readers.abstraction.data_frame_schema import DataFrameSchema
+
 
 class ICircuitConfigReader(metaclass=abc.ABCMeta):
     COMPONENT_TYPE_COLUMN = "Component type"
@@ -12,6 +14,7 @@ class ICircuitConfigReader(metaclass=abc.ABCMeta):
     DISTANCE_TO_END_COLUMN = "Distance to end (m)"
     MANDATORY_COLUMNS = [COMPONENT_TYPE_COLUMN, LENGTH_COLUMN, DISTANCE_TO_START_COLUMN, DISTANCE_TO_END_COLUMN,
                          CUMULATIVE_LENGTH_COLUMN, COMPONENT_NAME_COLUMN]
+    SCHEMA = DataFrameSchema(dtypes={COMPONENT_TYPE_COLUMN: "category", COMPONENT_NAME_COLUMN: "category"})
 
     @classmethod
     def __subclasshook__(cls, subclass):
@@ -0,0 +1,20 @@
+import abc
+from typing import List
+
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_cube import PartialDischargeCube
+
+
+class ICircuitPartialDischargeCubeReader(metaclass=abc.ABCMeta):
+    @classmethod
+    def __subclasshook__(cls, subclass):
+        return (hasattr(subclass, 'get_partial_discharge_cubes_for_circuit') and
+                callable(subclass.get_partial_discharge_cubes_for_circuit) or
+                NotImplemented)
+
+    @abc.abstractmethod
+    def get_partial_discharge_cubes_for_circuit(self, circuit_id: str) -> List[PartialDischargeCube]:
+        """Get the pre-aggregated partial discharge cubes of a circuit
+
+        :param circuit_id: the circuit id to load
+        """
+        raise NotImplementedError
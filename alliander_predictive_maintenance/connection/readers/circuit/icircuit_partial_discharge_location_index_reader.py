@@ -0,0 +1,20 @@
+import abc
+
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_location_index import \
+    PartialDischargeLocationIndex
+
+
+class ICircuitPartialDischargeLocationIndexReader(metaclass=abc.ABCMeta):
+    @classmethod
+    def __subclasshook__(cls, subclass):
+        return (hasattr(subclass, 'get_partial_discharge_location_index_for_circuit') and
+                callable(subclass.get_partial_discharge_location_index_for_circuit) or
+                NotImplemented)
+
+    @abc.abstractmethod
+    def get_partial_discharge_location_index_for_circuit(self, circuit_id: str) -> PartialDischargeLocationIndex:
+        """Get the partial discharge events of a circuit sorted by location
+
+        :param circuit_id: the circuit id to load
+        """
+        raise NotImplementedError
@@ -1,13 +1,19 @@
 import abc
 
+import numpy as np
 import pandas as pd
 
+from alliander_predictive_maintenance.connection.readers.abstraction.data_frame_schema import DataFrameSchema
+from alliander_predictive_maintenance.constants import DATETIME_FORMAT
+
 
 class ICircuitPartialDischargeReader(metaclass=abc.ABCMeta):
     DATETIME_COLUMN = "Date/time (UTC)"
     PARTIAL_DISCHARGE_DATA_COLUMN = "Charge (picocoulomb)"
     LOCATION_COLUMN = "Location in meters (m)"
     MANDATORY_COLUMNS = [DATETIME_COLUMN, PARTIAL_DISCHARGE_DATA_COLUMN, LOCATION_COLUMN]
+    SCHEMA = DataFrameSchema(dtypes={PARTIAL_DISCHARGE_DATA_COLUMN: np.float32, LOCATION_COLUMN: np.float32},
+                             datetime_formats={DATETIME_COLUMN: DATETIME_FORMAT})
 
     @classmethod
     def __subclasshook__(cls, subclass):
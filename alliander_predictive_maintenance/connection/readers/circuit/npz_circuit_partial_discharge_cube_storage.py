@@ -0,0 +1,90 @@
+import os
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_cube_reader import \
+    ICircuitPartialDischargeCubeReader
+from alliander_predictive_maintenance.constants import INVALID_PATH, PARTIAL_DISCHARGE_CUBE_WITHOUT_SQUARED_SUMS, \
+    PARTIAL_DISCHARGE_CUBES_NOT_FOUND
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_cube import PartialDischargeCube
+
+
+class NpzCircuitPartialDischargeCubeStorage(ICircuitPartialDischargeCubeReader):
+    """
+    A class for storing the pre-aggregated partial discharge cubes of circuits, one folder per circuit with a .npz file
+    per time resolution.
+    """
+    FILE_SUFFIX = ".npz"
+
+    def __init__(self, partial_discharge_cubes_absolute_root_folder: Path):
+        if not partial_discharge_cubes_absolute_root_folder.is_dir():
+            raise ValueError(INVALID_PATH.format(path=partial_discharge_cubes_absolute_root_folder))
+        self.partial_discharge_cubes_absolute_root_folder = partial_discharge_cubes_absolute_root_folder
+
+    def get_partial_discharge_cubes_for_circuit(self, circuit_id: str) -> List[PartialDischargeCube]:
+        circuit_folder = self.__get_circuit_folder(circuit_id)
+        cube_paths = sorted(circuit_folder.glob(f"*{self.FILE_SUFFIX}")) if circuit_folder.is_dir() else []
+        if not cube_paths:
+            raise FileNotFoundError(PARTIAL_DISCHARGE_CUBES_NOT_FOUND.format(path=circuit_folder))
+        return [self.__load_cube(cube_path) for cube_path in cube_paths]
+
+    def write_partial_discharge_cubes_for_circuit(self, circuit_id: str,
+                                                  partial_discharge_cubes: List[PartialDischargeCube]) -> None:
+        """Write the partial discharge cubes of a circuit, replacing the cubes of the same time resolutions
+
+        :param circuit_id: the circuit id to write
+        :param partial_discharge_cubes: the cubes of the circuit, see Circuit.create_partial_discharge_cubes
+        """
+        circuit_folder = self.__get_circuit_folder(circuit_id)
+        circuit_folder.mkdir(parents=True, exist_ok=True)
+        for partial_discharge_cube in partial_discharge_cubes:
+            path = circuit_folder / f"{partial_discharge_cube.time_resolution}{self.FILE_SUFFIX}"
+            temporary_path = path.with_suffix(".tmp")
+            with open(temporary_path, "wb") as file:
+                np.savez(file,
+                         time_resolution=np.array(partial_discharge_cube.time_resolution),
+                         location_bin_width=np.array(partial_discharge_cube.location_bin_width),
+                         first_location_bin=np.array(partial_discharge_cube.first_location_bin),
+                         time_bins=partial_discharge_cube.time_bins.asi8,
+                         datetime_name=np.array(partial_discharge_cube.time_bins.name or ""),
+                         cell_offsets=partial_discharge_cube.cell_offsets,
+                         cell_time_bins=partial_discharge_cube.cell_time_bins,
+                         sums=partial_discharge_cube.sums,
+                         counts=partial_discharge_cube.counts,
+                         maxima=partial_discharge_cube.maxima,
+                         squared_sums=partial_discharge_cube.squared_sums,
+                         number_of_events=np.array(partial_discharge_cube.number_of_events))
+            os.replace(temporary_path, path)
+
+    @staticmethod
+    def __load_cube(path: Path) -> PartialDischargeCube:
+        """Load a partial discharge cube from a .npz file
+
+        :param path: path of the .npz file
+        """
+        with np.load(path) as arrays:
+            if "squared_sums" not in arrays.files:
+                raise ValueError(PARTIAL_DISCHARGE_CUBE_WITHOUT_SQUARED_SUMS.format(path=path))
+            return PartialDischargeCube(
+                time_resolution=str(arrays["time_resolution"]),
+                location_bin_width=float(arrays["location_bin_width"]),
+                first_location_bin=int(arrays["first_location_bin"]),
+                time_bins=pd.DatetimeIndex(arrays["time_bins"].view("datetime64[ns]"),
+                                           name=str(arrays["datetime_name"]) or None),
+                cell_offsets=arrays["cell_offsets"],
+                cell_time_bins=arrays["cell_time_bins"],
+                sums=arrays["sums"],
+                counts=arrays["counts"],
+                maxima=arrays["maxima"],
+                squared_sums=arrays["squared_sums"],
+                number_of_events=int(arrays["number_of_events"]))
+
+    def __get_circuit_folder(self, circuit_id: str) -> Path:
+        """Get the folder with the cube files of a circuit
+
+        :param circuit_id: the circuit id
+        """
+        return self.partial_discharge_cubes_absolute_root_folder / str(circuit_id)
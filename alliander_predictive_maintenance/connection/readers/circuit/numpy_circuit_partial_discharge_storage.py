@@ -0,0 +1,128 @@
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from alliander_predictive_maintenance.connection.readers.abstraction.dataframe_validator import DataFrameValidator
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_location_index_reader import \
+    ICircuitPartialDischargeLocationIndexReader
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_reader import ICircuitPartialDischargeReader
+from alliander_predictive_maintenance.constants import COLUMNS_DO_NOT_MATCH_MANDATORY, \
+    PARTIAL_DISCHARGE_DATA_FILE_NOT_FOUND, INVALID_PATH
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_location_index import \
+    PartialDischargeLocationIndex
+
+
+# the location index reader comes first, so its __subclasshook__ is inherited: with the partial discharge reader hook,
+# every partial discharge reader would count as a subclass of this storage and thus as a location index reader
+class NumpyCircuitPartialDischargeStorage(ICircuitPartialDischargeLocationIndexReader, ICircuitPartialDischargeReader,
+                                          DataFrameValidator):
+    """
+    A class for storing partial discharge data as fixed-dtype NumPy arrays, one folder per circuit.
+    The events are stored sorted by location and are opened as memory-mapped arrays, so a Circuit can use them
+    without parsing or copying and many processes share the same page cache.
+    Every write stores the arrays in a new version folder and then replaces the manifest of the circuit, which names the
+    current version folder, so readers never map arrays of different writes.
+    """
+    LOCATIONS_FILE = "locations.npy"
+    CHARGES_FILE = "charges.npy"
+    DATETIMES_FILE = "datetimes.npy"
+    TIME_ORDER_FILE = "time_order.npy"
+    MANIFEST_FILE = "manifest.json"
+    VERSION_KEY = "version"
+
+    def __init__(self, partial_discharge_data_absolute_root_folder: Path):
+        if not partial_discharge_data_absolute_root_folder.is_dir():
+            raise ValueError(INVALID_PATH.format(path=partial_discharge_data_absolute_root_folder))
+        self.partial_discharge_data_absolute_root_folder = partial_discharge_data_absolute_root_folder
+
+    def get_partial_discharge_data_for_circuit(self, circuit_id: str) -> pd.DataFrame:
+        location_index = self.get_partial_discharge_location_index_for_circuit(circuit_id)
+        # invert the permutation to put the events back in time order
+        location_order = np.empty_like(location_index.time_order)
+        location_order[location_index.time_order] = np.arange(len(location_index))
+        return pd.DataFrame({self.DATETIME_COLUMN: location_index.datetimes[location_order],
+                             self.PARTIAL_DISCHARGE_DATA_COLUMN: location_index.charges[location_order],
+                             self.LOCATION_COLUMN: location_index.locations[location_order]})
+
+    def get_partial_discharge_location_index_for_circuit(self, circuit_id: str) -> PartialDischargeLocationIndex:
+        version_folder = self.__get_version_folder(circuit_id)
+        return PartialDischargeLocationIndex(
+            locations=np.load(version_folder / self.LOCATIONS_FILE, mmap_mode="r"),
+            charges=np.load(version_folder / self.CHARGES_FILE, mmap_mode="r"),
+            datetimes=np.load(version_folder / self.DATETIMES_FILE, mmap_mode="r").view("datetime64[ns]"),
+            time_order=np.load(version_folder / self.TIME_ORDER_FILE, mmap_mode="r"),
+            datetime_name=self.DATETIME_COLUMN)
+
+    def write_partial_discharge_data_for_circuit(self, circuit_id: str, data_frame: pd.DataFrame) -> None:
+        """Write the partial discharge data of a circuit. Rows with missing values are dropped, the datetimes are
+        stored as int64 nanoseconds and the locations and charges as float32.
+
+        :param circuit_id: the circuit id to write
+        :param data_frame: partial discharge data of the circuit
+        """
+        if not self._data_frame_has_valid_structure(data_frame, self.MANDATORY_COLUMNS):
+            raise TypeError(f"{COLUMNS_DO_NOT_MATCH_MANDATORY} {self.MANDATORY_COLUMNS}")
+        data_frame = self._enforce_schema(data_frame[self.MANDATORY_COLUMNS].dropna(), self.SCHEMA).astype(
+            {self.DATETIME_COLUMN: "datetime64[ns]"})
+        location_index = PartialDischargeLocationIndex.from_data_frame(
+            data_frame, datetime_column=self.DATETIME_COLUMN, location_column=self.LOCATION_COLUMN,
+            charge_column=self.PARTIAL_DISCHARGE_DATA_COLUMN)
+
+        circuit_folder = self.__get_circuit_folder(circuit_id)
+        circuit_folder.mkdir(parents=True, exist_ok=True)
+        previous_version = self.__read_version(circuit_id)
+        version = uuid.uuid4().hex
+        version_folder = circuit_folder / version
+        version_folder.mkdir()
+        np.save(version_folder / self.LOCATIONS_FILE, location_index.locations)
+        np.save(version_folder / self.CHARGES_FILE, location_index.charges)
+        np.save(version_folder / self.DATETIMES_FILE, location_index.datetimes.view(np.int64))
+        np.save(version_folder / self.TIME_ORDER_FILE, location_index.time_order.astype(np.int64))
+
+        # replacing the manifest switches readers to the new version at once
+        manifest_path = circuit_folder / self.MANIFEST_FILE
+        temporary_manifest_path = manifest_path.with_suffix(".tmp")
+        with open(temporary_manifest_path, "w") as file:
+            json.dump({self.VERSION_KEY: version}, file)
+        os.replace(temporary_manifest_path, manifest_path)
+        # the previous version is kept for readers that read the manifest just before it was replaced, processes that
+        # mapped older versions keep their arrays after the files are removed
+        for folder in circuit_folder.iterdir():
+            if folder.is_dir() and folder.name not in [version, previous_version]:
+                shutil.rmtree(folder, ignore_errors=True)
+
+    def __get_version_folder(self, circuit_id: str) -> Path:
+        """Get the folder with the NumPy files of the current version of a circuit
+
+        :param circuit_id: the circuit id
+        """
+        version = self.__read_version(circuit_id)
+        if version is None:
+            raise FileNotFoundError(PARTIAL_DISCHARGE_DATA_FILE_NOT_FOUND.format(
+                path=self.__get_circuit_folder(circuit_id)))
+        return self.__get_circuit_folder(circuit_id) / version
+
+    def __read_version(self, circuit_id: str) -> Optional[str]:
+        """Read the current version of a circuit from its manifest
+
+        :param circuit_id: the circuit id
+        :return: the name of the version folder, or None if the circuit was not written
+        """
+        manifest_path = self.__get_circuit_folder(circuit_id) / self.MANIFEST_FILE
+        if not manifest_path.is_file():
+            return None
+        with open(manifest_path) as file:
+            return json.load(file)[self.VERSION_KEY]
+
+    def __get_circuit_folder(self, circuit_id: str) -> Path:
+        """Get the folder with the version folders and the manifest of a circuit
+
+        :param circuit_id: the circuit id
+        """
+        return self.partial_discharge_data_absolute_root_folder / str(circuit_id)
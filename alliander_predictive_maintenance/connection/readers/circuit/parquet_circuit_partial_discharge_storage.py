@@ -0,0 +1,128 @@
+import shutil
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from alliander_predictive_maintenance.connection.readers.abstraction.dataframe_validator import DataFrameValidator
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_partial_discharge_storage import \
+    CsvCircuitPartialDischargeStorage
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_reader import ICircuitPartialDischargeReader
+from alliander_predictive_maintenance.constants import COLUMNS_DO_NOT_MATCH_MANDATORY, \
+    PARTIAL_DISCHARGE_DATA_FILE_NOT_FOUND, INVALID_PATH
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
+
+
+class ParquetCircuitPartialDischargeStorage(ICircuitPartialDischargeReader, DataFrameValidator):
+    """
+    A class for storing and loading partial discharge data in Parquet files, partitioned per circuit and month.
+    Time window and location filters are pushed down into the read, so only the matching months and row groups
+    are decoded.
+    """
+    MONTH_PARTITION_COLUMN = "month"
+    MONTH_FORMAT = "%Y-%m"
+    ROW_GROUP_SIZE = 128 * 1024
+
+    def __init__(self, partial_discharge_data_absolute_root_folder: Path):
+        if not partial_discharge_data_absolute_root_folder.is_dir():
+            raise ValueError(INVALID_PATH.format(path=partial_discharge_data_absolute_root_folder))
+        self.partial_discharge_data_absolute_root_folder = partial_discharge_data_absolute_root_folder
+
+    def get_partial_discharge_data_for_circuit(self, circuit_id: str, time_window: Optional[TimeWindow] = None,
+                                               location_range: Optional[Tuple[float, float]] = None) -> pd.DataFrame:
+        """Get the partial discharge data for the loaded circuit
+
+        :param circuit_id: the circuit id to load
+        :param time_window: only read the events within this time window
+        :param location_range: only read the events within this (minimum, maximum) location range
+        """
+        circuit_folder = self.__get_circuit_folder(circuit_id)
+        if not circuit_folder.is_dir():
+            raise FileNotFoundError(PARTIAL_DISCHARGE_DATA_FILE_NOT_FOUND.format(path=circuit_folder))
+
+        partitioning = ds.partitioning(pa.schema([(self.MONTH_PARTITION_COLUMN, pa.string())]), flavor="hive")
+        dataset = ds.dataset(circuit_folder, format="parquet", partitioning=partitioning)
+        if not self._data_frame_has_valid_structure(dataset.schema.empty_table().to_pandas(),
+                                                    self.MANDATORY_COLUMNS):
+            raise TypeError(f"{COLUMNS_DO_NOT_MATCH_MANDATORY} {self.MANDATORY_COLUMNS}")
+        with instrumentation.span("partial_discharge_parquet_read"):
+            table = dataset.to_table(columns=self.MANDATORY_COLUMNS,
+                                     filter=self.__create_filter(time_window, location_range))
+            data_frame = table.to_pandas()
+        instrumentation.count("partial_discharge_rows_read", len(data_frame), format="parquet")
+        data_frame = self._enforce_schema(data_frame, self.SCHEMA)
+        return data_frame.sort_values(self.DATETIME_COLUMN, kind="stable", ignore_index=True)
+
+    def write_partial_discharge_data_for_circuit(self, circuit_id: str, data_frame: pd.DataFrame) -> None:
+        """Write the partial discharge data of a circuit, replacing the data that is stored for it
+
+        :param circuit_id: the circuit id to write
+        :param data_frame: partial discharge data of the circuit
+        """
+        shutil.rmtree(self.__get_circuit_folder(circuit_id), ignore_errors=True)
+        self.__append_partial_discharge_data(circuit_id, data_frame, part=0)
+
+    def convert_from_csv(self, csv_circuit_partial_discharge_storage: CsvCircuitPartialDischargeStorage,
+                         circuit_id: str) -> None:
+        """Convert the partial discharge CSV file of a circuit to Parquet. The CSV file is streamed in chunks,
+        so memory use does not depend on the size of the file.
+
+        :param csv_circuit_partial_discharge_storage: storage with the CSV file of the circuit
+        :param circuit_id: the circuit id to convert
+        """
+        shutil.rmtree(self.__get_circuit_folder(circuit_id), ignore_errors=True)
+        for part, chunk in enumerate(
+                csv_circuit_partial_discharge_storage.get_partial_discharge_chunks_for_circuit(circuit_id)):
+            self.__append_partial_discharge_data(circuit_id, chunk, part=part)
+
+    def __append_partial_discharge_data(self, circuit_id: str, data_frame: pd.DataFrame, part: int) -> None:
+        """Append partial discharge data to the month partitions of a circuit
+
+        :param circuit_id: the circuit id to write
+        :param data_frame: partial discharge data
+        :param part: number of the part, unique for every append to a circuit
+        """
+        if not self._data_frame_has_valid_structure(data_frame, self.MANDATORY_COLUMNS):
+            raise TypeError(f"{COLUMNS_DO_NOT_MATCH_MANDATORY} {self.MANDATORY_COLUMNS}")
+        data_frame = self._enforce_schema(data_frame[self.MANDATORY_COLUMNS], self.SCHEMA).sort_values(
+            self.DATETIME_COLUMN, kind="stable")
+        months = data_frame[self.DATETIME_COLUMN].dt.strftime(self.MONTH_FORMAT)
+        for month, month_data_frame in data_frame.groupby(months, sort=False):
+            month_folder = self.__get_circuit_folder(circuit_id) / f"{self.MONTH_PARTITION_COLUMN}={month}"
+            month_folder.mkdir(parents=True, exist_ok=True)
+            table = pa.Table.from_pandas(month_data_frame, preserve_index=False)
+            pq.write_table(table, month_folder / f"part-{part}.parquet", row_group_size=self.ROW_GROUP_SIZE)
+
+    def __create_filter(self, time_window: Optional[TimeWindow],
+                        location_range: Optional[Tuple[float, float]]) -> Optional[ds.Expression]:
+        """Create the filter expression that is pushed down into the read
+
+        :param time_window: only read the events within this time window
+        :param location_range: only read the events within this (minimum, maximum) location range
+        :return: a filter expression, or None to read everything
+        """
+        expression = None
+        if time_window is not None:
+            start_date = pa.scalar(pd.Timestamp(time_window.start_date), type=pa.timestamp("ns"))
+            end_date = pa.scalar(pd.Timestamp(time_window.end_date), type=pa.timestamp("ns"))
+            # the partition filter skips whole months, the column filter skips row groups using their statistics
+            expression = ((ds.field(self.MONTH_PARTITION_COLUMN) >= time_window.start_date.strftime(self.MONTH_FORMAT)) &
+                          (ds.field(self.MONTH_PARTITION_COLUMN) <= time_window.end_date.strftime(self.MONTH_FORMAT)) &
+                          (ds.field(self.DATETIME_COLUMN) >= start_date) &
+                          (ds.field(self.DATETIME_COLUMN) <= end_date))
+        if location_range is not None:
+            location_expression = ((ds.field(self.LOCATION_COLUMN) >= location_range[0]) &
+                                   (ds.field(self.LOCATION_COLUMN) <= location_range[1]))
+            expression = location_expression if expression is None else expression & location_expression
+        return expression
+
+    def __get_circuit_folder(self, circuit_id: str) -> Path:
+        """Get the folder with the Parquet files of a circuit
+
+        :param circuit_id: the circuit id
+        """
+        return self.partial_discharge_data_absolute_root_folder / str(circuit_id)
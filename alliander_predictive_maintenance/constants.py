@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import List, Tuple
 
 # For parsing the FailedJoints data file
 FAILED_JOINTS_PRIORITY: int = 10
@@ -6,6 +6,16 @@ FAILED_JOINTS_LOCATION_FRACTIONAL_TIME: Tuple[int, int] = (1, 1000)
 
 TEST_CIRCUIT_IDS = [1, 2, 3, 4, 5]
 
+# Number of rows per chunk when streaming partial discharge CSV files
+PARTIAL_DISCHARGE_CSV_CHUNK_SIZE: int = 1_000_000
+
+# Time resolutions and number of location bins of the pre-aggregated partial discharge cubes of a circuit
+PARTIAL_DISCHARGE_CUBE_TIME_RESOLUTIONS: List[str] = ["1min", "1H", "1D"]
+PARTIAL_DISCHARGE_CUBE_LOCATION_BINS: int = 1000
+
+# Format of the datetimes in data files and weather responses, other formats are inferred
+DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
+
 # Error messages
 COLUMNS_DO_NOT_MATCH_MANDATORY = "Columns in the data set do not match the mandatory columns."
 IEXCEL_READER_LOAD_NOT_CALLED = "The data set file has not been loaded yet. The load() method must be called first."
@@ -14,11 +24,28 @@ DATADUMP_NOT_LOADED = "The data dump has not been loaded yet. The load_data_dump
 PARTIAL_DISCHARGE_DATA_FILE_NOT_FOUND = "Partial discharge data file cannot be found at path: {path}"
 INVALID_PATH = "The given path is invalid: {path}"
 CIRCUIT_CONFIG_FILE_NOT_FOUND = "Circuit Config file cannot be found at path: {path}"
+MODEL_NOT_FOUND = "Model file cannot be found at path: {path}"
+PARTIAL_DISCHARGE_CUBES_NOT_FOUND = "Partial discharge cubes cannot be found at path: {path}"
+PARTIAL_DISCHARGE_CUBE_DOES_NOT_MATCH = "The {time_resolution} partial discharge cube was created from {cube_events} " \
+                                        "events, but the circuit has {events} events"
+PARTIAL_DISCHARGE_CUBE_WITHOUT_SQUARED_SUMS = "The partial discharge cube {path} was saved without the squared sums, " \
+                                              "create the cubes again with Circuit.create_partial_discharge_cubes"
 INVALID_ENUM_INPUT = "Invalid enum input"
 HTTP_ERROR_COULD_NOT_GET_DATA = "Could not get data from the API"
+COORDINATES_AND_TIME_WINDOWS_LENGTH = "Got {coordinates} coordinates but {time_windows} time windows"
 INVALID_JOINT_LOCATION = "Joint location {location} is invalid with circuit length {circuit_length}"
+INVALID_RESAMPLING_STRATEGY = "Invalid resampling strategy"
+INVALID_PERCENTILE = "Percentile must be between 0 and 100, got {percentile}"
 INVALID_TIME_WINDOW = "TimeWindow {time_window} is out of range for {min}, {max}"
 WEATHER_DATA_MANDATORY = "Weather data does not contain all mandatory columns {data} not in {mandatory}"
 WEATHER_DATA_DATETIME_INDEX = "Weather data index is not in DateTime format"
 PARTIAL_DISCHARGE_DATA_DATETIME_INDEX = "Partial discharge data index is not in DateTime format"
+INVALID_LAGS = "Lags must be positive integers, got {lags}"
+INCREMENTAL_DATA_NOT_AFTER_STATE = "New data starting at {start} does not start after the last day {end} of the state"
+FORECASTER_NOT_FITTED = "The forecaster must be fitted or its weights loaded first"
+FLEET_INPUT_LENGTH = "Got {forecasters} forecasters but {joints} joints"
+NO_TUNING_CANDIDATES = "The search space has no candidates, every grid needs at least one value"
+INVALID_NUMBER_OF_FOLDS = "The number of folds must be at least 2, got {n_folds}"
+NO_SCORED_TUNING_CANDIDATES = "No candidate could be scored for the joint at {location_in_meters} m of circuit " \
+                              "{circuit_id}, every candidate has a fold that failed or scored NaN"
 NOTIMPLEMENTEDERROR_AWS = "Alliander S3 environment should load {data} data here"
\ No newline at end of file
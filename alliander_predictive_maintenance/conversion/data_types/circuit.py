@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional, List, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -6,14 +6,42 @@ import pandas as pd
 from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
 from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_reader import ICircuitPartialDischargeReader
 from alliander_predictive_maintenance.conversion.data_types.joint import Joint
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_cube import PartialDischargeCube
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_location_index import \
+    PartialDischargeLocationIndex
 from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
-from alliander_predictive_maintenance.constants import INVALID_JOINT_LOCATION, INVALID_TIME_WINDOW
+from alliander_predictive_maintenance.constants import INVALID_JOINT_LOCATION, INVALID_TIME_WINDOW, \
+    INVALID_RESAMPLING_STRATEGY, PARTIAL_DISCHARGE_CUBE_TIME_RESOLUTIONS, PARTIAL_DISCHARGE_CUBE_LOCATION_BINS, \
+    PARTIAL_DISCHARGE_CUBE_DOES_NOT_MATCH, INVALID_PERCENTILE
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
 
 
 class Circuit:
     """ An object representing a Circuit consisting of joints """
+    # location bins within this fraction of the circuit length of the bandwidth edges are read from the raw events,
+    # so rounding of the locations can not put events outside the bandwidth in a joint
+    CUBE_LOCATION_MARGIN = 1e-6
+    # the statistics of PartialDischargeCube that every resampling strategy is computed from, a percentile can only be
+    # computed from the events
+    STATISTICS_OF_RESAMPLING_STRATEGIES = {"sum": ["sum"], "count": ["count"], "max": ["max"], "mean": ["sum", "count"],
+                                           "energy": ["squared_sum"], "percentile": []}
+
     def __init__(self, circuit_id: int, cds_weather: pd.DataFrame, knmi_weather: pd.DataFrame, circuit_coordinate: CircuitCoordinate,
-                 partial_discharge: pd.DataFrame, time_window: TimeWindow, circuit_length: float):
+                 partial_discharge: Union[pd.DataFrame, PartialDischargeLocationIndex], time_window: TimeWindow,
+                 circuit_length: float, partial_discharge_cubes: Optional[List[PartialDischargeCube]] = None):
+        """ Initialize the Circuit class.
+
+        :param circuit_id: ID of the circuit
+        :param cds_weather: Climate Data Storage weather of the circuit
+        :param knmi_weather: KNMI weather of the circuit
+        :param circuit_coordinate: coordinate of the circuit
+        :param partial_discharge: partial discharge dataframe, or the events already sorted by location, for instance
+            memory-mapped arrays that are used without copying
+        :param time_window: time window of the partial discharge data
+        :param circuit_length: length of the circuit in meters
+        :param partial_discharge_cubes: pre-aggregated cubes of the partial discharge data, see
+            create_partial_discharge_cubes
+        """
         self.__circuit_id = circuit_id
         self.__cds_weather = cds_weather
         self.__knmi_weather = knmi_weather
@@ -21,6 +49,10 @@ class Circuit:
         self.__partial_discharge = partial_discharge
         self.__time_window = time_window
         self.__circuit_length = circuit_length
+        self.__location_index: Optional[PartialDischargeLocationIndex] = None
+        self.__partial_discharge_cubes = list(partial_discharge_cubes or [])
+        self.__cube_time_bin_maps: Dict[Tuple[str, str], np.ndarray] = {}
+        self.__cube_event_offsets: Dict[str, np.ndarray] = {}
 
     @property
     def circuit_id(self):
@@ -42,56 +74,392 @@ class Circuit:
     def time_window(self):
         return self.__time_window
 
-    def create_joint(self, location: float, time_window: TimeWindow,
-                     resampling_strategy: Optional[str] = "sum") -> Joint:
+    @property
+    def partial_discharge_cubes(self) -> List[PartialDischargeCube]:
+        return self.__partial_discharge_cubes
+
+    def create_partial_discharge_cubes(
+            self, time_resolutions: List[str] = PARTIAL_DISCHARGE_CUBE_TIME_RESOLUTIONS,
+            number_of_location_bins: int = PARTIAL_DISCHARGE_CUBE_LOCATION_BINS) -> List[PartialDischargeCube]:
+        """ Pre-aggregate the partial discharge data in a cube per time resolution. Joints are created from the
+        coarsest cube that can be resampled to their time resolution, and only the events in the location bins at the
+        edges of their bandwidth are read. The cubes can be saved and passed to a new Circuit of the same data.
+
+        :param time_resolutions: time resolutions of the cubes
+        :param number_of_location_bins: number of location bins over the length of the circuit
+        :return: the cubes, which are also used by this circuit
+        """
+        location_index = self.__get_location_index()
+        self.__partial_discharge_cubes = [
+            PartialDischargeCube.from_location_index(location_index, time_resolution,
+                                                     self.__circuit_length / number_of_location_bins)
+            for time_resolution in time_resolutions]
+        self.__cube_time_bin_maps.clear()
+        self.__cube_event_offsets.clear()
+        return self.__partial_discharge_cubes
+
+    @instrumentation.traced()
+    def create_joint(self, location: float, time_window: TimeWindow, resampling_strategy: Optional[str] = "sum",
+                     time_resolution: str = "1H", percentile: float = 95.0) -> Joint:
         """ Create a Joint object
 
         :param location: location in the circuit
         :param time_window: a time window of activity
-        :param resampling_strategy: how to resample the partial discharge data, options are [sum, count]
+        :param resampling_strategy: how to resample the partial discharge data per time bin, options are sum (of the
+            charges), count (of the discharges, the events with a charge), max (charge), mean (charge of the
+            discharges), percentile (of the charges of the discharges) and energy (sum of the squared charges). Time
+            bins without discharges are 0.
+        :param time_resolution: time resolution of the resampling
+        :param percentile: percentile of the percentile resampling strategy, between 0 and 100
         :return: a Joint object
         """
         if not 0 < location < self.__circuit_length:
             raise ValueError(INVALID_JOINT_LOCATION.format(location=location, circuit_length=self.__circuit_length))
+        self.__validate_resampling_strategy(resampling_strategy, percentile)
         partial_discharge = self.__get_partial_discharge_at_location(location=location,
-                                                                     resampling_strategy=resampling_strategy)
+                                                                     resampling_strategy=resampling_strategy,
+                                                                     time_resolution=time_resolution,
+                                                                     percentile=percentile)
         if time_window.start_date > time_window.end_date:
             raise ValueError(INVALID_TIME_WINDOW.format(time_window=time_window,
                                                         min=time_window.start_date,
                                                         max=time_window.end_date))
-        partial_discharge = partial_discharge[time_window.start_date:time_window.end_date]
-        return Joint(location, partial_discharge)
+        return Joint(location, self.__slice_time_window(partial_discharge, time_window))
+
+    @instrumentation.traced()
+    def create_joints(self, locations: List[float], time_window: TimeWindow, resampling_strategy: Optional[str] = "sum",
+                      time_resolution: str = "1H", percentile: float = 95.0) -> List[Joint]:
+        """ Create Joint objects for multiple locations in a single pass over the partial discharge data.
+        Returns the same joints as calling create_joint for every location.
+
+        :param locations: locations in the circuit
+        :param time_window: a time window of activity
+        :param resampling_strategy: how to resample the partial discharge data, see create_joint
+        :param time_resolution: time resolution of the resampling
+        :param percentile: percentile of the percentile resampling strategy, between 0 and 100
+        :return: a list of Joint objects, in the order of the given locations
+        """
+        for location in locations:
+            if not 0 < location < self.__circuit_length:
+                raise ValueError(INVALID_JOINT_LOCATION.format(location=location,
+                                                               circuit_length=self.__circuit_length))
+        self.__validate_resampling_strategy(resampling_strategy, percentile)
+        partial_discharges = self.__get_partial_discharge_at_locations(locations=locations,
+                                                                       resampling_strategy=resampling_strategy,
+                                                                       time_resolution=time_resolution,
+                                                                       percentile=percentile)
+        if time_window.start_date > time_window.end_date:
+            raise ValueError(INVALID_TIME_WINDOW.format(time_window=time_window,
+                                                        min=time_window.start_date,
+                                                        max=time_window.end_date))
+        return [Joint(location, self.__slice_time_window(partial_discharge, time_window))
+                for location, partial_discharge in zip(locations, partial_discharges)]
+
+    def __validate_resampling_strategy(self, resampling_strategy: str, percentile: float) -> None:
+        """ Check a resampling strategy before any partial discharge data is read
+
+        :param resampling_strategy: how to resample the partial discharge data
+        :param percentile: percentile of the percentile resampling strategy
+        """
+        if resampling_strategy not in self.STATISTICS_OF_RESAMPLING_STRATEGIES:
+            raise ValueError(f"{INVALID_RESAMPLING_STRATEGY}: {resampling_strategy}")
+        if resampling_strategy == "percentile" and not 0 <= percentile <= 100:
+            raise ValueError(INVALID_PERCENTILE.format(percentile=percentile))
 
     def __get_partial_discharge_at_location(self, location: float, bandwidth: Optional[float] = 0.01,
                                             resampling_strategy: Optional[str] = "sum",
-                                            time_resolution: Optional[str] = "1H") -> pd.Series:
-        """ Get partial discharge at a specific location
+                                            time_resolution: Optional[str] = "1H",
+                                            percentile: float = 95.0) -> pd.Series:
+        """ Get partial discharge at a specific location. Only the events within the bandwidth are read from the
+        location index.
 
         :param location: location of the partial discharge
         :param bandwidth: bandwidth of the recordings
-        :param resampling_strategy: how to resample the partial discharge data, options are [sum, count]
+        :param resampling_strategy: how to resample the partial discharge data, see create_joint
         :param time_resolution: time resolution of the resampling
+        :param percentile: percentile of the percentile resampling strategy
         :return: a pd.Series of partial discharge
         """
-        pdframe = self.__partial_discharge.copy()
-        pdframe = pdframe.dropna()
-
-        charge = np.where(
-            abs(location - pdframe[ICircuitPartialDischargeReader.LOCATION_COLUMN]) /
-            self.__circuit_length <= bandwidth,
-            pdframe[ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN],
-            0,
-        )
-
-        if resampling_strategy == "sum":
-            if time_resolution == "1min":
-                return pd.Series(charge, index=pdframe[ICircuitPartialDischargeReader.DATETIME_COLUMN])
-            else:
-                return pd.Series(charge, index=pdframe[ICircuitPartialDischargeReader.DATETIME_COLUMN]).resample(
-                    time_resolution).sum()
-        elif resampling_strategy == "count":
-            return (
-                pd.Series(charge, index=pdframe[ICircuitPartialDischargeReader.DATETIME_COLUMN])
-                .resample(time_resolution)
-                .apply(np.count_nonzero)
-            )
+        if resampling_strategy != "sum" or time_resolution != "1min":
+            return self.__get_partial_discharge_at_locations([location], bandwidth, resampling_strategy,
+                                                             time_resolution, percentile)[0]
+        # a 1min sum holds the charge of every event at its own time
+        location_index = self.__get_location_index()
+        selection = self.__select_events_at_location(location_index, location, bandwidth)
+        charges = np.zeros(len(location_index), dtype=np.result_type(location_index.charges, 0))
+        charges[location_index.time_order[selection]] = location_index.charges[selection]
+        return pd.Series(charges, index=location_index.datetimes_in_time_order())
+
+    def __get_partial_discharge_at_locations(self, locations: List[float], bandwidth: Optional[float] = 0.01,
+                                             resampling_strategy: Optional[str] = "sum",
+                                             time_resolution: Optional[str] = "1H",
+                                             percentile: float = 95.0) -> List[pd.Series]:
+        """ Get partial discharge at multiple locations. Each location selects its events from the location index
+        and all locations are resampled together with one bincount, or from a partial discharge cube.
+
+        :param locations: locations of the partial discharge
+        :param bandwidth: bandwidth of the recordings
+        :param resampling_strategy: how to resample the partial discharge data, see create_joint
+        :param time_resolution: time resolution of the resampling
+        :param percentile: percentile of the percentile resampling strategy
+        :return: a list of pd.Series of partial discharge, one for each location
+        """
+        location_index = self.__get_location_index()
+        time_bins = location_index.time_bins(time_resolution)
+        dtype = self.__get_resampling_dtype(location_index, resampling_strategy)
+        statistics = self.STATISTICS_OF_RESAMPLING_STRATEGIES[resampling_strategy]
+        partial_discharge_cube = self.__get_partial_discharge_cube(time_resolution)
+        if partial_discharge_cube is not None and statistics and all(
+                partial_discharge_cube.can_aggregate(statistic) for statistic in statistics):
+            return [pd.Series(self.__resample_statistics(resampling_strategy, self.__aggregate_at_location_with_cube(
+                partial_discharge_cube, location_index, location, bandwidth, time_resolution, statistics)).astype(
+                dtype), index=time_bins) for location in locations]
+
+        joint_indices = []
+        event_indices = []
+        for joint_index, location in enumerate(locations):
+            selection = self.__select_events_at_location(location_index, location, bandwidth)
+            joint_indices.append(np.full(len(selection), joint_index))
+            event_indices.append(selection)
+        joint_indices = np.concatenate(joint_indices + [np.empty(0, dtype=np.int64)])
+        event_indices = np.concatenate(event_indices + [np.empty(0, dtype=np.int64)])
+
+        charges = np.asarray(location_index.charges[event_indices], dtype=np.float64)
+        time_bin_of_event = np.searchsorted(time_bins.asi8,
+                                            location_index.datetimes[event_indices].view(np.int64), side="right") - 1
+        bins = joint_indices * len(time_bins) + time_bin_of_event
+        number_of_bins = len(locations) * len(time_bins)
+        if resampling_strategy == "percentile":
+            resampled = self.__percentile_of_events(charges, bins, number_of_bins, percentile)
+        else:
+            resampled = self.__resample_statistics(resampling_strategy, {
+                statistic: self.__aggregate_events(statistic, charges, bins, number_of_bins)
+                for statistic in statistics})
+        resampled = resampled.reshape(len(locations), len(time_bins))
+        return [pd.Series(row, index=time_bins) for row in resampled.astype(dtype)]
+
+    def __aggregate_at_location_with_cube(self, partial_discharge_cube: PartialDischargeCube,
+                                          location_index: PartialDischargeLocationIndex, location: float,
+                                          bandwidth: float, time_resolution: str,
+                                          statistics: List[str]) -> Dict[str, np.ndarray]:
+        """ Aggregate statistics of the events at a location to time bins. The location bins that are completely
+        within the bandwidth are read from the cube, only the events in the location bins at the edges of the
+        bandwidth are read from the location index. The result equals aggregating all events within the bandwidth.
+
+        :param partial_discharge_cube: a cube that can be resampled to the time resolution
+        :param location_index: the location index of the partial discharge data
+        :param location: location of the partial discharge
+        :param bandwidth: bandwidth of the recordings
+        :param time_resolution: time resolution of the resampling
+        :param statistics: statistics of the cube to aggregate
+        :return: every statistic of every time bin
+        """
+        time_bins = location_index.time_bins(time_resolution)
+        half_width = bandwidth * self.__circuit_length
+        margin = self.CUBE_LOCATION_MARGIN * self.__circuit_length
+        first_location_bin, end_location_bin = partial_discharge_cube.inner_location_bins(
+            location - half_width + margin, location + half_width - margin)
+        instrumentation.count("partial_discharge_cube_cells_read",
+                              partial_discharge_cube.cell_offsets[end_location_bin] -
+                              partial_discharge_cube.cell_offsets[first_location_bin])
+
+        start, end = location_index.window(location, half_width * (1 + 1e-9))
+        event_offsets = self.__get_cube_event_offsets(partial_discharge_cube)
+        inner_start, inner_end = (event_offsets[first_location_bin], event_offsets[end_location_bin]) \
+            if first_location_bin < end_location_bin else (end, end)
+        selection = np.concatenate([
+            self.__select_events_in_range(location_index, location, bandwidth, start, min(end, inner_start)),
+            self.__select_events_in_range(location_index, location, bandwidth, max(start, inner_end), end)])
+        charges = np.asarray(location_index.charges[selection], dtype=np.float64)
+        time_bin_of_event = np.searchsorted(time_bins.asi8, location_index.datetimes[selection].view(np.int64),
+                                            side="right") - 1
+
+        time_bin_of_cube_time_bin = self.__get_cube_time_bin_map(partial_discharge_cube, time_resolution)
+        aggregated = {}
+        for statistic in statistics:
+            cube_statistic = partial_discharge_cube.aggregate(statistic, first_location_bin, end_location_bin,
+                                                              time_bin_of_cube_time_bin, len(time_bins))
+            event_statistic = self.__aggregate_events(statistic, charges, time_bin_of_event, len(time_bins))
+            aggregated[statistic] = np.fmax(cube_statistic, event_statistic) if statistic == "max" else \
+                cube_statistic + event_statistic
+        return aggregated
+
+    @staticmethod
+    def __aggregate_events(statistic: str, charges: np.ndarray, bins: np.ndarray, number_of_bins: int) -> np.ndarray:
+        """ Aggregate a statistic of events to bins
+
+        :param statistic: one of PartialDischargeCube.STATISTICS
+        :param charges: charge of every event
+        :param bins: bin of every event
+        :param number_of_bins: number of bins
+        :return: the statistic of every bin, the maximum is NaN for bins without events
+        """
+        if statistic == "count":
+            return np.bincount(bins[charges != 0], minlength=number_of_bins).astype(np.int64)
+        if statistic == "max":
+            maxima = np.full(number_of_bins, np.nan)
+            if len(bins) > 0:
+                order = np.argsort(bins, kind="stable")
+                sorted_bins = bins[order]
+                starts = np.flatnonzero(np.concatenate([[True], sorted_bins[1:] != sorted_bins[:-1]]))
+                maxima[sorted_bins[starts]] = np.maximum.reduceat(charges[order], starts)
+            return maxima
+        weights = charges if statistic == "sum" else charges ** 2
+        # bincount returns integers when there are no events
+        return np.bincount(bins, weights=weights, minlength=number_of_bins).astype(np.float64)
+
+    @staticmethod
+    def __percentile_of_events(charges: np.ndarray, bins: np.ndarray, number_of_bins: int,
+                               percentile: float) -> np.ndarray:
+        """ Compute the percentile of the charges of the discharges in every bin, with linear interpolation like
+        np.percentile. All events are sorted once by bin and charge, instead of computing a percentile per bin.
+
+        :param charges: charge of every event
+        :param bins: bin of every event
+        :param number_of_bins: number of bins
+        :param percentile: percentile between 0 and 100
+        :return: the percentile of every bin, 0 for bins without discharges
+        """
+        is_discharge = charges != 0
+        charges, bins = charges[is_discharge], bins[is_discharge]
+        order = np.lexsort((charges, bins))
+        charges, bins = charges[order], bins[order]
+        percentiles = np.zeros(number_of_bins)
+        unique_bins, starts, counts = np.unique(bins, return_index=True, return_counts=True)
+        positions = (counts - 1) * percentile / 100
+        lower = np.floor(positions).astype(np.int64)
+        upper = np.minimum(lower + 1, counts - 1)
+        lower_charges, upper_charges = charges[starts + lower], charges[starts + upper]
+        percentiles[unique_bins] = lower_charges + (upper_charges - lower_charges) * (positions - lower)
+        return percentiles
+
+    @staticmethod
+    def __resample_statistics(resampling_strategy: str, statistics: Dict[str, np.ndarray]) -> np.ndarray:
+        """ Compute a resampling strategy from the statistics of its time bins
+
+        :param resampling_strategy: how to resample the partial discharge data, see create_joint
+        :param statistics: the statistics of the resampling strategy, see STATISTICS_OF_RESAMPLING_STRATEGIES
+        :return: the resampled partial discharge of every time bin
+        """
+        if resampling_strategy == "max":
+            return np.where(np.isnan(statistics["max"]), 0.0, statistics["max"])
+        if resampling_strategy == "mean":
+            counts = statistics["count"]
+            return np.divide(statistics["sum"], counts, out=np.zeros(len(counts)), where=counts > 0)
+        return statistics[{"sum": "sum", "count": "count", "energy": "squared_sum"}[resampling_strategy]]
+
+    @staticmethod
+    def __get_resampling_dtype(location_index: PartialDischargeLocationIndex, resampling_strategy: str) -> np.dtype:
+        """ Get the dtype of resampled partial discharge, sums and maxima keep the dtype of the charges
+
+        :param location_index: the location index of the partial discharge data
+        :param resampling_strategy: how to resample the partial discharge data, see create_joint
+        :return: the dtype
+        """
+        if resampling_strategy == "count":
+            return np.dtype(np.int64)
+        if resampling_strategy in ["sum", "max"]:
+            return np.result_type(location_index.charges, 0)
+        return np.dtype(np.float64)
+
+    def __get_partial_discharge_cube(self, time_resolution: str) -> Optional[PartialDischargeCube]:
+        """ Get the coarsest cube that can be resampled to a time resolution
+
+        :param time_resolution: time resolution of the resampling
+        :return: the cube, or None if no cube can be resampled to the time resolution
+        """
+        partial_discharge_cubes = [partial_discharge_cube for partial_discharge_cube in self.__partial_discharge_cubes
+                                   if partial_discharge_cube.can_resample_to(time_resolution)]
+        if not partial_discharge_cubes:
+            return None
+        partial_discharge_cube = max(partial_discharge_cubes,
+                                     key=lambda cube: pd.Timedelta(cube.time_resolution))
+        number_of_events = len(self.__get_location_index())
+        if partial_discharge_cube.number_of_events != number_of_events:
+            raise ValueError(PARTIAL_DISCHARGE_CUBE_DOES_NOT_MATCH.format(
+                time_resolution=partial_discharge_cube.time_resolution,
+                cube_events=partial_discharge_cube.number_of_events, events=number_of_events))
+        return partial_discharge_cube
+
+    def __get_cube_time_bin_map(self, partial_discharge_cube: PartialDischargeCube,
+                                time_resolution: str) -> np.ndarray:
+        """ Get the time bin of every time bucket of a cube, it is created once per time resolution
+
+        :param partial_discharge_cube: a cube that can be resampled to the time resolution
+        :param time_resolution: time resolution of the resampling
+        :return: the position of the time bin of every time bucket of the cube
+        """
+        key = (partial_discharge_cube.time_resolution, time_resolution)
+        if key not in self.__cube_time_bin_maps:
+            self.__cube_time_bin_maps[key] = np.searchsorted(
+                self.__get_location_index().time_bins(time_resolution).asi8, partial_discharge_cube.time_bins.asi8,
+                side="right") - 1
+        return self.__cube_time_bin_maps[key]
+
+    def __get_cube_event_offsets(self, partial_discharge_cube: PartialDischargeCube) -> np.ndarray:
+        """ Get the events of every location bin of a cube, they are found once per cube
+
+        :param partial_discharge_cube: a cube of the partial discharge data
+        :return: the events of location bin k are at positions [offsets[k], offsets[k + 1]) in location order
+        """
+        if partial_discharge_cube.time_resolution not in self.__cube_event_offsets:
+            self.__cube_event_offsets[partial_discharge_cube.time_resolution] = \
+                partial_discharge_cube.event_offsets(self.__get_location_index())
+        return self.__cube_event_offsets[partial_discharge_cube.time_resolution]
+
+    @staticmethod
+    def __slice_time_window(partial_discharge: pd.Series, time_window: TimeWindow) -> pd.Series:
+        """ Select the partial discharge within a time window, including both ends, with a binary search on the
+        monotonic DatetimeIndex
+
+        :param partial_discharge: partial discharge in time order
+        :param time_window: a time window of activity
+        :return: a pd.Series of partial discharge in the time window
+        """
+        start = partial_discharge.index.searchsorted(time_window.start_date, side="left")
+        end = partial_discharge.index.searchsorted(time_window.end_date, side="right")
+        return partial_discharge.iloc[start:end]
+
+    def __select_events_at_location(self, location_index: PartialDischargeLocationIndex, location: float,
+                                    bandwidth: float) -> np.ndarray:
+        """ Select the events within the bandwidth of a location
+
+        :param location_index: the location index of the partial discharge data
+        :param location: location of the partial discharge
+        :param bandwidth: bandwidth of the recordings
+        :return: positions of the selected events in location order
+        """
+        # widen the binary search slightly, the exact bandwidth check is applied on the candidates only
+        start, end = location_index.window(location, bandwidth * self.__circuit_length * (1 + 1e-9))
+        return self.__select_events_in_range(location_index, location, bandwidth, start, end)
+
+    def __select_events_in_range(self, location_index: PartialDischargeLocationIndex, location: float,
+                                 bandwidth: float, start: int, end: int) -> np.ndarray:
+        """ Select the events within the bandwidth of a location from a range of positions in location order
+
+        :param location_index: the location index of the partial discharge data
+        :param location: location of the partial discharge
+        :param bandwidth: bandwidth of the recordings
+        :param start: first position of the range
+        :param end: end (exclusive) position of the range
+        :return: positions of the selected events in location order
+        """
+        if start >= end:
+            return np.empty(0, dtype=np.int64)
+        in_bandwidth = abs(location - location_index.locations[start:end]) / self.__circuit_length <= bandwidth
+        return np.arange(start, end)[in_bandwidth]
+
+    def __get_location_index(self) -> PartialDischargeLocationIndex:
+        """ Get the location index of the partial discharge data, it is created and sorted by time on first use
+
+        :return: the location index
+        """
+        if self.__location_index is None and isinstance(self.__partial_discharge, PartialDischargeLocationIndex):
+            self.__location_index = self.__partial_discharge.sorted_by_time()
+        elif self.__location_index is None:
+            self.__location_index = PartialDischargeLocationIndex.from_data_frame(
+                self.__partial_discharge.dropna(),
+                datetime_column=ICircuitPartialDischargeReader.DATETIME_COLUMN,
+                location_column=ICircuitPartialDischargeReader.LOCATION_COLUMN,
+                charge_column=ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN)
+        return self.__location_index
@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from alliander_predictive_maintenance.conversion.data_types.circuit import Circuit
+
+
+@dataclass
+class CircuitCreationResult:
+    """ The outcome of creating one circuit in a batch. Either circuit or error is set. """
+    circuit_id: int
+    circuit: Optional[Circuit] = None
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
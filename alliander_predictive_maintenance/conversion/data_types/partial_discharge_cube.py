@@ -0,0 +1,183 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from pandas.tseries.offsets import Tick
+
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_location_index import \
+    PartialDischargeLocationIndex
+
+
+@dataclass(eq=False)
+class PartialDischargeCube:
+    """ Partial discharge events pre-aggregated per (time bucket, location bin) cell, with the sum of the charges,
+    the number of discharges (events with a charge), the maximum charge and the sum of the squared charges of every
+    cell. Only cells with events are stored, sorted by location bin and then time bucket, so the cells of a range of
+    location bins are contiguous.
+    time_bins: labels of the time buckets, the same as resampling all events to the time resolution.
+    location bin k holds the events with a location in [(first_location_bin + k) * location_bin_width,
+    (first_location_bin + k + 1) * location_bin_width).
+    cell_offsets: the cells of location bin k are cell_offsets[k]:cell_offsets[k + 1].
+    cell_time_bins: the time bucket of every cell.
+    number_of_events: number of events the cube was created from, to detect a cube of other data. """
+    STATISTICS = ["sum", "count", "max", "squared_sum"]
+
+    time_resolution: str
+    location_bin_width: float
+    first_location_bin: int
+    time_bins: pd.DatetimeIndex
+    cell_offsets: np.ndarray
+    cell_time_bins: np.ndarray
+    sums: np.ndarray
+    counts: np.ndarray
+    maxima: np.ndarray
+    squared_sums: np.ndarray
+    number_of_events: int
+
+    @property
+    def number_of_location_bins(self) -> int:
+        return len(self.cell_offsets) - 1
+
+    @property
+    def number_of_cells(self) -> int:
+        return len(self.cell_time_bins)
+
+    def location_bin_edges(self) -> np.ndarray:
+        """ The edges of the location bins
+
+        :return: number_of_location_bins + 1 edges in meters
+        """
+        return (self.first_location_bin + np.arange(self.number_of_location_bins + 1)) * self.location_bin_width
+
+    def inner_location_bins(self, minimum_location: float, maximum_location: float) -> Tuple[int, int]:
+        """ Find the location bins that are completely within a location range
+
+        :param minimum_location: start of the range
+        :param maximum_location: end of the range
+        :return: first and end (exclusive) location bin, the same if no bin is within the range
+        """
+        edges = self.location_bin_edges()
+        first = min(int(np.searchsorted(edges, minimum_location, side="left")), self.number_of_location_bins)
+        end = max(first, int(np.searchsorted(edges, maximum_location, side="right")) - 1)
+        return first, end
+
+    def event_offsets(self, location_index: PartialDischargeLocationIndex) -> np.ndarray:
+        """ Find the events of every location bin in a location index
+
+        :param location_index: the location index the cube was created from
+        :return: the events of location bin k are at positions [offsets[k], offsets[k + 1]) in location order
+        """
+        return self.__event_offsets(location_index, self.location_bin_edges())
+
+    def can_resample_to(self, time_resolution: str) -> bool:
+        """ Check if the cube can be resampled to a time resolution without the raw events. Every time bucket of the
+        cube must fall within one bucket of the time resolution, so the resolution must be a multiple of the time
+        resolution of the cube.
+
+        :param time_resolution: time resolution of the resampling
+        :return: True if the cube can be resampled to the time resolution
+        """
+        cube_offset, offset = self.__to_offset(self.time_resolution), self.__to_offset(time_resolution)
+        return cube_offset is not None and offset is not None and offset.nanos % cube_offset.nanos == 0
+
+    def can_aggregate(self, statistic: str) -> bool:
+        """ Check if the cube has a statistic
+
+        :param statistic: one of STATISTICS
+        :return: True if the statistic can be aggregated
+        """
+        return statistic in self.STATISTICS
+
+    def aggregate(self, statistic: str, first_location_bin: int, end_location_bin: int,
+                  time_bin_of_cube_time_bin: np.ndarray, number_of_time_bins: int) -> np.ndarray:
+        """ Aggregate a statistic of the cells of a range of location bins to time bins
+
+        :param statistic: one of STATISTICS, see can_aggregate
+        :param first_location_bin: first location bin
+        :param end_location_bin: end (exclusive) location bin
+        :param time_bin_of_cube_time_bin: the time bin of every time bucket of the cube
+        :param number_of_time_bins: number of time bins
+        :return: the statistic of every time bin, the maximum is NaN for time bins without events
+        """
+        cells = slice(self.cell_offsets[first_location_bin], self.cell_offsets[end_location_bin])
+        time_bins = time_bin_of_cube_time_bin[self.cell_time_bins[cells]]
+        if statistic == "max":
+            maxima = np.full(number_of_time_bins, np.nan)
+            np.fmax.at(maxima, time_bins, self.maxima[cells])
+            return maxima
+        values = {"sum": self.sums, "count": self.counts, "squared_sum": self.squared_sums}[statistic][cells]
+        # bincount returns integers when there are no cells
+        aggregated = np.bincount(time_bins, weights=values, minlength=number_of_time_bins).astype(np.float64)
+        return aggregated.astype(np.int64) if statistic == "count" else aggregated
+
+    @classmethod
+    def from_location_index(cls, location_index: PartialDischargeLocationIndex, time_resolution: str,
+                            location_bin_width: float) -> "PartialDischargeCube":
+        """ Create the cube of the events of a location index
+
+        :param location_index: the location index of the partial discharge data
+        :param time_resolution: time resolution of the time buckets
+        :param location_bin_width: width of the location bins in meters
+        :return: a PartialDischargeCube
+        """
+        time_bins = location_index.time_bins(time_resolution)
+        if len(location_index) == 0:
+            first_location_bin, number_of_location_bins = 0, 0
+        else:
+            first_location_bin = int(np.floor(location_index.locations[0] / location_bin_width))
+            number_of_location_bins = int(np.floor(location_index.locations[-1] / location_bin_width)) - \
+                first_location_bin + 1
+        edges = (first_location_bin + np.arange(number_of_location_bins + 1)) * location_bin_width
+        event_offsets = cls.__event_offsets(location_index, edges)
+        location_bin_of_event = np.repeat(np.arange(number_of_location_bins), np.diff(event_offsets))
+        time_bin_of_event = np.searchsorted(time_bins.asi8, location_index.datetimes.view(np.int64), side="right") - 1
+
+        cell_of_event = location_bin_of_event * len(time_bins) + time_bin_of_event
+        cell_order = np.argsort(cell_of_event, kind="stable")
+        cells, cell_starts, cell_inverse = np.unique(cell_of_event[cell_order], return_index=True,
+                                                     return_inverse=True)
+        charges = np.asarray(location_index.charges, dtype=np.float64)[cell_order]
+        maxima = np.maximum.reduceat(charges, cell_starts) if len(cells) > 0 else np.empty(0)
+        location_bin_of_cell = cells // max(len(time_bins), 1)
+        return cls(time_resolution=time_resolution,
+                   location_bin_width=location_bin_width,
+                   first_location_bin=first_location_bin,
+                   time_bins=time_bins,
+                   cell_offsets=np.searchsorted(location_bin_of_cell, np.arange(number_of_location_bins + 1)),
+                   cell_time_bins=cells % max(len(time_bins), 1),
+                   sums=np.bincount(cell_inverse, weights=charges, minlength=len(cells)).astype(np.float64),
+                   counts=np.bincount(cell_inverse, weights=charges != 0, minlength=len(cells)).astype(np.int64),
+                   maxima=maxima,
+                   squared_sums=np.bincount(cell_inverse, weights=charges ** 2, minlength=len(cells)).astype(
+                       np.float64),
+                   number_of_events=len(location_index))
+
+    @staticmethod
+    def __event_offsets(location_index: PartialDischargeLocationIndex, edges: np.ndarray) -> np.ndarray:
+        """ Find the events of every location bin with a binary search. The events are sorted by location, so the
+        events of a location bin are contiguous. The first and last bin hold all events, also when rounding puts an
+        event just outside the edges.
+
+        :param location_index: the location index
+        :param edges: the edges of the location bins
+        :return: the events of location bin k are at positions [offsets[k], offsets[k + 1]) in location order
+        """
+        event_offsets = np.searchsorted(location_index.locations, edges, side="left")
+        if len(event_offsets) > 0:
+            event_offsets[0], event_offsets[-1] = 0, len(location_index)
+        return event_offsets
+
+    @staticmethod
+    def __to_offset(time_resolution: str) -> Optional[Tick]:
+        """ Get the fixed frequency of a time resolution
+
+        :param time_resolution: time resolution like 1min, 1H or 1D
+        :return: the fixed frequency, or None if the resolution is not fixed, like months
+        """
+        try:
+            offset = to_offset(time_resolution)
+        except ValueError:
+            return None
+        return offset if isinstance(offset, Tick) else None
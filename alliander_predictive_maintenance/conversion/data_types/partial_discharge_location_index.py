@@ -0,0 +1,110 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(eq=False)
+class PartialDischargeLocationIndex:
+    """ Partial discharge events sorted by location.
+    locations, charges and datetimes are in location order. time_order holds the position of every event in the
+    time order of the partial discharge data, see sorted_by_time."""
+    locations: np.ndarray
+    charges: np.ndarray
+    datetimes: np.ndarray
+    time_order: np.ndarray
+    datetime_name: str
+    __time_bins: Dict[str, pd.DatetimeIndex] = field(default_factory=dict, init=False, repr=False)
+    __datetimes_in_time_order: Optional[pd.DatetimeIndex] = field(default=None, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    def window(self, location: float, half_width: float) -> Tuple[int, int]:
+        """ Find the events with a location in [location - half_width, location + half_width] using a binary search
+
+        :param location: center of the window
+        :param half_width: half of the width of the window
+        :return: start and end position of the window in location order
+        """
+        start = np.searchsorted(self.locations, self.__to_location_dtype(location - half_width, np.inf), side="left")
+        end = np.searchsorted(self.locations, self.__to_location_dtype(location + half_width, -np.inf), side="right")
+        return int(start), int(end)
+
+    def __to_location_dtype(self, value: float, direction: float) -> np.generic:
+        """ Convert a bound to the dtype of the locations, so the binary search does not convert all locations. A bound
+        that can not be represented is rounded towards the inside of the window, which selects the same locations.
+
+        :param value: the bound
+        :param direction: np.inf to round a lower bound up, -np.inf to round an upper bound down
+        :return: the bound in the dtype of the locations
+        """
+        if not np.issubdtype(self.locations.dtype, np.floating):
+            return value
+        bound = self.locations.dtype.type(value)
+        if (bound < value) if direction > 0 else (bound > value):
+            bound = np.nextafter(bound, self.locations.dtype.type(direction))
+        return bound
+
+    def time_bins(self, time_resolution: str) -> pd.DatetimeIndex:
+        """ The bins of resampling all events to a time resolution. The bins are cached per time resolution.
+
+        :param time_resolution: time resolution of the resampling
+        :return: the labels of the time bins
+        """
+        if time_resolution not in self.__time_bins:
+            datetimes = pd.DatetimeIndex(self.datetimes, name=self.datetime_name)
+            if len(datetimes) > 0:
+                # resampling only the first and last timestamp yields exactly the bins of resampling all events
+                datetimes = datetimes[[datetimes.argmin(), datetimes.argmax()]]
+            self.__time_bins[time_resolution] = pd.Series(0, index=datetimes).resample(time_resolution).sum().index
+        return self.__time_bins[time_resolution]
+
+    def datetimes_in_time_order(self) -> pd.DatetimeIndex:
+        """ The datetimes of all events in time order. The index is created once and is monotonic increasing if the
+        index is sorted by time.
+
+        :return: a DatetimeIndex of all events
+        """
+        if self.__datetimes_in_time_order is None:
+            datetimes = np.empty_like(self.datetimes)
+            datetimes[self.time_order] = self.datetimes
+            self.__datetimes_in_time_order = pd.DatetimeIndex(datetimes, name=self.datetime_name)
+        return self.__datetimes_in_time_order
+
+    def sorted_by_time(self) -> "PartialDischargeLocationIndex":
+        """ Get the index with a time order in which the datetimes are monotonic increasing. Events with the same
+        datetime keep their order. Only time_order is renumbered, so memory-mapped arrays are not copied.
+
+        :return: this index if it is sorted by time already, else a sorted copy
+        """
+        datetimes_in_time_order = self.datetimes_in_time_order()
+        if datetimes_in_time_order.is_monotonic_increasing:
+            return self
+        # the rank of every event among the datetimes in time order
+        time_rank = np.empty(len(self), dtype=np.int64)
+        time_rank[np.argsort(datetimes_in_time_order.asi8, kind="stable")] = np.arange(len(self))
+        return PartialDischargeLocationIndex(locations=self.locations, charges=self.charges, datetimes=self.datetimes,
+                                             time_order=time_rank[self.time_order],
+                                             datetime_name=self.datetime_name)
+
+    @classmethod
+    def from_data_frame(cls, data_frame: pd.DataFrame, datetime_column: str, location_column: str,
+                        charge_column: str) -> "PartialDischargeLocationIndex":
+        """ Create the index from a partial discharge dataframe. The events do not need to be sorted by time, the
+        index is sorted by time.
+
+        :param data_frame: partial discharge dataframe
+        :param datetime_column: column with the datetimes of the events
+        :param location_column: column with the locations of the events
+        :param charge_column: column with the charges of the events
+        :return: a PartialDischargeLocationIndex
+        """
+        locations = data_frame[location_column].to_numpy()
+        location_order = np.argsort(locations, kind="stable")
+        return cls(locations=locations[location_order],
+                   charges=data_frame[charge_column].to_numpy()[location_order],
+                   datetimes=data_frame[datetime_column].to_numpy()[location_order],
+                   time_order=location_order,
+                   datetime_name=datetime_column).sorted_by_time()
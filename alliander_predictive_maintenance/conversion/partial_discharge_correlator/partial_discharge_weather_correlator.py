@@ -1,37 +1,55 @@
+import threading
+import weakref
+from typing import Dict, List, Sequence, Tuple
+
 import numpy as np
+import pandas as pd
 
 from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import PredictiveMaintenanceJointData
 from alliander_predictive_maintenance.conversion.partial_discharge_correlator.partial_discharge_weather_correlator_results import \
     PartialDischargeWeatherCorrelatorResults
+from alliander_predictive_maintenance.conversion.partial_discharge_correlator.prepared_weather import PreparedWeather
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
 
 
 class PartialDischargeWeatherCorrelator:
-    """ A class for calculating correlations between partial discharge and weather data. """
+    """ A class for calculating correlations between partial discharge and weather data. The input data is never
+    modified. The weather of a circuit is prepared once and kept for as long as its data frames exist, so many joints
+    can be correlated against the same weather, also from multiple threads. The weather data frames must not be
+    modified after they are correlated. """
     PARTIAL_DISCHARGE_COLUMN = "partial_discharge"
+    RESAMPLE_METHODS = [np.sum, np.median, np.mean, np.min, np.max]
+    CDS_IGNORED_COLUMNS = ['lat', 'lon', 'is_permanent_data', 'mean_wave_direction']
+    KNMI_IGNORED_COLUMNS = ['lat', 'lon']
+    JOINT_INDEX_NAMES = ["circuit_id", "location_in_meters", "partial_discharge_feature"]
+    TIME_COLUMN = "time"
+
+    def __init__(self):
+        self.__prepared_weathers: Dict[Tuple[int, int], PreparedWeather] = {}
+        self.__lock = threading.Lock()
 
+    @instrumentation.traced()
     def correlate(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData,
-                  rolling_days: int) -> PartialDischargeWeatherCorrelatorResults:
+                  rolling_days: int, partial_discharge_only: bool = False) -> PartialDischargeWeatherCorrelatorResults:
         """ Calculate Pearson Correlation Coefficient for Partial Discharge data and weather data
 
         :param predictive_maintenance_joint_data: PredictiveMaintenanceJointData object
         :param rolling_days: number of days to use for a moving average
+        :param partial_discharge_only: only calculate the correlations between partial discharge and weather features,
+            instead of between all features. The correlations have the partial discharge features as columns and the
+            weather features as index.
         :return: PartialDischargeWeatherCorrelatorResults
         """
-        predictive_maintenance_joint_data.knmi_weather.drop(['lat', 'lon'], axis=1, inplace=True, errors='ignore')
-        predictive_maintenance_joint_data.cds_weather.drop(['lat', 'lon', 'is_permanent_data', 'mean_wave_direction'],
-                                                           axis=1, inplace=True,
-                                                           errors='ignore')
-        data_frame = predictive_maintenance_joint_data.cds_weather.set_index("time").join(
-            predictive_maintenance_joint_data.partial_discharge.rename(self.PARTIAL_DISCHARGE_COLUMN))
-
-        data_frame_resampled = data_frame.resample("1d").agg([np.sum, np.median, np.mean, np.min, np.max])
-        data_frame_resampled['partial_discharge_cumsum'] = data_frame_resampled.partial_discharge['sum'].cumsum()
-        data_frame_resampled['partial_discharge_cumsum_gradient'] = np.gradient(
-            data_frame_resampled['partial_discharge_cumsum'])
+        if partial_discharge_only:
+            correlations = self.correlate_many([predictive_maintenance_joint_data], rolling_days)
+            return PartialDischargeWeatherCorrelatorResults(correlations.droplevel([0, 1]).T)
 
-        data_frame_resampled.columns = ['_'.join(col).strip('_') for col in data_frame_resampled.columns]
-        data_frame_resampled = data_frame_resampled.join(
-            predictive_maintenance_joint_data.knmi_weather.set_index("time"))
+        prepared_weather = self.__get_prepared_weather(predictive_maintenance_joint_data)
+        partial_discharge_resampled = pd.DataFrame(
+            self.__create_partial_discharge_features(prepared_weather, [predictive_maintenance_joint_data])[:, 0],
+            index=prepared_weather.cds_resampled.index, columns=self.__get_partial_discharge_feature_names())
+        data_frame_resampled = pd.concat([prepared_weather.cds_resampled, partial_discharge_resampled,
+                                          prepared_weather.knmi_resampled], axis=1)
 
         data_frame_rolling = data_frame_resampled.rolling(rolling_days).mean()
 
@@ -39,3 +57,211 @@ class PartialDischargeWeatherCorrelator:
         corr_matrix.fillna(0, inplace=True)
 
         return PartialDischargeWeatherCorrelatorResults(corr_matrix)
+
+    @instrumentation.traced()
+    def correlate_many(self, predictive_maintenance_joint_datas: Sequence[PredictiveMaintenanceJointData],
+                       rolling_days: int) -> pd.DataFrame:
+        """ Calculate the Pearson Correlation Coefficients between the partial discharge features and the weather
+        features of many joints. The correlations equal those of correlate, but weather-vs-weather pairs are not
+        computed, and joints that share their weather data frames are correlated together in one matrix product.
+
+        :param predictive_maintenance_joint_datas: PredictiveMaintenanceJointData objects. Joints of a circuit should
+            share the weather data frames of the circuit.
+        :param rolling_days: number of days to use for a moving average
+        :return: correlations with a row per joint and partial discharge feature, indexed by circuit_id,
+            location_in_meters and partial_discharge_feature, and a column per weather feature
+        """
+        joints_per_weather: Dict[Tuple[int, int], List[int]] = {}
+        for joint, predictive_maintenance_joint_data in enumerate(predictive_maintenance_joint_datas):
+            joints_per_weather.setdefault((id(predictive_maintenance_joint_data.cds_weather),
+                                           id(predictive_maintenance_joint_data.knmi_weather)), []).append(joint)
+
+        joint_correlations: List[pd.DataFrame] = [None] * len(predictive_maintenance_joint_datas)
+        for joints in joints_per_weather.values():
+            weather_joint_datas = [predictive_maintenance_joint_datas[joint] for joint in joints]
+            for joint, correlations in zip(joints, self.__correlate_shared_weather(weather_joint_datas, rolling_days)):
+                joint_correlations[joint] = correlations
+        return pd.concat(joint_correlations, keys=[
+            (predictive_maintenance_joint_data.circuit_id, predictive_maintenance_joint_data.location_in_meters)
+            for predictive_maintenance_joint_data in predictive_maintenance_joint_datas],
+            names=self.JOINT_INDEX_NAMES)
+
+    def __correlate_shared_weather(self, predictive_maintenance_joint_datas: List[PredictiveMaintenanceJointData],
+                                   rolling_days: int) -> List[pd.DataFrame]:
+        """ Calculate the correlations of joints that share their weather data frames
+
+        :param predictive_maintenance_joint_datas: PredictiveMaintenanceJointData objects with the same weather
+        :param rolling_days: number of days to use for a moving average
+        :return: correlations of every joint, with a row per partial discharge feature and a column per weather feature
+        """
+        prepared_weather = self.__get_prepared_weather(predictive_maintenance_joint_datas[0])
+        weather_rolling = prepared_weather.weather_resampled.rolling(rolling_days).mean()
+        partial_discharge_feature_names = self.__get_partial_discharge_feature_names()
+        # one column per joint and feature, with the features of a joint next to each other
+        partial_discharge_rolling = pd.DataFrame(
+            self.__create_partial_discharge_features(prepared_weather, predictive_maintenance_joint_datas).reshape(
+                len(weather_rolling), -1)).rolling(rolling_days).mean().to_numpy()
+
+        correlations = self.__pairwise_complete_correlation(weather_rolling.to_numpy(np.float64),
+                                                            partial_discharge_rolling)
+        correlations = np.nan_to_num(correlations, nan=0.0).T.reshape(
+            len(predictive_maintenance_joint_datas), len(partial_discharge_feature_names), -1)
+        return [pd.DataFrame(joint_correlations, index=partial_discharge_feature_names,
+                             columns=weather_rolling.columns) for joint_correlations in correlations]
+
+    def __get_prepared_weather(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> \
+            PreparedWeather:
+        """ Get the prepared weather of a joint, preparing it if its weather data frames were not correlated before.
+        The prepared weather is forgotten when one of the data frames is garbage collected, so the identity of the data
+        frames is a safe key.
+
+        :param predictive_maintenance_joint_data: PredictiveMaintenanceJointData object
+        :return: the prepared weather
+        """
+        cds_weather = predictive_maintenance_joint_data.cds_weather
+        knmi_weather = predictive_maintenance_joint_data.knmi_weather
+        key = (id(cds_weather), id(knmi_weather))
+        with self.__lock:
+            prepared_weather = self.__prepared_weathers.get(key)
+        instrumentation.count("cache_misses" if prepared_weather is None else "cache_hits", cache="prepared_weather")
+        if prepared_weather is not None:
+            return prepared_weather
+        # the weather is prepared outside the lock, so other weather can be prepared at the same time
+        prepared_weather = self.__prepare_weather(cds_weather, knmi_weather)
+        with self.__lock:
+            if key not in self.__prepared_weathers:
+                self.__prepared_weathers[key] = prepared_weather
+                for weather in [cds_weather, knmi_weather]:
+                    weakref.finalize(weather, self.__prepared_weathers.pop, key, None)
+            return self.__prepared_weathers[key]
+
+    def __prepare_weather(self, cds_weather: pd.DataFrame, knmi_weather: pd.DataFrame) -> PreparedWeather:
+        """ Resample the weather of a circuit to days, without modifying it
+
+        :param cds_weather: hourly CDS weather with a time column
+        :param knmi_weather: daily KNMI weather with a time column
+        :return: the prepared weather
+        """
+        cds_time_index = pd.Index(cds_weather[self.TIME_COLUMN])
+        cds_columns = [column for column in cds_weather.columns
+                       if column not in self.CDS_IGNORED_COLUMNS and column != self.TIME_COLUMN]
+        cds_resampled = cds_weather[cds_columns].set_axis(cds_time_index).resample("1d").agg(self.RESAMPLE_METHODS)
+        cds_resampled.columns = ['_'.join(col).strip('_') for col in cds_resampled.columns]
+        knmi_columns = [column for column in knmi_weather.columns
+                        if column not in self.KNMI_IGNORED_COLUMNS and column != self.TIME_COLUMN]
+        knmi_resampled = cds_resampled[[]].join(knmi_weather[knmi_columns].set_axis(
+            pd.Index(knmi_weather[self.TIME_COLUMN])))
+        return PreparedWeather(cds_time_index=cds_time_index, cds_resampled=cds_resampled,
+                               knmi_resampled=knmi_resampled,
+                               weather_resampled=pd.concat([cds_resampled, knmi_resampled], axis=1))
+
+    def __create_partial_discharge_features(self, prepared_weather: PreparedWeather,
+                                            predictive_maintenance_joint_datas: Sequence[
+                                                PredictiveMaintenanceJointData]) -> np.ndarray:
+        """ Resample the partial discharge of joints on the days of their weather. Daily partial discharge, like joints
+        created from a daily partial discharge cube, is aligned to the days directly.
+
+        :param prepared_weather: the prepared weather of the joints
+        :param predictive_maintenance_joint_datas: PredictiveMaintenanceJointData objects with the same weather
+        :return: the daily partial discharge features, with a row per day, a column per joint and a feature per
+            partial discharge feature name
+        """
+        if prepared_weather.cds_time_index.is_unique and all(
+                self.__is_daily(predictive_maintenance_joint_data.partial_discharge.index)
+                for predictive_maintenance_joint_data in predictive_maintenance_joint_datas):
+            partial_discharge_features = self.__create_daily_partial_discharge_features(
+                prepared_weather, predictive_maintenance_joint_datas)
+        else:
+            partial_discharge_features = self.__create_hourly_partial_discharge_features(
+                prepared_weather, predictive_maintenance_joint_datas)
+        partial_discharge_cumsum = np.cumsum(partial_discharge_features[0], axis=0)
+        partial_discharge_features += [partial_discharge_cumsum, np.gradient(partial_discharge_cumsum, axis=0)]
+        return np.stack(partial_discharge_features, axis=2)
+
+    def __create_daily_partial_discharge_features(self, prepared_weather: PreparedWeather,
+                                                  predictive_maintenance_joint_datas: Sequence[
+                                                      PredictiveMaintenanceJointData]) -> List[np.ndarray]:
+        """ Align daily partial discharge to the days of the weather. Every day has at most one value, at the weather
+        time of its midnight, so its sum is the value or 0 and its other statistics are the value or NaN. This equals
+        reindexing to the weather times and resampling to days.
+
+        :param prepared_weather: the prepared weather of the joints
+        :param predictive_maintenance_joint_datas: PredictiveMaintenanceJointData objects with the same weather
+        :return: a matrix per resample method, with a row per day and a column per joint
+        """
+        days = prepared_weather.cds_resampled.index
+        partial_discharge = np.column_stack(
+            [predictive_maintenance_joint_data.partial_discharge.reindex(days).to_numpy(np.float64)
+             for predictive_maintenance_joint_data in predictive_maintenance_joint_datas])
+        partial_discharge[~days.isin(prepared_weather.cds_time_index)] = np.nan
+        return [np.nan_to_num(partial_discharge, nan=0.0) if method is np.sum else partial_discharge
+                for method in self.RESAMPLE_METHODS]
+
+    def __create_hourly_partial_discharge_features(self, prepared_weather: PreparedWeather,
+                                                   predictive_maintenance_joint_datas: Sequence[
+                                                       PredictiveMaintenanceJointData]) -> List[np.ndarray]:
+        """ Reindex the partial discharge to the times of the weather and resample it to days
+
+        :param prepared_weather: the prepared weather of the joints
+        :param predictive_maintenance_joint_datas: PredictiveMaintenanceJointData objects with the same weather
+        :return: a matrix per resample method, with a row per day and a column per joint
+        """
+        partial_discharge = pd.DataFrame(
+            {joint: predictive_maintenance_joint_data.partial_discharge.reindex(prepared_weather.cds_time_index)
+             for joint, predictive_maintenance_joint_data in enumerate(predictive_maintenance_joint_datas)})
+        partial_discharge_resampler = partial_discharge.resample("1d")
+        return [partial_discharge_resampler.agg(method).to_numpy(np.float64) for method in self.RESAMPLE_METHODS]
+
+    def __get_partial_discharge_feature_names(self) -> List[str]:
+        """ Get the names of the daily partial discharge features """
+        return [f"{self.PARTIAL_DISCHARGE_COLUMN}_{method.__name__}" for method in self.RESAMPLE_METHODS] + \
+            [f"{self.PARTIAL_DISCHARGE_COLUMN}_cumsum", f"{self.PARTIAL_DISCHARGE_COLUMN}_cumsum_gradient"]
+
+    @staticmethod
+    def __is_daily(index: pd.Index) -> bool:
+        """ Check if partial discharge has at most one value per day, at midnight
+
+        :param index: the times of the partial discharge
+        :return: True if all times are unique midnights
+        """
+        return isinstance(index, pd.DatetimeIndex) and index.tz is None and index.is_unique and \
+            bool((index.asi8 % pd.Timedelta(days=1).value == 0).all())
+
+    @staticmethod
+    def __pairwise_complete_correlation(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """ Calculate the Pearson Correlation Coefficient of every column of x with every column of y, over the rows
+        where both are known, like DataFrame.corr. All sums over the common rows of a pair are matrix products of the
+        values with the masks of the known values.
+
+        :param x: values with a row per day, NaN where unknown
+        :param y: values with a row per day, NaN where unknown
+        :return: the correlation of every column of x (rows) with every column of y (columns), NaN for pairs with
+            fewer than two common rows or without variance
+        """
+        x_known, y_known = ~np.isnan(x), ~np.isnan(y)
+        # shifting by a known value of every column keeps precision for values far from zero
+        x = np.where(x_known, x - PartialDischargeWeatherCorrelator.__first_known_values(x, x_known), 0.0)
+        y = np.where(y_known, y - PartialDischargeWeatherCorrelator.__first_known_values(y, y_known), 0.0)
+        x_known, y_known = x_known.astype(np.float64), y_known.astype(np.float64)
+
+        counts = x_known.T @ y_known
+        x_sums, y_sums = x.T @ y_known, x_known.T @ y
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariances = x.T @ y - x_sums * y_sums / counts
+            x_variances = (x ** 2).T @ y_known - x_sums ** 2 / counts
+            y_variances = x_known.T @ y ** 2 - y_sums ** 2 / counts
+            divisors = np.sqrt(np.maximum(x_variances, 0.0) * np.maximum(y_variances, 0.0))
+            correlations = np.where((counts > 1) & (divisors > 0), covariances / divisors, np.nan)
+        return np.clip(correlations, -1.0, 1.0)
+
+    @staticmethod
+    def __first_known_values(values: np.ndarray, known: np.ndarray) -> np.ndarray:
+        """ Get the first known value of every column, or 0 for columns without known values
+
+        :param values: values with a row per day
+        :param known: mask of the known values
+        :return: the first known value of every column
+        """
+        first_known_rows = known.argmax(axis=0)
+        first_known_values = values[first_known_rows, np.arange(values.shape[1])]
+        return np.where(known.any(axis=0), first_known_values, 0.0)
@@ -6,7 +6,9 @@ from alliander_predictive_maintenance.conversion.partial_discharge_correlator.we
 
 @dataclass
 class PartialDischargeWeatherCorrelatorResults:
-    """ A data class that contains partial discharge and weather correlation results. """
+    """ A data class that contains partial discharge and weather correlation results.
+    correlations: the correlation matrix of all features, or the partial discharge features as columns and the
+    weather features as index. """
     correlations: pd.Series
 
     @property
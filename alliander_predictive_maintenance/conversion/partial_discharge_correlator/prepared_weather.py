@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+
+@dataclass
+class PreparedWeather:
+    """ The weather of a circuit, prepared once for correlating many joints.
+    cds_time_index: the hourly times of the CDS weather, that the partial discharge is aligned to.
+    cds_resampled: the daily aggregates of the CDS weather. knmi_resampled: the KNMI weather on the same days.
+    weather_resampled: cds_resampled and knmi_resampled side by side. """
+    cds_time_index: pd.Index
+    cds_resampled: pd.DataFrame
+    knmi_resampled: pd.DataFrame
+    weather_resampled: pd.DataFrame
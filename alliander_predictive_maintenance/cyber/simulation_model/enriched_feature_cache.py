@@ -0,0 +1,151 @@
+import dataclasses
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from pandas.util import hash_pandas_object
+
+from alliander_predictive_maintenance.constants import INVALID_PATH
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.lru_cache import LruCache
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
+
+
+class EnrichedFeatureCache:
+    """ A content-addressed cache of enriched joint data. The key is a fingerprint of the values, index and columns of
+    the weather and partial discharge data, the lags and the methods, so identical inputs share their features no
+    matter which objects hold them. Entries are kept in an in-memory LRU cache, and optionally in a folder on disk
+    that outlives the process. Methods are identified by their module and qualified name, so lambdas and local functions
+    have no key and their enrichment is not cached. The cached data is shared, so it must not be modified. """
+    CACHE_FILE_SUFFIX = ".pickle"
+
+    def __init__(self, max_entries: int = 128, cache_absolute_root_folder: Optional[Path] = None):
+        """
+        :param max_entries: maximum number of enriched joint datas kept in memory
+        :param cache_absolute_root_folder: folder of the on-disk tier, or None to only cache in memory
+        """
+        if cache_absolute_root_folder is not None and not cache_absolute_root_folder.is_dir():
+            raise ValueError(INVALID_PATH.format(path=cache_absolute_root_folder))
+        self.cache_absolute_root_folder = cache_absolute_root_folder
+        self.__cache = LruCache(max_entries)
+
+    def __len__(self) -> int:
+        return len(self.__cache)
+
+    def get_or_enrich(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData, lags: List[int],
+                      methods: List[Union[str, Callable]],
+                      enrich: Callable[[PredictiveMaintenanceJointData], PredictiveMaintenanceJointData]) -> \
+            PredictiveMaintenanceJointData:
+        """ Get the enriched data from the cache, or enrich and cache it
+
+        :param predictive_maintenance_joint_data: historical weather and partial discharge data
+        :param lags: list with numbers of lags of the enrichment
+        :param methods: methods of the enrichment
+        :param enrich: function that enriches the data when it is not cached
+        :return: the enriched data, with the circuit id and location of the given data
+        """
+        key = self.get_key(predictive_maintenance_joint_data, lags, methods)
+        if key is None:
+            instrumentation.count("cache_misses", cache="enriched_features")
+            return enrich(predictive_maintenance_joint_data)
+        enriched_predictive_maintenance_joint_data = self.__cache.get(key)
+        if enriched_predictive_maintenance_joint_data is None:
+            enriched_predictive_maintenance_joint_data = self.__read(key)
+            if enriched_predictive_maintenance_joint_data is None:
+                instrumentation.count("cache_misses", cache="enriched_features")
+                enriched_predictive_maintenance_joint_data = enrich(predictive_maintenance_joint_data)
+                self.__write(key, enriched_predictive_maintenance_joint_data)
+            else:
+                instrumentation.count("cache_hits", cache="enriched_features_disk")
+            self.__cache.put(key, enriched_predictive_maintenance_joint_data)
+        else:
+            instrumentation.count("cache_hits", cache="enriched_features")
+        # identical data of another joint has the same features
+        return dataclasses.replace(enriched_predictive_maintenance_joint_data,
+                                   circuit_id=predictive_maintenance_joint_data.circuit_id,
+                                   location_in_meters=predictive_maintenance_joint_data.location_in_meters)
+
+    def get_key(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData, lags: List[int],
+                methods: List[Union[str, Callable]]) -> Optional[str]:
+        """ Get the fingerprint of the enrichment of joint data
+
+        :param predictive_maintenance_joint_data: historical weather and partial discharge data
+        :param lags: list with numbers of lags of the enrichment
+        :param methods: methods of the enrichment
+        :return: a hexadecimal SHA-1 digest, or None if a method cannot be identified
+        """
+        method_keys = [self.__get_method_key(method) for method in methods]
+        if None in method_keys:
+            return None
+        digest = hashlib.sha1()
+        for data in [predictive_maintenance_joint_data.cds_weather,
+                     predictive_maintenance_joint_data.partial_discharge]:
+            digest.update(hash_pandas_object(data, index=True).to_numpy().tobytes())
+            names = data.columns if isinstance(data, pd.DataFrame) else [data.name]
+            digest.update(repr([str(name) for name in names]).encode())
+            digest.update(repr([str(dtype) for dtype in np.atleast_1d(data.dtypes)]).encode())
+        digest.update(repr([int(lag) for lag in lags]).encode())
+        digest.update(repr(method_keys).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def __get_method_key(method: Union[str, Callable]) -> Optional[str]:
+        """ Get the name that identifies a method of the enrichment across processes
+
+        :param method: method of the enrichment
+        :return: the name of a pandas method, the module and qualified name of a function, or None for a lambda, a
+            local function or a callable without a qualified name
+        """
+        if isinstance(method, str):
+            return method
+        if isinstance(method, np.ufunc):
+            return f"numpy.{method.__name__}"
+        module = getattr(method, "__module__", None)
+        qualname = getattr(method, "__qualname__", None)
+        if module is None or qualname is None or "<lambda>" in qualname or "<locals>" in qualname:
+            return None
+        return f"{module}.{qualname}"
+
+    def clear(self) -> None:
+        """ Remove all entries from memory. The on-disk tier is kept. """
+        self.__cache.clear()
+
+    def __read(self, key: str) -> Optional[PredictiveMaintenanceJointData]:
+        """ Read an entry from the on-disk tier
+
+        :param key: fingerprint of the entry
+        :return: the enriched data, or None if it is not on disk
+        """
+        if self.cache_absolute_root_folder is None:
+            return None
+        cache_absolute_file_path = self.__get_cache_absolute_file_path(key)
+        if not cache_absolute_file_path.is_file():
+            return None
+        with open(cache_absolute_file_path, "rb") as file:
+            return pickle.load(file)
+
+    def __write(self, key: str, enriched_predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> None:
+        """ Write an entry to the on-disk tier, through a temporary file so readers never see a partial file
+
+        :param key: fingerprint of the entry
+        :param enriched_predictive_maintenance_joint_data: the enriched data
+        """
+        if self.cache_absolute_root_folder is None:
+            return
+        cache_absolute_file_path = self.__get_cache_absolute_file_path(key)
+        temporary_file_path = cache_absolute_file_path.with_name(f"{cache_absolute_file_path.name}.{os.getpid()}.tmp")
+        with open(temporary_file_path, "wb") as file:
+            pickle.dump(enriched_predictive_maintenance_joint_data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_path, cache_absolute_file_path)
+
+    def __get_cache_absolute_file_path(self, key: str) -> Path:
+        """ Get the file of an entry in the on-disk tier
+
+        :param key: fingerprint of the entry
+        """
+        return self.cache_absolute_root_folder / f"{key}{self.CACHE_FILE_SUFFIX}"
@@ -0,0 +1,57 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LruCache:
+    """ A thread-safe in-memory cache that evicts the least recently used entry when it is full """
+    def __init__(self, max_entries: int):
+        """
+        :param max_entries: maximum number of entries in the cache
+        """
+        self.__max_entries = max_entries
+        self.__entries: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """ Get an entry and mark it as most recently used
+
+        :param key: key of the entry
+        :return: the entry, or None if it is not cached
+        """
+        with self.__lock:
+            if key not in self.__entries:
+                return None
+            self.__entries.move_to_end(key)
+            return self.__entries[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """ Add or replace an entry, evicting the least recently used entries when the cache is full
+
+        :param key: key of the entry
+        :param value: the entry
+        """
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def remove(self, key: Hashable) -> None:
+        """ Remove an entry if it is cached
+
+        :param key: key of the entry
+        """
+        with self.__lock:
+            self.__entries.pop(key, None)
+
+    def clear(self) -> None:
+        """ Remove all entries """
+        with self.__lock:
+            self.__entries.clear()
@@ -0,0 +1,125 @@
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+from sklearn.metrics import r2_score
+
+from alliander_predictive_maintenance.constants import FLEET_INPUT_LENGTH
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model_results import \
+    PartialDischargeForecasterModelResults
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_linear_parameters import \
+    PartialDischargeLinearParameters
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_model_registry import \
+    PartialDischargeModelRegistry
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
+
+
+class PartialDischargeFleetPredictor:
+    """ Predict partial discharge for many joints at once. The models are linear, so the exogenous part of every
+    forecast is computed up front, and the recursive multi-step forecast runs over all joints together, one step at a
+    time. The predictions equal those of PartialDischargeForecaster.predict per joint. """
+    def __init__(self, partial_discharge_model_registry: PartialDischargeModelRegistry):
+        """
+        :param partial_discharge_model_registry: registry with the fitted model of every joint
+        """
+        self.__partial_discharge_model_registry = partial_discharge_model_registry
+
+    def predict(self, predictive_maintenance_joint_datas: Sequence[PredictiveMaintenanceJointData],
+                partial_discharge_forecaster_model: PartialDischargeForecasterModel) -> \
+            List[PartialDischargeForecasterModelResults]:
+        """ Predict partial discharge on historical data for every joint with its model from the registry
+
+        :param predictive_maintenance_joint_datas: historical weather and partial discharge data for every joint
+        :param partial_discharge_forecaster_model: model type of the forecasters
+        :return: model results for every joint, in the order of the joints
+        """
+        partial_discharge_forecasters = [
+            self.__partial_discharge_model_registry.load(predictive_maintenance_joint_data.circuit_id,
+                                                         predictive_maintenance_joint_data.location_in_meters,
+                                                         partial_discharge_forecaster_model)
+            for predictive_maintenance_joint_data in predictive_maintenance_joint_datas]
+        return self.predict_with_forecasters(partial_discharge_forecasters, predictive_maintenance_joint_datas)
+
+    @instrumentation.traced()
+    def predict_with_forecasters(self, partial_discharge_forecasters: Sequence[PartialDischargeForecaster],
+                                 predictive_maintenance_joint_datas: Sequence[PredictiveMaintenanceJointData]) -> \
+            List[PartialDischargeForecasterModelResults]:
+        """ Predict partial discharge on historical data for every joint with the given fitted forecasters
+
+        :param partial_discharge_forecasters: fitted forecaster of every joint
+        :param predictive_maintenance_joint_datas: historical weather and partial discharge data for every joint
+        :return: model results for every joint, in the order of the joints
+        """
+        if len(partial_discharge_forecasters) != len(predictive_maintenance_joint_datas):
+            raise ValueError(FLEET_INPUT_LENGTH.format(forecasters=len(partial_discharge_forecasters),
+                                                       joints=len(predictive_maintenance_joint_datas)))
+        enriched_joint_datas = [
+            partial_discharge_forecaster.enrich_input_data(predictive_maintenance_joint_data)
+            for partial_discharge_forecaster, predictive_maintenance_joint_data
+            in zip(partial_discharge_forecasters, predictive_maintenance_joint_datas)]
+        linear_parameters = [partial_discharge_forecaster.get_linear_parameters()
+                             for partial_discharge_forecaster in partial_discharge_forecasters]
+
+        # joints are predicted together when their models have the same lags
+        joints_per_lags: Dict[Tuple[int, ...], List[int]] = {}
+        for joint, parameters in enumerate(linear_parameters):
+            joints_per_lags.setdefault(tuple(parameters.lags), []).append(joint)
+
+        results: List[PartialDischargeForecasterModelResults] = [None] * len(enriched_joint_datas)
+        for joints in joints_per_lags.values():
+            predictions = self.__recursive_predict([linear_parameters[joint] for joint in joints],
+                                                   [enriched_joint_datas[joint].cds_weather for joint in joints])
+            for joint, joint_predictions in zip(joints, predictions):
+                joint_predictions[joint_predictions < 0] = 0
+                true_partial_discharge = enriched_joint_datas[joint].partial_discharge
+                results[joint] = PartialDischargeForecasterModelResults(
+                    joint_predictions, true_partial_discharge, r2_score(true_partial_discharge, joint_predictions))
+        return results
+
+    @staticmethod
+    def __recursive_predict(linear_parameters: List[PartialDischargeLinearParameters],
+                            exogs: List[pd.DataFrame]) -> List[pd.Series]:
+        """ Forecast every joint recursively for as many steps as it has rows of exogenous features, where every
+        forecast is a predictor of the next steps. All joints have the same lags.
+
+        :param linear_parameters: parameters of the model of every joint
+        :param exogs: exogenous features of every joint
+        :return: the unclipped forecasts of every joint, indexed from the end of its training data on
+        """
+        lags = linear_parameters[0].lags
+        window_size = int(lags.max())
+        steps = np.array([len(exog) for exog in exogs])
+        number_of_joints, max_steps = len(exogs), int(steps.max(initial=0))
+
+        # the exogenous part and the intercept of every forecast do not depend on the recursion
+        exog_contributions = np.zeros((number_of_joints, max_steps))
+        for joint, (parameters, exog) in enumerate(zip(linear_parameters, exogs)):
+            exog_contributions[joint, :len(exog)] = \
+                exog[parameters.exog_columns].to_numpy(np.float64) @ parameters.exog_coefficients + parameters.intercept
+
+        lag_coefficients = np.stack([parameters.lag_coefficients for parameters in linear_parameters])
+        forecasts = np.zeros((number_of_joints, window_size + max_steps))
+        forecasts[:, :window_size] = np.stack([parameters.last_window.to_numpy(np.float64)[-window_size:]
+                                               for parameters in linear_parameters])
+        lag_positions = window_size - lags
+        for step in range(max_steps):
+            forecasts[:, window_size + step] = \
+                np.einsum("jl,jl->j", lag_coefficients, forecasts[:, lag_positions + step]) + \
+                exog_contributions[:, step]
+
+        predictions = []
+        for joint, parameters in enumerate(linear_parameters):
+            last_window_index = parameters.last_window.index
+            frequency = to_offset(last_window_index.freq)
+            predictions.append(pd.Series(
+                forecasts[joint, window_size:window_size + steps[joint]],
+                index=pd.date_range(last_window_index[-1] + frequency, periods=steps[joint], freq=frequency),
+                name="pred"))
+        return predictions
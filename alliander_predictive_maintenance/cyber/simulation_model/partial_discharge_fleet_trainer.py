@@ -0,0 +1,97 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from alliander_predictive_maintenance.constants import INVALID_PATH
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_fleet_training_result import \
+    PartialDischargeFleetTrainingResult
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model_results import \
+    PartialDischargeForecasterModelResults
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_model_registry import \
+    PartialDischargeModelRegistry
+
+
+class PartialDischargeFleetTrainer:
+    """ Train a PartialDischargeForecaster for every joint of a fleet on a process pool """
+    def __init__(self, partial_discharge_forecaster_model: PartialDischargeForecasterModel, lags: List[int],
+                 model_absolute_root_folder: Optional[Path] = None, max_workers: Optional[int] = None,
+                 max_pending_joints: Optional[int] = None):
+        """
+        :param partial_discharge_forecaster_model: model type of the forecasters
+        :param lags: list with numbers of lags
+        :param model_absolute_root_folder: root folder of the PartialDischargeModelRegistry the model of every joint is
+            saved to, or None to not save the models
+        :param max_workers: number of processes, defaults to the number of CPUs
+        :param max_pending_joints: maximum number of joints that are submitted but not finished. This bounds the
+            memory use, as the joint data is only read from the iterable when there is room. Defaults to twice the
+            number of processes.
+        """
+        if model_absolute_root_folder is not None and not model_absolute_root_folder.is_dir():
+            raise ValueError(INVALID_PATH.format(path=model_absolute_root_folder))
+        self.__partial_discharge_forecaster_model = partial_discharge_forecaster_model
+        self.__lags = lags
+        self.__model_absolute_root_folder = model_absolute_root_folder
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__max_pending_joints = max_pending_joints or 2 * self.__max_workers
+
+    def fit(self, predictive_maintenance_joint_datas: Iterable[PredictiveMaintenanceJointData], train_size: float) -> \
+            Iterator[PartialDischargeFleetTrainingResult]:
+        """ Train a model for every joint. The results are yielded as soon as a joint is trained, so not in the order
+        of the joints. A joint that fails is reported in its result and does not stop the other joints.
+
+        :param predictive_maintenance_joint_datas: historical weather and partial discharge data for every joint
+        :param train_size: ratio of training set. Usually 0.8 or 0.7.
+        :return: an iterator of a PartialDischargeFleetTrainingResult per joint
+        """
+        predictive_maintenance_joint_datas = iter(predictive_maintenance_joint_datas)
+        with ProcessPoolExecutor(max_workers=self.__max_workers) as process_pool:
+            pending_futures: Dict[Future, PredictiveMaintenanceJointData] = {}
+            while True:
+                for predictive_maintenance_joint_data in predictive_maintenance_joint_datas:
+                    future = process_pool.submit(self._fit_joint, self.__partial_discharge_forecaster_model,
+                                                 self.__lags, predictive_maintenance_joint_data, train_size,
+                                                 self.__model_absolute_root_folder)
+                    pending_futures[future] = predictive_maintenance_joint_data
+                    if len(pending_futures) >= self.__max_pending_joints:
+                        break
+                if not pending_futures:
+                    return
+                done_futures, _ = wait(pending_futures, return_when=FIRST_COMPLETED)
+                for future in done_futures:
+                    predictive_maintenance_joint_data = pending_futures.pop(future)
+                    result = PartialDischargeFleetTrainingResult(
+                        circuit_id=predictive_maintenance_joint_data.circuit_id,
+                        location_in_meters=predictive_maintenance_joint_data.location_in_meters)
+                    try:
+                        result.model_results = future.result()
+                    except Exception as error:
+                        result.error = error
+                    yield result
+
+    @staticmethod
+    def _fit_joint(partial_discharge_forecaster_model: PartialDischargeForecasterModel, lags: List[int],
+                   predictive_maintenance_joint_data: PredictiveMaintenanceJointData, train_size: float,
+                   model_absolute_root_folder: Optional[Path]) -> Dict[str, PartialDischargeForecasterModelResults]:
+        """ Train and save the model of one joint. Runs in a worker process, so it is a static method.
+
+        :param partial_discharge_forecaster_model: model type of the forecaster
+        :param lags: list with numbers of lags
+        :param predictive_maintenance_joint_data: historical weather and partial discharge data of the joint
+        :param train_size: ratio of training set
+        :param model_absolute_root_folder: root folder to save the model to, or None to not save it
+        :return: model results dict for `train` and `test` keys
+        """
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, lags)
+        model_results = partial_discharge_forecaster.fit(predictive_maintenance_joint_data, train_size)
+        if model_absolute_root_folder is not None:
+            PartialDischargeModelRegistry(model_absolute_root_folder, max_cached_models=1).save(
+                predictive_maintenance_joint_data.circuit_id, predictive_maintenance_joint_data.location_in_meters,
+                partial_discharge_forecaster)
+        return model_results
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model_results import \
+    PartialDischargeForecasterModelResults
+
+
+@dataclass
+class PartialDischargeFleetTrainingResult:
+    """ The outcome of training the model of one joint in a fleet. Either model_results or error is set.
+    model_results: model results dict for `train` and `test` keys. """
+    circuit_id: int
+    location_in_meters: float
+    model_results: Optional[Dict[str, PartialDischargeForecasterModelResults]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
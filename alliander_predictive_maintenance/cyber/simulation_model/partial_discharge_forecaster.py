@@ -1,37 +1,70 @@
 import numpy as np
+import os
 import pandas as pd
 import pickle
+import warnings
 from pathlib import Path
 from skforecast.ForecasterAutoreg import ForecasterAutoreg
 from sklearn.linear_model import Lasso
 from sklearn.metrics import r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.svm import LinearSVR
-from typing import List, Dict
+from typing import Any, Callable, Dict, List, Optional, Union
 
 from alliander_predictive_maintenance.constants import INVALID_ENUM_INPUT, WEATHER_DATA_MANDATORY, \
-    WEATHER_DATA_DATETIME_INDEX, PARTIAL_DISCHARGE_DATA_DATETIME_INDEX
+    WEATHER_DATA_DATETIME_INDEX, PARTIAL_DISCHARGE_DATA_DATETIME_INDEX, FORECASTER_NOT_FITTED
 from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
     PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.enriched_feature_cache import EnrichedFeatureCache
 from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
     PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_linear_parameters import \
+    PartialDischargeLinearParameters
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_streaming_state import \
+    PartialDischargeStreamingState
 from alliander_predictive_maintenance.cyber.simulation_model.weather_and_partial_discharge_transformer import \
     WeatherAndPartialDischargeTransformer
 from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model_results import PartialDischargeForecasterModelResults
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
 
 
 class PartialDischargeForecaster:
     """ A model for forecasting Partial Discharge """
     WEATHER_COLUMNS = ["soil_temperature_level_3", "volumetric_soil_water_layer_3"]
     PARTIAL_DISCHARGE_COLUMN = "partial_discharge"
+    ENRICHMENT_METHODS = [np.mean, np.std, np.min, np.max]
+    # every array in a parameter file costs a header to parse, so related values share an array:
+    # schema: model, index frequency and exog columns. coefficients: intercept and coefficients.
+    # datetimes: start and end of the training range and the index of the last window.
+    PARAMETER_SCHEMA = "schema"
+    PARAMETER_FEATURE_LAGS = "feature_lags"
+    PARAMETER_FEATURE_METHODS = "feature_methods"
+    PARAMETER_COEFFICIENTS = "coefficients"
+    PARAMETER_LAST_WINDOW = "last_window"
+    PARAMETER_DATETIMES = "datetimes"
 
-    def __init__(self, partial_discharge_forecaster_model: PartialDischargeForecasterModel, lags: List[int]):
+    def __init__(self, partial_discharge_forecaster_model: PartialDischargeForecasterModel, lags: List[int],
+                 methods: Optional[List[Union[str, Callable]]] = None,
+                 regressor_parameters: Optional[Dict[str, Any]] = None,
+                 enriched_feature_cache: Optional[EnrichedFeatureCache] = None):
+        """
+        :param partial_discharge_forecaster_model: model type of the forecaster
+        :param lags: list with numbers of lags of the rolling features
+        :param methods: methods of the rolling features, defaults to ENRICHMENT_METHODS
+        :param regressor_parameters: parameters of the regressor, like `alpha` of Lasso or `C` of LinearSVR
+        :param enriched_feature_cache: cache of the enriched features, shared between forecasters, or None to enrich
+            the data on every call
+        """
         self.__partial_discharge_forecaster_model = partial_discharge_forecaster_model
         self.__lags = lags
+        self.__methods = list(self.ENRICHMENT_METHODS if methods is None else methods)
+        self.__regressor_parameters = regressor_parameters or {}
+        self.__enriched_feature_cache = enriched_feature_cache
         self.__forecaster = None
         self.__load_forecaster()
         self.__transformer = WeatherAndPartialDischargeTransformer(self.WEATHER_COLUMNS, self.PARTIAL_DISCHARGE_COLUMN)
 
+    @instrumentation.traced()
     def fit(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData, train_size: float) -> \
             Dict[str, PartialDischargeForecasterModelResults]:
         """ Train the partial discharge forecasting model on historical data
@@ -40,12 +73,10 @@ class PartialDischargeForecaster:
         :param train_size: ratio of training set. Usually 0.8 or 0.7.
         :return: model results dict for `train` and `test` keys
         """
-        self.__check_input_data(predictive_maintenance_joint_data)
-        enriched_predictive_maintenance_joint_data = self.__enrich_features(predictive_maintenance_joint_data)
+        enriched_predictive_maintenance_joint_data = self.enrich_input_data(predictive_maintenance_joint_data)
         exog_train, exog_test, endog_train, endog_test = train_test_split(
             enriched_predictive_maintenance_joint_data.cds_weather, enriched_predictive_maintenance_joint_data.partial_discharge,
             train_size=train_size, shuffle=False)
-        self.__forecaster.fit(y=endog_train, exog=exog_train)
         circuit_id = predictive_maintenance_joint_data.circuit_id
         location_in_meters = predictive_maintenance_joint_data.location_in_meters
         predictive_maintenance_joint_data_train = PredictiveMaintenanceJointData(cds_weather=exog_train,
@@ -58,8 +89,25 @@ class PartialDischargeForecaster:
                                                                                 partial_discharge=endog_test,
                                                                                 circuit_id=circuit_id,
                                                                                 location_in_meters=location_in_meters)
-        return self.__validate_train(predictive_maintenance_joint_data_train, predictive_maintenance_joint_data_test)
+        return self.fit_enriched_data(predictive_maintenance_joint_data_train, predictive_maintenance_joint_data_test)
+
+    @instrumentation.traced()
+    def fit_enriched_data(self, enriched_predictive_maintenance_joint_data_train: PredictiveMaintenanceJointData,
+                          enriched_predictive_maintenance_joint_data_test: PredictiveMaintenanceJointData) -> \
+            Dict[str, PartialDischargeForecasterModelResults]:
+        """ Train the partial discharge forecasting model on data that is already enriched with enrich_input_data, so
+        forecasters with the same lags and methods can share the enrichment
+
+        :param enriched_predictive_maintenance_joint_data_train: enriched train data
+        :param enriched_predictive_maintenance_joint_data_test: enriched test data, directly after the train data
+        :return: model results dict for `train` and `test` keys
+        """
+        self.__forecaster.fit(y=enriched_predictive_maintenance_joint_data_train.partial_discharge,
+                              exog=enriched_predictive_maintenance_joint_data_train.cds_weather)
+        return self.__validate_train(enriched_predictive_maintenance_joint_data_train,
+                                     enriched_predictive_maintenance_joint_data_test)
 
+    @instrumentation.traced()
     def predict(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> \
             PartialDischargeForecasterModelResults:
         """ Predict partial discharge on historical data
@@ -67,8 +115,7 @@ class PartialDischargeForecaster:
         :param predictive_maintenance_joint_data: historical weather and partial discharge data. Must be of same length.
         :return: model results
         """
-        self.__check_input_data(predictive_maintenance_joint_data)
-        enriched_predictive_maintenance_joint_data = self.__enrich_features(predictive_maintenance_joint_data)
+        enriched_predictive_maintenance_joint_data = self.enrich_input_data(predictive_maintenance_joint_data)
         predictions = self.__forecaster.predict(steps=len(enriched_predictive_maintenance_joint_data.cds_weather),
                                                 exog=enriched_predictive_maintenance_joint_data.cds_weather)
         predictions[predictions < 0] = 0
@@ -76,19 +123,176 @@ class PartialDischargeForecaster:
         return PartialDischargeForecasterModelResults(
             predictions, enriched_predictive_maintenance_joint_data.partial_discharge, score)
 
+    @instrumentation.traced()
+    def enrich_input_data(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> \
+            PredictiveMaintenanceJointData:
+        """ Check the input data and enrich its features, as the model uses them in fit and predict
+
+        :param predictive_maintenance_joint_data: historical weather and partial discharge data. Must be of same length.
+        :return: enriched data
+        """
+        self.__check_input_data(predictive_maintenance_joint_data)
+        return self.__enrich_features(predictive_maintenance_joint_data)
+
+    def get_linear_parameters(self) -> PartialDischargeLinearParameters:
+        """ Get the parameters of the fitted linear model
+
+        :return: the coefficients, intercept and last window of the model
+        """
+        self.__check_fitted()
+        coefficients = np.asarray(self.__forecaster.regressor.coef_, dtype=np.float64).ravel()
+        number_of_lags = len(self.__forecaster.lags)
+        return PartialDischargeLinearParameters(
+            lags=np.asarray(self.__forecaster.lags),
+            lag_coefficients=coefficients[:number_of_lags],
+            exog_coefficients=coefficients[number_of_lags:],
+            intercept=float(np.atleast_1d(self.__forecaster.regressor.intercept_)[0]),
+            exog_columns=list(self.__forecaster.exog_col_names),
+            last_window=self.__forecaster.last_window)
+
+    def initialize_streaming(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> \
+            PartialDischargeStreamingState:
+        """ Create the state for streaming forecasts with predict_streaming from the history of a joint
+
+        :param predictive_maintenance_joint_data: historical weather and partial discharge data. Must be of same length.
+        :return: the streaming state after the historical data
+        """
+        self.__check_input_data(predictive_maintenance_joint_data)
+        self.__check_fitted()
+        rolling_feature_state = self.__transformer.initialize_incremental_state(
+            predictive_maintenance_joint_data, lags=self.__lags, methods=self.__methods)
+        last_window = rolling_feature_state.resampled_data_frame[self.PARTIAL_DISCHARGE_COLUMN].to_numpy()
+        return PartialDischargeStreamingState(rolling_feature_state=rolling_feature_state,
+                                              last_window=self.__pad_last_window(last_window))
+
+    def predict_streaming(self, partial_discharge_streaming_state: PartialDischargeStreamingState,
+                          predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> pd.Series:
+        """ Forecast the partial discharge of new days one step ahead, using the streaming state instead of the
+        history. Every day is forecast from the observed partial discharge of the days before it and the weather and
+        partial discharge features of the day, and then the state is updated with its observations, so the cost per
+        day does not depend on the length of the history.
+
+        :param partial_discharge_streaming_state: the streaming state, from initialize_streaming or a previous call
+        :param predictive_maintenance_joint_data: new weather and partial discharge data of complete days, starting on
+            a day after the last day of the state
+        :return: the forecast of every new day with known features
+        """
+        self.__check_input_data(predictive_maintenance_joint_data)
+        self.__check_fitted()
+        forecasts = {}
+        days = predictive_maintenance_joint_data.partial_discharge.index.normalize()
+        for day in days.unique():
+            previous_data_frame = partial_discharge_streaming_state.rolling_feature_state.resampled_data_frame
+            day_data = PredictiveMaintenanceJointData(
+                cds_weather=predictive_maintenance_joint_data.cds_weather,
+                knmi_weather=None,
+                partial_discharge=predictive_maintenance_joint_data.partial_discharge[days == day],
+                circuit_id=predictive_maintenance_joint_data.circuit_id,
+                location_in_meters=predictive_maintenance_joint_data.location_in_meters)
+            enriched_day_data = self.__transformer.transform_incremental(
+                partial_discharge_streaming_state.rolling_feature_state, day_data)
+            if len(enriched_day_data.cds_weather) > 0:
+                # the predictors are ordered like in ForecasterAutoreg: the lags first, then the exogenous features
+                predictors = np.hstack([partial_discharge_streaming_state.last_window[-self.__forecaster.lags],
+                                        enriched_day_data.cds_weather.to_numpy()[-1]])
+                with warnings.catch_warnings():
+                    # the regressor was fitted with feature names, like in ForecasterAutoreg predict with an array
+                    warnings.simplefilter("ignore")
+                    forecast = self.__forecaster.regressor.predict(predictors.reshape(1, -1))[0]
+                forecasts[enriched_day_data.cds_weather.index[-1]] = max(forecast, 0)
+            # the state also holds the missing days between the previous data and the day, which shift the lags
+            resampled_data_frame = partial_discharge_streaming_state.rolling_feature_state.resampled_data_frame
+            if len(previous_data_frame) > 0:
+                resampled_data_frame = resampled_data_frame[resampled_data_frame.index > previous_data_frame.index[-1]]
+            partial_discharge_streaming_state.last_window = self.__pad_last_window(np.append(
+                partial_discharge_streaming_state.last_window,
+                resampled_data_frame[self.PARTIAL_DISCHARGE_COLUMN].to_numpy()))
+        return pd.Series(forecasts, name=self.PARTIAL_DISCHARGE_COLUMN, dtype=float)
+
+    @property
+    def partial_discharge_forecaster_model(self) -> PartialDischargeForecasterModel:
+        return self.__partial_discharge_forecaster_model
+
+    @property
+    def lags(self) -> List[int]:
+        return self.__lags
+
+    @property
+    def methods(self) -> List[Union[str, Callable]]:
+        return self.__methods
+
     def save_weights(self, absolute_path: Path):
         """ Save the model weights
         :param absolute_path: path of model parameters
         """
-        pickle.dump(self.__forecaster,
-                    open(absolute_path / f"{self.__partial_discharge_forecaster_model}.pickle", 'wb'))
+        with open(absolute_path / f"{self.__partial_discharge_forecaster_model}.pickle", 'wb') as file:
+            pickle.dump(self.__forecaster, file)
 
     def load_weights(self, absolute_path: Path):
         """ Load the model weights
         :param absolute_path: path of model parameters
         """
-        self.__forecaster = pickle.load(
-            open(absolute_path / f"{self.__partial_discharge_forecaster_model}.pickle", 'rb'))
+        with open(absolute_path / f"{self.__partial_discharge_forecaster_model}.pickle", 'rb') as file:
+            self.__forecaster = pickle.load(file)
+
+    def save_parameters(self, absolute_file_path: Path):
+        """ Save the fitted linear coefficients and the feature schema as arrays in an .npz file. Unlike save_weights,
+        no objects are pickled, so loading is fast and does not execute code.
+
+        :param absolute_file_path: path of the .npz file
+        """
+        self.__check_fitted()
+        last_window = self.__forecaster.last_window
+        parameters = {
+            self.PARAMETER_SCHEMA: np.array([self.__partial_discharge_forecaster_model.name,
+                                             self.__forecaster.index_freq or ""] + self.__forecaster.exog_col_names),
+            self.PARAMETER_FEATURE_LAGS: np.array(self.__lags, dtype=np.int64),
+            self.PARAMETER_FEATURE_METHODS: np.array([self.__get_method_name(method) for method in self.__methods]),
+            self.PARAMETER_COEFFICIENTS: np.concatenate([np.atleast_1d(self.__forecaster.regressor.intercept_),
+                                                         self.__forecaster.regressor.coef_]).astype(np.float64),
+            self.PARAMETER_LAST_WINDOW: last_window.to_numpy(dtype=np.float64),
+            self.PARAMETER_DATETIMES: np.concatenate([self.__forecaster.training_range.to_numpy("datetime64[ns]"),
+                                                      last_window.index.to_numpy("datetime64[ns]")]),
+        }
+        temporary_file_path = absolute_file_path.with_name(f"{absolute_file_path.name}.tmp")
+        with open(temporary_file_path, "wb") as file:
+            np.savez(file, **parameters)
+        os.replace(temporary_file_path, absolute_file_path)
+
+    @classmethod
+    def from_parameters(cls, absolute_file_path: Path) -> "PartialDischargeForecaster":
+        """ Create a fitted forecaster from the parameters saved with save_parameters
+
+        :param absolute_file_path: path of the .npz file
+        :return: the fitted forecaster
+        """
+        with np.load(absolute_file_path, allow_pickle=False) as parameter_file:
+            parameters = {name: parameter_file[name] for name in parameter_file.files}
+        methods = [cls.__get_method(method_name) for method_name in parameters[cls.PARAMETER_FEATURE_METHODS].tolist()]
+        partial_discharge_forecaster = cls(PartialDischargeForecasterModel[str(parameters[cls.PARAMETER_SCHEMA][0])],
+                                           parameters[cls.PARAMETER_FEATURE_LAGS].tolist(), methods)
+        partial_discharge_forecaster.__restore_forecaster(parameters)
+        return partial_discharge_forecaster
+
+    @staticmethod
+    def __get_method_name(method: Union[str, Callable]) -> str:
+        """ Get the name of a rolling feature method to save it
+
+        :param method: method of the rolling features
+        :return: the name of the method
+        """
+        return method if isinstance(method, str) else method.__name__
+
+    @staticmethod
+    def __get_method(method_name: str) -> Union[str, Callable]:
+        """ Get the rolling feature method of a saved name. Numpy functions are saved with their name, other methods
+        are names that pandas understands.
+
+        :param method_name: the saved name of the method
+        :return: the method
+        """
+        method = getattr(np, method_name, None)
+        return method if callable(method) and method.__name__ == method_name else method_name
 
     def __check_input_data(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData):
         """ Check the input data
@@ -102,15 +306,73 @@ class PartialDischargeForecaster:
         if not isinstance(predictive_maintenance_joint_data.partial_discharge.index, pd.DatetimeIndex):
             raise ValueError(PARTIAL_DISCHARGE_DATA_DATETIME_INDEX)
 
+    def __restore_forecaster(self, parameters: Dict[str, np.ndarray]):
+        """ Restore the state of a fitted ForecasterAutoreg and its linear regressor from saved parameters
+
+        :param parameters: the parameters saved with save_parameters
+        """
+        schema = parameters[self.PARAMETER_SCHEMA].tolist()
+        exog_col_names = schema[2:]
+        lag_col_names = [f"lag_{lag}" for lag in self.__forecaster.lags]
+        intercept = parameters[self.PARAMETER_COEFFICIENTS][:1]
+        coefficients = parameters[self.PARAMETER_COEFFICIENTS][1:]
+        regressor = self.__forecaster.regressor
+        regressor.coef_ = coefficients
+        # Lasso has a scalar intercept, LinearSVR an array with one intercept
+        regressor.intercept_ = float(intercept[0]) if isinstance(regressor, Lasso) else intercept
+        regressor.n_features_in_ = len(coefficients)
+        regressor.feature_names_in_ = np.array(lag_col_names + exog_col_names, dtype=object)
+
+        index_freq = schema[1] or None
+        datetimes = parameters[self.PARAMETER_DATETIMES]
+        self.__forecaster.included_exog = True
+        self.__forecaster.exog_type = pd.DataFrame
+        self.__forecaster.exog_col_names = exog_col_names
+        self.__forecaster.X_train_col_names = lag_col_names + exog_col_names
+        self.__forecaster.index_type = pd.DatetimeIndex
+        self.__forecaster.index_freq = index_freq
+        self.__forecaster.training_range = pd.DatetimeIndex(datetimes[:2])
+        self.__forecaster.last_window = pd.Series(
+            parameters[self.PARAMETER_LAST_WINDOW],
+            index=pd.DatetimeIndex(datetimes[2:], freq=index_freq),
+            name=self.PARTIAL_DISCHARGE_COLUMN)
+        self.__forecaster.fitted = True
+
+    def __check_fitted(self):
+        """ Check that the forecaster is fitted or loaded """
+        if not self.__forecaster.fitted:
+            raise ValueError(FORECASTER_NOT_FITTED)
+
+    def __pad_last_window(self, last_window: np.ndarray) -> np.ndarray:
+        """ Keep the last window_size values of the autoregressive predictors, padded with NaN when there are fewer
+
+        :param last_window: the observed daily partial discharge values
+        :return: the last window_size values
+        """
+        window_size = self.__forecaster.window_size
+        return np.concatenate([np.full(max(window_size - len(last_window), 0), np.nan), last_window[-window_size:]])
+
     def __enrich_features(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> \
             PredictiveMaintenanceJointData:
         """ Enrich the input features for the model
 
+        :param predictive_maintenance_joint_data: historical weather and partial discharge data. Must be of same length.
+        :return: enriched data
+        """
+        if self.__enriched_feature_cache is None:
+            return self.__transform(predictive_maintenance_joint_data)
+        return self.__enriched_feature_cache.get_or_enrich(predictive_maintenance_joint_data, self.__lags,
+                                                           self.__methods, self.__transform)
+
+    def __transform(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> \
+            PredictiveMaintenanceJointData:
+        """ Compute the enriched features of the input data
+
         :param predictive_maintenance_joint_data: historical weather and partial discharge data. Must be of same length.
         :return: enriched data
         """
         return self.__transformer.transform(
-            predictive_maintenance_joint_data, lags=self.__lags, methods=[np.mean, np.std, np.min, np.max])
+            predictive_maintenance_joint_data, lags=self.__lags, methods=self.__methods)
 
     def __validate_train(self,
                          predictive_maintenance_joint_data_train: PredictiveMaintenanceJointData,
@@ -139,8 +401,10 @@ class PartialDischargeForecaster:
     def __load_forecaster(self):
         """ Load the correct forecaster depending on the __partial_discharge_forecaster_model attribute """
         if self.__partial_discharge_forecaster_model == PartialDischargeForecasterModel.SVR:
-            self.__forecaster = ForecasterAutoreg(regressor=LinearSVR(random_state=0), lags=1)
+            self.__forecaster = ForecasterAutoreg(
+                regressor=LinearSVR(**{"random_state": 0, **self.__regressor_parameters}), lags=1)
         elif self.__partial_discharge_forecaster_model == PartialDischargeForecasterModel.LASSO:
-            self.__forecaster = ForecasterAutoreg(regressor=Lasso(random_state=0), lags=1)
+            self.__forecaster = ForecasterAutoreg(
+                regressor=Lasso(**{"random_state": 0, **self.__regressor_parameters}), lags=1)
         else:
             raise ValueError(f"{INVALID_ENUM_INPUT}: {self.__partial_discharge_forecaster_model}")
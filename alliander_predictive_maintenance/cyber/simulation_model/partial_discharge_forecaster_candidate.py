@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Union
+
+
+@dataclass
+class PartialDischargeForecasterCandidate:
+    """ A configuration of a PartialDischargeForecaster in a hyperparameter search.
+    lags: the lags of the rolling features. methods: the methods of the rolling features.
+    regressor_parameters: parameters of the regressor, like `alpha` of Lasso or `C` of LinearSVR. """
+    lags: List[int]
+    methods: List[Union[str, Callable]]
+    regressor_parameters: Dict[str, Any] = field(default_factory=dict)
@@ -0,0 +1,195 @@
+import itertools
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+from sklearn.model_selection import ParameterGrid, TimeSeriesSplit
+
+from alliander_predictive_maintenance.constants import INVALID_ENUM_INPUT, INVALID_NUMBER_OF_FOLDS, \
+    NO_SCORED_TUNING_CANDIDATES, NO_TUNING_CANDIDATES
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.enriched_feature_cache import EnrichedFeatureCache
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_candidate import \
+    PartialDischargeForecasterCandidate
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_search_strategy import \
+    PartialDischargeSearchStrategy
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_tuning_result import \
+    PartialDischargeTuningResult
+
+
+class PartialDischargeForecasterTuner:
+    """ Search the regularization, lags and rolling feature methods of a PartialDischargeForecaster per joint with
+    rolling-origin backtesting. Every fold trains on the data up to its origin and forecasts the data after it, and a
+    candidate scores the mean test r2 score of its folds, or NaN when one of its folds fails. The folds of all
+    candidates run in parallel on a process pool, and the enriched features come from an EnrichedFeatureCache, so they
+    are computed once per joint for every combination of lags and methods, as they do not depend on the
+    regularization, and not again when a joint is tuned again. """
+    def __init__(self, partial_discharge_forecaster_model: PartialDischargeForecasterModel,
+                 regressor_parameter_grid: Dict[str, List[Any]], lags_grid: List[List[int]],
+                 methods_grid: Optional[List[List[Union[str, Callable]]]] = None,
+                 search_strategy: PartialDischargeSearchStrategy = PartialDischargeSearchStrategy.GRID,
+                 n_random_candidates: int = 10, random_state: int = 0, n_folds: int = 3,
+                 max_workers: Optional[int] = None, enriched_feature_cache: Optional[EnrichedFeatureCache] = None):
+        """
+        :param partial_discharge_forecaster_model: model type of the forecasters
+        :param regressor_parameter_grid: values of every regressor parameter, like `{"alpha": [0.1, 1.0]}` for Lasso
+        :param lags_grid: lags of the rolling features to search
+        :param methods_grid: methods of the rolling features to search, defaults to the forecaster's ENRICHMENT_METHODS
+        :param search_strategy: search all candidates, or a random sample of them
+        :param n_random_candidates: number of candidates of a random search
+        :param random_state: seed of a random search
+        :param n_folds: number of rolling origins
+        :param max_workers: number of processes, defaults to the number of CPUs
+        :param enriched_feature_cache: cache of the enriched features, defaults to an in-memory cache
+        """
+        if n_folds < 2:
+            raise ValueError(INVALID_NUMBER_OF_FOLDS.format(n_folds=n_folds))
+        self.__partial_discharge_forecaster_model = partial_discharge_forecaster_model
+        self.__candidates = self.__create_candidates(
+            regressor_parameter_grid, lags_grid, methods_grid or [PartialDischargeForecaster.ENRICHMENT_METHODS],
+            search_strategy, n_random_candidates, random_state)
+        self.__n_folds = n_folds
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__enriched_feature_cache = enriched_feature_cache or EnrichedFeatureCache()
+
+    @property
+    def candidates(self) -> List[PartialDischargeForecasterCandidate]:
+        return self.__candidates
+
+    def tune(self, predictive_maintenance_joint_datas: Iterable[PredictiveMaintenanceJointData]) -> \
+            Iterator[PartialDischargeTuningResult]:
+        """ Find the best candidate for every joint. The results are yielded in the order of the joints. A joint that
+        fails, or of which no candidate could be scored, is reported in its result and does not stop the other joints.
+
+        :param predictive_maintenance_joint_datas: historical weather and partial discharge data for every joint
+        :return: an iterator of a PartialDischargeTuningResult per joint
+        """
+        with ProcessPoolExecutor(max_workers=self.__max_workers) as process_pool:
+            for predictive_maintenance_joint_data in predictive_maintenance_joint_datas:
+                try:
+                    yield self.__tune_joint(process_pool, predictive_maintenance_joint_data)
+                except Exception as error:
+                    yield PartialDischargeTuningResult(
+                        circuit_id=predictive_maintenance_joint_data.circuit_id,
+                        location_in_meters=predictive_maintenance_joint_data.location_in_meters,
+                        candidates=self.__candidates, error=error)
+
+    def __tune_joint(self, process_pool: ProcessPoolExecutor,
+                     predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> PartialDischargeTuningResult:
+        """ Score all candidates of one joint with their folds running in parallel
+
+        :param process_pool: the pool to run the folds on
+        :param predictive_maintenance_joint_data: historical weather and partial discharge data of the joint
+        :return: the tuning result of the joint
+        """
+        fold_futures: List[List[Future]] = []
+        for candidate in self.__candidates:
+            enriched_joint_data = PartialDischargeForecaster(
+                self.__partial_discharge_forecaster_model, candidate.lags, candidate.methods,
+                enriched_feature_cache=self.__enriched_feature_cache).enrich_input_data(
+                predictive_maintenance_joint_data)
+            folds = TimeSeriesSplit(n_splits=self.__n_folds).split(enriched_joint_data.cds_weather)
+            fold_futures.append([process_pool.submit(
+                self._score_fold, self.__partial_discharge_forecaster_model, candidate,
+                self.__slice(enriched_joint_data, train_indices), self.__slice(enriched_joint_data, test_indices))
+                for train_indices, test_indices in folds])
+
+        candidate_scores = [float(np.mean([self.__get_fold_score(future) for future in futures]))
+                            for futures in fold_futures]
+        tuning_result = PartialDischargeTuningResult(
+            circuit_id=predictive_maintenance_joint_data.circuit_id,
+            location_in_meters=predictive_maintenance_joint_data.location_in_meters, candidates=self.__candidates,
+            candidate_scores=candidate_scores)
+        if np.all(np.isnan(candidate_scores)):
+            tuning_result.error = ValueError(NO_SCORED_TUNING_CANDIDATES.format(
+                circuit_id=predictive_maintenance_joint_data.circuit_id,
+                location_in_meters=predictive_maintenance_joint_data.location_in_meters))
+            return tuning_result
+        best_candidate_index = int(np.nanargmax(candidate_scores))
+        tuning_result.best_candidate = self.__candidates[best_candidate_index]
+        tuning_result.best_score = candidate_scores[best_candidate_index]
+        return tuning_result
+
+    @staticmethod
+    def __get_fold_score(fold_future: Future) -> float:
+        """ Get the score of a fold. A fold that failed, like a regressor that does not accept its parameters, scores
+        NaN so that the other candidates are still scored.
+
+        :param fold_future: the future of _score_fold
+        :return: the test r2 score, or NaN when the fold failed
+        """
+        try:
+            return fold_future.result()
+        except Exception:
+            return np.nan
+
+    @staticmethod
+    def _score_fold(partial_discharge_forecaster_model: PartialDischargeForecasterModel,
+                    candidate: PartialDischargeForecasterCandidate,
+                    enriched_predictive_maintenance_joint_data_train: PredictiveMaintenanceJointData,
+                    enriched_predictive_maintenance_joint_data_test: PredictiveMaintenanceJointData) -> float:
+        """ Train a candidate on the data before the origin of a fold and score its forecast of the data after it.
+        Runs in a worker process, so it is a static method.
+
+        :param partial_discharge_forecaster_model: model type of the forecaster
+        :param candidate: the configuration of the forecaster
+        :param enriched_predictive_maintenance_joint_data_train: enriched data before the origin
+        :param enriched_predictive_maintenance_joint_data_test: enriched data after the origin
+        :return: the test r2 score
+        """
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, candidate.lags,
+                                                                  candidate.methods, candidate.regressor_parameters)
+        model_results = partial_discharge_forecaster.fit_enriched_data(enriched_predictive_maintenance_joint_data_train,
+                                                                       enriched_predictive_maintenance_joint_data_test)
+        return model_results["test"].r2_score
+
+    @staticmethod
+    def __create_candidates(regressor_parameter_grid: Dict[str, List[Any]], lags_grid: List[List[int]],
+                            methods_grid: List[List[Union[str, Callable]]],
+                            search_strategy: PartialDischargeSearchStrategy, n_random_candidates: int,
+                            random_state: int) -> List[PartialDischargeForecasterCandidate]:
+        """ Create the candidates of the search space
+
+        :param regressor_parameter_grid: values of every regressor parameter
+        :param lags_grid: lags of the rolling features to search
+        :param methods_grid: methods of the rolling features to search
+        :param search_strategy: search all candidates, or a random sample of them
+        :param n_random_candidates: number of candidates of a random search
+        :param random_state: seed of a random search
+        :return: the candidates to score
+        """
+        candidates = [PartialDischargeForecasterCandidate(lags=list(lags), methods=list(methods),
+                                                          regressor_parameters=regressor_parameters)
+                      for lags, methods, regressor_parameters in itertools.product(
+                          lags_grid, methods_grid, ParameterGrid(regressor_parameter_grid))]
+        if not candidates:
+            raise ValueError(NO_TUNING_CANDIDATES)
+        if search_strategy == PartialDischargeSearchStrategy.GRID:
+            return candidates
+        if search_strategy == PartialDischargeSearchStrategy.RANDOM:
+            candidate_indices = np.random.default_rng(random_state).choice(
+                len(candidates), size=min(n_random_candidates, len(candidates)), replace=False)
+            return [candidates[candidate_index] for candidate_index in sorted(candidate_indices)]
+        raise ValueError(f"{INVALID_ENUM_INPUT}: {search_strategy}")
+
+    @staticmethod
+    def __slice(enriched_predictive_maintenance_joint_data: PredictiveMaintenanceJointData,
+                indices: np.ndarray) -> PredictiveMaintenanceJointData:
+        """ Get the rows of a fold from enriched data
+
+        :param enriched_predictive_maintenance_joint_data: enriched data of a joint
+        :param indices: consecutive row numbers of the fold
+        :return: the enriched data of the fold
+        """
+        rows = slice(indices[0], indices[-1] + 1)
+        return PredictiveMaintenanceJointData(
+            cds_weather=enriched_predictive_maintenance_joint_data.cds_weather.iloc[rows], knmi_weather=None,
+            partial_discharge=enriched_predictive_maintenance_joint_data.partial_discharge.iloc[rows],
+            circuit_id=enriched_predictive_maintenance_joint_data.circuit_id,
+            location_in_meters=enriched_predictive_maintenance_joint_data.location_in_meters)
@@ -0,0 +1,19 @@
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class PartialDischargeLinearParameters:
+    """ The parameters of a fitted linear autoregressive partial discharge forecaster.
+    A forecast is the sum of lag_coefficients times the partial discharge at lags, exog_coefficients times the
+    exogenous features in exog_columns order, and intercept. last_window: the partial discharge at the end of the
+    training data, the lags of the first forecast. """
+    lags: np.ndarray
+    lag_coefficients: np.ndarray
+    exog_coefficients: np.ndarray
+    intercept: float
+    exog_columns: List[str]
+    last_window: pd.Series
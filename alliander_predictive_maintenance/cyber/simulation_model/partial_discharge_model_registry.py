@@ -0,0 +1,108 @@
+from pathlib import Path
+from typing import Iterator, Tuple, Union
+
+from alliander_predictive_maintenance.constants import INVALID_PATH, MODEL_NOT_FOUND
+from alliander_predictive_maintenance.cyber.simulation_model.lru_cache import LruCache
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
+
+
+class PartialDischargeModelRegistry:
+    """ Stores a fitted PartialDischargeForecaster per circuit, joint location and model type, as
+    <root>/<circuit_id>/<location_in_meters>/<model>.npz. The location is stored as a float, so 150 and 150.0 are the
+    same joint. Models are loaded lazily and kept in an in-memory LRU cache.
+    """
+    MODEL_FILE_SUFFIX = ".npz"
+
+    def __init__(self, model_absolute_root_folder: Path, max_cached_models: int = 1024):
+        """
+        :param model_absolute_root_folder: root folder of the models
+        :param max_cached_models: maximum number of models kept in memory
+        """
+        if not model_absolute_root_folder.is_dir():
+            raise ValueError(INVALID_PATH.format(path=model_absolute_root_folder))
+        self.model_absolute_root_folder = model_absolute_root_folder
+        self.__cache = LruCache(max_cached_models)
+
+    def save(self, circuit_id: int, location_in_meters: float,
+             partial_discharge_forecaster: PartialDischargeForecaster) -> None:
+        """ Save the fitted forecaster of a joint, replacing the model that is stored for it
+
+        :param circuit_id: ID of the circuit of the joint
+        :param location_in_meters: location of the joint in the circuit
+        :param partial_discharge_forecaster: the fitted forecaster
+        """
+        key = self.__get_key(circuit_id, location_in_meters,
+                             partial_discharge_forecaster.partial_discharge_forecaster_model)
+        model_absolute_file_path = self.__get_model_absolute_file_path(*key)
+        model_absolute_file_path.parent.mkdir(parents=True, exist_ok=True)
+        partial_discharge_forecaster.save_parameters(model_absolute_file_path)
+        self.__cache.put(key, partial_discharge_forecaster)
+
+    def load(self, circuit_id: int, location_in_meters: float,
+             partial_discharge_forecaster_model: PartialDischargeForecasterModel) -> PartialDischargeForecaster:
+        """ Load the fitted forecaster of a joint, from the cache or else from its file
+
+        :param circuit_id: ID of the circuit of the joint
+        :param location_in_meters: location of the joint in the circuit
+        :param partial_discharge_forecaster_model: model type of the forecaster
+        :return: the fitted forecaster
+        """
+        key = self.__get_key(circuit_id, location_in_meters, partial_discharge_forecaster_model)
+        partial_discharge_forecaster = self.__cache.get(key)
+        instrumentation.count("cache_misses" if partial_discharge_forecaster is None else "cache_hits",
+                              cache="partial_discharge_models")
+        if partial_discharge_forecaster is None:
+            model_absolute_file_path = self.__get_model_absolute_file_path(*key)
+            if not model_absolute_file_path.is_file():
+                raise FileNotFoundError(MODEL_NOT_FOUND.format(path=model_absolute_file_path))
+            partial_discharge_forecaster = PartialDischargeForecaster.from_parameters(model_absolute_file_path)
+            self.__cache.put(key, partial_discharge_forecaster)
+        return partial_discharge_forecaster
+
+    def contains(self, circuit_id: int, location_in_meters: float,
+                 partial_discharge_forecaster_model: PartialDischargeForecasterModel) -> bool:
+        """ Check if a model is stored for a joint
+
+        :param circuit_id: ID of the circuit of the joint
+        :param location_in_meters: location of the joint in the circuit
+        :param partial_discharge_forecaster_model: model type of the forecaster
+        """
+        return self.__get_model_absolute_file_path(
+            *self.__get_key(circuit_id, location_in_meters, partial_discharge_forecaster_model)).is_file()
+
+    def get_model_keys(self) -> Iterator[Tuple[int, float, PartialDischargeForecasterModel]]:
+        """ Get the circuit ID, joint location and model type of every stored model, without loading them
+
+        :return: an iterator of (circuit_id, location_in_meters, model type)
+        """
+        for model_absolute_file_path in self.model_absolute_root_folder.glob(f"*/*/*{self.MODEL_FILE_SUFFIX}"):
+            yield self.__get_key(model_absolute_file_path.parent.parent.name, model_absolute_file_path.parent.name,
+                                 PartialDischargeForecasterModel[model_absolute_file_path.stem])
+
+    @staticmethod
+    def __get_key(circuit_id: Union[int, str], location_in_meters: Union[float, str],
+                  partial_discharge_forecaster_model: PartialDischargeForecasterModel) \
+            -> Tuple[int, float, PartialDischargeForecasterModel]:
+        """ Get the key of the model of a joint, with the circuit ID as int and the location as float
+
+        :param circuit_id: ID of the circuit of the joint
+        :param location_in_meters: location of the joint in the circuit
+        :param partial_discharge_forecaster_model: model type of the forecaster
+        :return: the key of the model in the cache and in the folders
+        """
+        return int(circuit_id), float(location_in_meters), partial_discharge_forecaster_model
+
+    def __get_model_absolute_file_path(self, circuit_id: int, location_in_meters: float,
+                                       partial_discharge_forecaster_model: PartialDischargeForecasterModel) -> Path:
+        """ Get the file of the model of a joint
+
+        :param circuit_id: ID of the circuit of the joint
+        :param location_in_meters: location of the joint in the circuit, as float
+        :param partial_discharge_forecaster_model: model type of the forecaster
+        """
+        return (self.model_absolute_root_folder / str(circuit_id) / str(location_in_meters) /
+                f"{partial_discharge_forecaster_model.name}{self.MODEL_FILE_SUFFIX}")
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class PartialDischargeSearchStrategy(Enum):
+    """ An Enumeration to select how the hyperparameter search space is searched """
+    GRID = 0
+    RANDOM = 1
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from alliander_predictive_maintenance.cyber.simulation_model.rolling_feature_state import RollingFeatureState
+
+
+@dataclass
+class PartialDischargeStreamingState:
+    """ The state of streaming partial discharge forecasts for a joint.
+    last_window: the last observed daily partial discharge values, the autoregressive predictors of the next day. """
+    rolling_feature_state: RollingFeatureState
+    last_window: np.ndarray
@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_candidate import \
+    PartialDischargeForecasterCandidate
+
+
+@dataclass
+class PartialDischargeTuningResult:
+    """ The outcome of the hyperparameter search of one joint. Either best_candidate or error is set.
+    best_score: the mean test r2 score over the folds of the best candidate.
+    candidate_scores: the mean test r2 score of every candidate, in the order of candidates, or None if the joint failed
+    before its candidates were scored. """
+    circuit_id: int
+    location_in_meters: float
+    candidates: List[PartialDischargeForecasterCandidate]
+    candidate_scores: Optional[List[float]] = None
+    best_candidate: Optional[PartialDischargeForecasterCandidate] = None
+    best_score: Optional[float] = None
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
@@ -0,0 +1,183 @@
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from alliander_predictive_maintenance.constants import INVALID_LAGS
+
+
+class RollingFeatureEngine:
+    """ Compute rolling statistics for many lags and their first differences in one pass into a single matrix.
+    The result equals `data_frame.rolling(window=lag).agg(...)` followed by `diff()` for every lag, including the
+    column names, but mean, std and sum are computed from prefix sums and min and max from running extremes within
+    blocks of the window size, instead of calling the statistic per window. Methods that are not recognized are
+    computed with pandas. """
+    PREFIX_SUM_METHODS = {np.mean: "mean", "mean": "mean", np.std: "std", "std": "std", np.sum: "sum", "sum": "sum"}
+    SLIDING_WINDOW_METHODS = {np.min: "min", np.amin: "min", "min": "min", np.max: "max", np.amax: "max", "max": "max"}
+
+    def transform(self, data_frame: pd.DataFrame, columns: List[str], lags: List[int],
+                  methods: List[Union[str, Callable]]) -> pd.DataFrame:
+        """ Compute the rolling statistics of columns for every lag, followed by their first differences
+
+        :param data_frame: data frame with a row per time step
+        :param columns: columns to compute the rolling statistics of
+        :param lags: list with numbers of lags, the window sizes in rows
+        :param methods: statistics to compute for every window
+        :return: for every lag, the columns `{column}_{method}_{lag}_days` and then `{column}_{method}_{lag}_days_diff`
+        """
+        if not all(isinstance(lag, (int, np.integer)) and lag > 0 for lag in lags):
+            raise ValueError(INVALID_LAGS.format(lags=lags))
+        values = data_frame[columns].to_numpy(dtype=np.float64)
+        number_of_rows, number_of_columns = values.shape
+        block_size = number_of_columns * len(methods)
+        features = np.full((number_of_rows, 2 * len(lags) * block_size), np.nan)
+
+        # the prefix sums are shared by all lags. The values are shifted by their mean, so the sum of squares does not
+        # lose precision for values far from zero.
+        is_nan = np.isnan(values)
+        shift = self.__column_means(values, is_nan)
+        shifted_values = np.where(is_nan, 0.0, values - shift)
+        nan_prefix_sum = self.__prefix_sum(is_nan.astype(np.int64))
+        prefix_sum = self.__prefix_sum(shifted_values)
+        squared_prefix_sum = self.__prefix_sum(shifted_values ** 2)
+
+        feature_names = []
+        for lag_number, lag in enumerate(lags):
+            # a window longer than the data has no complete windows, so all its statistics stay NaN
+            lag_block = np.full((number_of_rows, number_of_columns, len(methods)), np.nan)
+            if lag <= number_of_rows:
+                window_nan_count = nan_prefix_sum[lag:] - nan_prefix_sum[:-lag]
+                window_sum = prefix_sum[lag:] - prefix_sum[:-lag]
+                window_squared_sum = squared_prefix_sum[lag:] - squared_prefix_sum[:-lag]
+                window_min = self.__sliding_window_extreme(values, lag, np.minimum)
+                window_max = self.__sliding_window_extreme(values, lag, np.maximum)
+                for method_number, method in enumerate(methods):
+                    statistic = self.__window_statistic(method, lag, shift, window_sum, window_squared_sum,
+                                                        window_min, window_max)
+                    if statistic is None:
+                        statistic = self.__pandas_window_statistic(data_frame, columns, lag, method)[lag - 1:]
+                    else:
+                        statistic = np.where(window_nan_count == 0, statistic, np.nan)
+                    lag_block[lag - 1:, :, method_number] = statistic
+            lag_block = lag_block.reshape(number_of_rows, block_size)
+            block_start = 2 * lag_number * block_size
+            features[:, block_start:block_start + block_size] = lag_block
+            features[1:, block_start + block_size:block_start + 2 * block_size] = lag_block[1:] - lag_block[:-1]
+
+            method_names = [self.__method_name(method) for method in methods]
+            feature_names.extend(f"{column}_{method_name}_{lag}_days"
+                                 for column in columns for method_name in method_names)
+            feature_names.extend(f"{column}_{method_name}_{lag}_days_diff"
+                                 for column in columns for method_name in method_names)
+        return pd.DataFrame(features, index=data_frame.index, columns=feature_names)
+
+    def __window_statistic(self, method: Union[str, Callable], lag: int, shift: np.ndarray, window_sum: np.ndarray,
+                           window_squared_sum: np.ndarray, window_min: np.ndarray,
+                           window_max: np.ndarray) -> Optional[np.ndarray]:
+        """ Compute a statistic of all complete windows from the prefix sums and sliding windows
+
+        :param method: statistic to compute
+        :param lag: window size
+        :param shift: mean of every column that was subtracted before summing
+        :param window_sum: sum of the shifted values of every window
+        :param window_squared_sum: sum of the squared shifted values of every window
+        :param window_min: minimum of every window
+        :param window_max: maximum of every window
+        :return: the statistic of every window, or None if the method is not recognized
+        """
+        statistic_name = self.__window_statistic_name(method)
+        if statistic_name == "mean":
+            return window_sum / lag + shift
+        if statistic_name == "sum":
+            return window_sum + shift * lag
+        if statistic_name == "std":
+            if lag == 1:
+                return np.full_like(window_sum, np.nan)
+            variance = np.maximum(window_squared_sum - window_sum ** 2 / lag, 0.0) / (lag - 1)
+            # constant windows have a standard deviation of exactly zero, like in pandas
+            return np.where(window_min == window_max, 0.0, np.sqrt(variance))
+        if statistic_name == "min":
+            return window_min
+        if statistic_name == "max":
+            return window_max
+        return None
+
+    def __window_statistic_name(self, method: Union[str, Callable]) -> Optional[str]:
+        """ Get the name of the vectorized statistic of a method
+
+        :param method: statistic to compute
+        :return: the name of the statistic, or None if it must be computed with pandas
+        """
+        try:
+            return self.PREFIX_SUM_METHODS.get(method) or self.SLIDING_WINDOW_METHODS.get(method)
+        except TypeError:
+            # unhashable methods are never recognized
+            return None
+
+    @staticmethod
+    def __pandas_window_statistic(data_frame: pd.DataFrame, columns: List[str], lag: int,
+                                  method: Union[str, Callable]) -> np.ndarray:
+        """ Compute a statistic of every window with pandas
+
+        :param data_frame: data frame with a row per time step
+        :param columns: columns to compute the statistic of
+        :param lag: window size
+        :param method: statistic to compute
+        :return: the statistic of every row and column
+        """
+        return np.column_stack([data_frame[column].rolling(window=lag).agg([method]).iloc[:, 0].to_numpy(np.float64)
+                                for column in columns])
+
+    @staticmethod
+    def __method_name(method: Union[str, Callable]) -> str:
+        """ Get the name pandas gives to the column of a method
+
+        :param method: statistic to compute
+        :return: the name of the method
+        """
+        return method if isinstance(method, str) else getattr(method, "__name__", repr(method))
+
+    @staticmethod
+    def __sliding_window_extreme(values: np.ndarray, lag: int, extreme: np.ufunc) -> np.ndarray:
+        """ Compute the minimum or maximum of every complete window in linear time (van Herk/Gil-Werman). The rows are
+        split in blocks of the window size, and every window covers the end of one block and the start of the next.
+        NaN values propagate, so a window with a NaN value has a NaN extreme.
+
+        :param values: values with a row per time step
+        :param lag: window size
+        :param extreme: np.minimum or np.maximum
+        :return: the extreme of every complete window, with one row less than values per row of the window
+        """
+        number_of_rows, number_of_columns = values.shape
+        number_of_blocks = -(-number_of_rows // lag)
+        padding_value = np.inf if extreme is np.minimum else -np.inf
+        blocks = np.full((number_of_blocks * lag, number_of_columns), padding_value)
+        blocks[:number_of_rows] = values
+        blocks = blocks.reshape(number_of_blocks, lag, number_of_columns)
+        prefix_extreme = extreme.accumulate(blocks, axis=1).reshape(-1, number_of_columns)
+        suffix_extreme = extreme.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, number_of_columns)
+        number_of_windows = number_of_rows - lag + 1
+        return extreme(suffix_extreme[:number_of_windows], prefix_extreme[lag - 1:lag - 1 + number_of_windows])
+
+    @staticmethod
+    def __column_means(values: np.ndarray, is_nan: np.ndarray) -> np.ndarray:
+        """ Get the mean of every column, ignoring NaN, or 0 for columns without values
+
+        :param values: values with a row per time step
+        :param is_nan: mask of the NaN values
+        :return: the mean of every column
+        """
+        counts = (~is_nan).sum(axis=0)
+        sums = np.where(is_nan, 0.0, values).sum(axis=0)
+        return np.divide(sums, counts, out=np.zeros(values.shape[1]), where=counts > 0)
+
+    @staticmethod
+    def __prefix_sum(values: np.ndarray) -> np.ndarray:
+        """ Get the prefix sums of every column, starting with a row of zeros
+
+        :param values: values with a row per time step
+        :return: prefix sums with one row more than values
+        """
+        prefix_sum = np.zeros((values.shape[0] + 1, values.shape[1]), dtype=values.dtype)
+        np.cumsum(values, axis=0, out=prefix_sum[1:])
+        return prefix_sum
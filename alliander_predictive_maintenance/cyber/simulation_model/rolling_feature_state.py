@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from typing import Callable, List, Union
+
+import pandas as pd
+
+
+@dataclass
+class RollingFeatureState:
+    """ The state of the rolling features of a joint, for computing the features of new days incrementally.
+    resampled_data_frame: the last max(lags) days of resampled weather and partial discharge data. """
+    lags: List[int]
+    methods: List[Union[str, Callable]]
+    resampled_data_frame: pd.DataFrame
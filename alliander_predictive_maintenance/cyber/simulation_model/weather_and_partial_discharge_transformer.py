@@ -1,14 +1,22 @@
+import numpy as np
 import pandas as pd
 from typing import List
 
+from alliander_predictive_maintenance.constants import INVALID_LAGS, INCREMENTAL_DATA_NOT_AFTER_STATE
+
 from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.rolling_feature_engine import RollingFeatureEngine
+from alliander_predictive_maintenance.cyber.simulation_model.rolling_feature_state import RollingFeatureState
+from alliander_predictive_maintenance.instrumentation.instrumentation import instrumentation
 
 
 class WeatherAndPartialDischargeTransformer:
     def __init__(self, weather_columns: List[str], partial_discharge_column: str):
         self.partial_discharge_column = partial_discharge_column
         self.partial_discharge_and_weather_columns = weather_columns + [self.partial_discharge_column]
+        self.__rolling_feature_engine = RollingFeatureEngine()
 
+    @instrumentation.traced()
     def transform(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData,
                   lags: List[int], methods: List) -> PredictiveMaintenanceJointData:
         """ Transform an input dataframe to enrich its features
@@ -18,26 +26,78 @@ class WeatherAndPartialDischargeTransformer:
         :param methods: methods for moving averages
         :return: transformed  historical weather and partial discharge data.
         """
-        data_frame = predictive_maintenance_joint_data.cds_weather.join(
+        data_frame_resampled = self.__resample(self.__join(predictive_maintenance_joint_data))
+        lags_data_frame = self.__rolling_feature_engine.transform(
+            data_frame_resampled, self.partial_discharge_and_weather_columns, lags, methods)
+        return self.__create_joint_data(predictive_maintenance_joint_data, lags_data_frame, data_frame_resampled)
+
+    def initialize_incremental_state(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData,
+                                     lags: List[int], methods: List) -> RollingFeatureState:
+        """ Create the state for transforming new data of a joint incrementally with transform_incremental
+
+        :param predictive_maintenance_joint_data: historical weather and partial discharge data. Must be of same length.
+        :param lags: list with numbers of lags
+        :param methods: methods for moving averages
+        :return: the rolling feature state after the historical data
+        """
+        if not all(isinstance(lag, (int, np.integer)) and lag > 0 for lag in lags):
+            raise ValueError(INVALID_LAGS.format(lags=lags))
+        data_frame_resampled = self.__resample(self.__join(predictive_maintenance_joint_data))
+        return RollingFeatureState(
+            lags=list(lags), methods=list(methods),
+            resampled_data_frame=data_frame_resampled[self.partial_discharge_and_weather_columns].iloc[-max(lags):])
+
+    def transform_incremental(self, rolling_feature_state: RollingFeatureState,
+                              predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> \
+            PredictiveMaintenanceJointData:
+        """ Transform new data of a joint, using the state of the data before it instead of the whole history. The
+        features equal those of transform on the whole history. Days between the state and the new data without data
+        are missing values. The state is updated to include the new data.
+
+        :param rolling_feature_state: the rolling feature state, from initialize_incremental_state or a previous call
+        :param predictive_maintenance_joint_data: new weather and partial discharge data, starting on a day after the
+            last day of the state
+        :return: transformed new weather and partial discharge data
+        """
+        previous_data_frame = rolling_feature_state.resampled_data_frame
+        data_frame_resampled = self.__resample(self.__join(predictive_maintenance_joint_data))[
+            self.partial_discharge_and_weather_columns]
+        if len(previous_data_frame) > 0:
+            first_new_day = previous_data_frame.index[-1] + pd.Timedelta(days=1)
+            if data_frame_resampled.index[0] < first_new_day:
+                raise ValueError(INCREMENTAL_DATA_NOT_AFTER_STATE.format(start=data_frame_resampled.index[0],
+                                                                         end=previous_data_frame.index[-1]))
+            # the days between the state and the new data are missing days
+            data_frame_resampled = data_frame_resampled.reindex(
+                pd.date_range(first_new_day, data_frame_resampled.index[-1], freq="1d",
+                              name=data_frame_resampled.index.name))
+        # the state holds the last max(lags) days, which is exactly the history the features of the new days need
+        data_frame = pd.concat([previous_data_frame, data_frame_resampled])
+        lags_data_frame = self.__rolling_feature_engine.transform(
+            data_frame, self.partial_discharge_and_weather_columns, rolling_feature_state.lags,
+            rolling_feature_state.methods).iloc[len(previous_data_frame):]
+        rolling_feature_state.resampled_data_frame = data_frame.iloc[-max(rolling_feature_state.lags):]
+        return self.__create_joint_data(predictive_maintenance_joint_data, lags_data_frame, data_frame_resampled)
+
+    def __join(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> pd.DataFrame:
+        """ Join the weather and partial discharge data
+
+        :param predictive_maintenance_joint_data: weather and partial discharge data
+        :return: data frame with weather and partial discharge information
+        """
+        return predictive_maintenance_joint_data.cds_weather.join(
             predictive_maintenance_joint_data.partial_discharge.rename(self.partial_discharge_column), how="right")
-        data_frame_resampled = self.__resample(data_frame)
-        rolling_methods = {column: methods for column in self.partial_discharge_and_weather_columns}
-
-        lag_data_frames = []
-        for lag in lags:
-            lag_data_frame = data_frame_resampled.rolling(window=lag).agg(rolling_methods)
-            diff_data_frame = lag_data_frame.diff()
-            lag_data_frame.columns = pd.MultiIndex.from_tuples(
-                [column + (f"{lag}_days",) for column in lag_data_frame.columns],
-                names=["feature", "rolling", "lag"]).to_flat_index()
-            diff_data_frame.columns = pd.MultiIndex.from_tuples(
-                [column + (f"{lag}_days_diff",) for column in diff_data_frame.columns],
-                names=["feature", "rolling", "diff"]).to_flat_index()
-            lag_data_frame.columns = ["_".join(map(str, col)) for col in lag_data_frame.columns]
-            diff_data_frame.columns = ["_".join(map(str, col)) for col in diff_data_frame.columns]
-            lag_data_frames.extend([lag_data_frame, diff_data_frame])
-
-        lags_data_frame = pd.concat(lag_data_frames, axis=1)
+
+    def __create_joint_data(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData,
+                            lags_data_frame: pd.DataFrame, data_frame_resampled: pd.DataFrame) -> \
+            PredictiveMaintenanceJointData:
+        """ Create the transformed data from the features, keeping the days where all features are known
+
+        :param predictive_maintenance_joint_data: the data that was transformed
+        :param lags_data_frame: features of every day
+        :param data_frame_resampled: resampled weather and partial discharge data
+        :return: transformed weather and partial discharge data
+        """
         exog = lags_data_frame.dropna()
         endog = data_frame_resampled[self.partial_discharge_column][exog.index.min():exog.index.max()]
         return PredictiveMaintenanceJointData(cds_weather=exog, knmi_weather=None, partial_discharge=endog,
@@ -0,0 +1,10 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass
+class CounterRecord:
+    """ An increment of a counter, like rows read, bytes fetched or cache hits """
+    name: str
+    value: float
+    labels: Dict[str, str] = field(default_factory=dict)
@@ -0,0 +1,33 @@
+import abc
+
+from alliander_predictive_maintenance.instrumentation.counter_record import CounterRecord
+from alliander_predictive_maintenance.instrumentation.span_record import SpanRecord
+
+
+class IInstrumentationSink(metaclass=abc.ABCMeta):
+    @classmethod
+    def __subclasshook__(cls, subclass):
+        return (hasattr(subclass, 'record_span') and
+                callable(subclass.record_span) and
+                hasattr(subclass, 'record_counter') and
+                callable(subclass.record_counter) or
+                NotImplemented)
+
+    @abc.abstractmethod
+    def record_span(self, span_record: SpanRecord) -> None:
+        """ Record a finished span. Can be called from multiple threads at the same time.
+
+        :param span_record: the finished span
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def record_counter(self, counter_record: CounterRecord) -> None:
+        """ Record an increment of a counter. Can be called from multiple threads at the same time.
+
+        :param counter_record: the increment
+        """
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """ Write the records that are buffered, if the sink buffers them """
@@ -0,0 +1,58 @@
+import threading
+from typing import Dict, FrozenSet, List, Tuple
+
+from alliander_predictive_maintenance.instrumentation.counter_record import CounterRecord
+from alliander_predictive_maintenance.instrumentation.iinstrumentation_sink import IInstrumentationSink
+from alliander_predictive_maintenance.instrumentation.span_record import SpanRecord
+
+
+class InMemoryInstrumentationSink(IInstrumentationSink):
+    """ Collect the spans and the totals of the counters in memory, for instance to profile a job in a notebook """
+    def __init__(self):
+        self.__spans: List[SpanRecord] = []
+        self.__counters: Dict[Tuple[str, FrozenSet[Tuple[str, str]]], float] = {}
+        self.__lock = threading.Lock()
+
+    def record_span(self, span_record: SpanRecord) -> None:
+        with self.__lock:
+            self.__spans.append(span_record)
+
+    def record_counter(self, counter_record: CounterRecord) -> None:
+        key = (counter_record.name, frozenset(counter_record.labels.items()))
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + counter_record.value
+
+    def get_spans(self, name: str = None) -> List[SpanRecord]:
+        """ Get the recorded spans
+
+        :param name: only get the spans with this name
+        :return: the spans in the order they finished
+        """
+        with self.__lock:
+            return [span for span in self.__spans if name is None or span.name == name]
+
+    def get_counter(self, name: str, **labels: str) -> float:
+        """ Get the total of a counter
+
+        :param name: name of the counter
+        :param labels: labels of the counter
+        :return: the total of all increments, 0 if it was never incremented
+        """
+        with self.__lock:
+            return self.__counters.get((name, frozenset(labels.items())), 0)
+
+    def get_total_durations(self) -> Dict[str, float]:
+        """ Get the total duration of the spans with the same name, to see where time goes
+
+        :return: the total duration in seconds per span name, longest first
+        """
+        total_durations: Dict[str, float] = {}
+        for span in self.get_spans():
+            total_durations[span.name] = total_durations.get(span.name, 0) + span.duration_seconds
+        return dict(sorted(total_durations.items(), key=lambda item: item[1], reverse=True))
+
+    def clear(self) -> None:
+        """ Remove all records """
+        with self.__lock:
+            self.__spans.clear()
+            self.__counters.clear()
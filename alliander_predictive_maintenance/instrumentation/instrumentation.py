@@ -0,0 +1,115 @@
+import contextlib
+import functools
+import threading
+import time
+from typing import Callable, ContextManager, Dict, Iterator, Optional, Tuple, TypeVar
+
+from alliander_predictive_maintenance.instrumentation.counter_record import CounterRecord
+from alliander_predictive_maintenance.instrumentation.iinstrumentation_sink import IInstrumentationSink
+from alliander_predictive_maintenance.instrumentation.span_record import SpanRecord
+
+FunctionType = TypeVar("FunctionType", bound=Callable)
+
+
+class Instrumentation:
+    """ Spans and counters of the pipeline stages, sent to pluggable sinks. Without sinks, instrumentation is turned off
+    and a span or counter costs a single check, so the instrumented code can run in production. Sinks are registered
+    per process, so the workers of a process pool are not instrumented unless they add sinks themselves. """
+    # a null context can be entered any number of times, also at the same time, so one is shared by all spans
+    NO_OP_SPAN = contextlib.nullcontext()
+
+    def __init__(self):
+        # the sinks are replaced instead of changed, so recording can read them without taking the lock
+        self.__sinks: Tuple[IInstrumentationSink, ...] = ()
+        self.__lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.__sinks) > 0
+
+    def add_sink(self, instrumentation_sink: IInstrumentationSink) -> None:
+        """ Send the spans and counters to a sink, which turns instrumentation on
+
+        :param instrumentation_sink: the sink to add
+        """
+        with self.__lock:
+            self.__sinks = self.__sinks + (instrumentation_sink,)
+
+    def remove_sink(self, instrumentation_sink: IInstrumentationSink) -> None:
+        """ Stop sending the spans and counters to a sink. Instrumentation is turned off when no sinks are left.
+
+        :param instrumentation_sink: the sink to remove
+        """
+        with self.__lock:
+            self.__sinks = tuple(sink for sink in self.__sinks if sink is not instrumentation_sink)
+
+    def span(self, name: str, **labels: str) -> ContextManager:
+        """ Time the code in a with block
+
+        :param name: name of the span, like `partial_discharge_forecaster.fit`
+        :param labels: labels of the span, like the circuit id
+        :return: a context manager
+        """
+        if not self.__sinks:
+            return self.NO_OP_SPAN
+        return self.__span(name, labels)
+
+    def count(self, name: str, value: float = 1, **labels: str) -> None:
+        """ Increment a counter
+
+        :param name: name of the counter, like `partial_discharge_rows_read`
+        :param value: the increment
+        :param labels: labels of the counter, like the name of a cache
+        """
+        sinks = self.__sinks
+        if not sinks:
+            return
+        counter_record = CounterRecord(name=name, value=value, labels=labels)
+        for sink in sinks:
+            sink.record_counter(counter_record)
+
+    def traced(self, name: Optional[str] = None) -> Callable[[FunctionType], FunctionType]:
+        """ Decorate a function to time every call in a span
+
+        :param name: name of the span, defaults to the qualified name of the function
+        :return: the decorator
+        """
+        def decorator(function: FunctionType) -> FunctionType:
+            span_name = name or function.__qualname__
+
+            @functools.wraps(function)
+            def traced_function(*args, **kwargs):
+                if not self.__sinks:
+                    return function(*args, **kwargs)
+                with self.__span(span_name, {}):
+                    return function(*args, **kwargs)
+            return traced_function
+        return decorator
+
+    def flush(self) -> None:
+        """ Flush all sinks """
+        for sink in self.__sinks:
+            sink.flush()
+
+    @contextlib.contextmanager
+    def __span(self, name: str, labels: Dict[str, str]) -> Iterator[None]:
+        """ Time the code in a with block and send the span to the sinks
+
+        :param name: name of the span
+        :param labels: labels of the span
+        """
+        start_time = time.time()
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            span_record = SpanRecord(name=name, start_time=start_time, duration_seconds=time.perf_counter() - start,
+                                     labels=labels, succeeded=succeeded)
+            for sink in self.__sinks:
+                sink.record_span(span_record)
+
+
+# the instrumentation of the pipeline, add a sink to turn it on
+instrumentation = Instrumentation()
@@ -0,0 +1,34 @@
+import logging
+
+from alliander_predictive_maintenance.instrumentation.counter_record import CounterRecord
+from alliander_predictive_maintenance.instrumentation.iinstrumentation_sink import IInstrumentationSink
+from alliander_predictive_maintenance.instrumentation.span_record import SpanRecord
+
+
+class LoggingInstrumentationSink(IInstrumentationSink):
+    """ Log every span and counter increment """
+    def __init__(self, logger: logging.Logger = logging.getLogger("alliander_predictive_maintenance"),
+                 level: int = logging.INFO):
+        """
+        :param logger: logger to log to
+        :param level: level of the log records
+        """
+        self.__logger = logger
+        self.__level = level
+
+    def record_span(self, span_record: SpanRecord) -> None:
+        self.__logger.log(self.__level, "span %s took %.6f s%s%s", span_record.name, span_record.duration_seconds,
+                          "" if span_record.succeeded else " and failed", self.__format_labels(span_record.labels))
+
+    def record_counter(self, counter_record: CounterRecord) -> None:
+        self.__logger.log(self.__level, "counter %s increased by %s%s", counter_record.name, counter_record.value,
+                          self.__format_labels(counter_record.labels))
+
+    @staticmethod
+    def __format_labels(labels: dict) -> str:
+        """ Format the labels of a record for a log message
+
+        :param labels: labels of the record
+        :return: the labels, or an empty string if there are none
+        """
+        return f" {labels}" if labels else ""
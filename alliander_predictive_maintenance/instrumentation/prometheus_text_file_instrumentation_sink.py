@@ -0,0 +1,108 @@
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Tuple
+
+from alliander_predictive_maintenance.constants import INVALID_PATH
+from alliander_predictive_maintenance.instrumentation.counter_record import CounterRecord
+from alliander_predictive_maintenance.instrumentation.iinstrumentation_sink import IInstrumentationSink
+from alliander_predictive_maintenance.instrumentation.span_record import SpanRecord
+
+
+class PrometheusTextFileInstrumentationSink(IInstrumentationSink):
+    """ Aggregate the spans and counters and write them in the Prometheus text format on flush, for the text file
+    collector of the node exporter. Spans are summaries in seconds, with a sum and a count per name and labels, and
+    failed spans are also counted separately. """
+    def __init__(self, absolute_file_path: Path, namespace: str = "predictive_maintenance"):
+        """
+        :param absolute_file_path: path of the .prom file, in the folder of the text file collector
+        :param namespace: prefix of the metric names
+        """
+        if not absolute_file_path.parent.is_dir():
+            raise ValueError(INVALID_PATH.format(path=absolute_file_path.parent))
+        self.absolute_file_path = absolute_file_path
+        self.__namespace = namespace
+        self.__span_sums: Dict[Tuple[str, FrozenSet[Tuple[str, str]]], float] = {}
+        self.__span_counts: Dict[Tuple[str, FrozenSet[Tuple[str, str]]], int] = {}
+        self.__span_failures: Dict[Tuple[str, FrozenSet[Tuple[str, str]]], int] = {}
+        self.__counters: Dict[Tuple[str, FrozenSet[Tuple[str, str]]], float] = {}
+        self.__lock = threading.Lock()
+
+    def record_span(self, span_record: SpanRecord) -> None:
+        key = (span_record.name, frozenset(span_record.labels.items()))
+        with self.__lock:
+            self.__span_sums[key] = self.__span_sums.get(key, 0) + span_record.duration_seconds
+            self.__span_counts[key] = self.__span_counts.get(key, 0) + 1
+            if not span_record.succeeded:
+                self.__span_failures[key] = self.__span_failures.get(key, 0) + 1
+
+    def record_counter(self, counter_record: CounterRecord) -> None:
+        key = (counter_record.name, frozenset(counter_record.labels.items()))
+        with self.__lock:
+            self.__counters[key] = self.__counters.get(key, 0) + counter_record.value
+
+    def flush(self) -> None:
+        """ Write all metrics, through a temporary file so the collector never reads a partial file """
+        with self.__lock:
+            lines = self.__format_metrics([(self.__span_sums, "_seconds_sum"), (self.__span_counts, "_seconds_count")],
+                                          "summary", "_seconds") + \
+                self.__format_metrics([(self.__span_failures, "_failures_total")], "counter", "_failures_total") + \
+                self.__format_metrics([(self.__counters, "_total")], "counter", "_total")
+        temporary_file_path = self.absolute_file_path.with_name(f"{self.absolute_file_path.name}.{os.getpid()}.tmp")
+        with open(temporary_file_path, "w") as file:
+            file.write("".join(f"{line}\n" for line in lines))
+        os.replace(temporary_file_path, self.absolute_file_path)
+
+    def __format_metrics(self, samples: List[Tuple[Dict[Tuple[str, FrozenSet[Tuple[str, str]]], float], str]],
+                         metric_type: str, type_suffix: str) -> List[str]:
+        """ Format the values of metrics as lines of the text format. All lines of a metric form one group: its type
+        line, and then the samples of every suffix per labels.
+
+        :param samples: value per name and labels, with the suffix of their sample names
+        :param metric_type: type of the metrics
+        :param type_suffix: suffix of the metric name in the type line
+        :return: the lines, grouped by metric name
+        """
+        keys = {key for values, _ in samples for key in values}
+        lines = []
+        typed_metric_names = set()
+        for metric_name, name, labels in sorted(((self.__get_metric_name(name), name, labels) for name, labels in keys),
+                                                key=lambda key: (key[0], key[1], sorted(key[2]))):
+            if metric_name not in typed_metric_names:
+                typed_metric_names.add(metric_name)
+                lines.append(f"# TYPE {metric_name}{type_suffix} {metric_type}")
+            lines.extend(f"{metric_name}{suffix}{self.__format_labels(labels)} {values[(name, labels)]!r}"
+                         for values, suffix in samples if (name, labels) in values)
+        return lines
+
+    def __get_metric_name(self, name: str) -> str:
+        """ Get a valid metric name for a span or counter name
+
+        :param name: name of the span or counter
+        :return: the metric name with the namespace
+        """
+        return re.sub(r"[^a-zA-Z0-9_]", "_", f"{self.__namespace}_{name}")
+
+    @staticmethod
+    def __format_labels(labels: FrozenSet[Tuple[str, str]]) -> str:
+        """ Format labels in the text format, escaping their values
+
+        :param labels: label names and values
+        :return: the labels in braces, or an empty string if there are none
+        """
+        if not labels:
+            return ""
+        escape_label_value = PrometheusTextFileInstrumentationSink.__escape_label_value
+        formatted_labels = [f'{re.sub(r"[^a-zA-Z0-9_]", "_", name)}="{escape_label_value(value)}"'
+                            for name, value in sorted(labels)]
+        return "{" + ",".join(formatted_labels) + "}"
+
+    @staticmethod
+    def __escape_label_value(value: str) -> str:
+        """ Escape the backslashes, double quotes and line feeds of a label value
+
+        :param value: value of a label
+        :return: the escaped value
+        """
+        return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
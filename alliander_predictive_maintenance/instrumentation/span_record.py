@@ -0,0 +1,13 @@
+from dataclasses import dataclass, field
+from typing import Dict
+
+
+@dataclass
+class SpanRecord:
+    """ A timed stage of the pipeline.
+    start_time: seconds since the epoch. succeeded: False if the stage raised an exception. """
+    name: str
+    start_time: float
+    duration_seconds: float
+    labels: Dict[str, str] = field(default_factory=dict)
+    succeeded: bool = True
@@ -0,0 +1,127 @@
+import os
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_reader import \
+    ICircuitPartialDischargeReader
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+
+BENCHMARK_SCALE_ENVIRONMENT_VARIABLE = "PREDICTIVE_MAINTENANCE_BENCHMARK_SCALE"
+
+
+@dataclass
+class BenchmarkScale:
+    """ The size of the synthetic data of a benchmark run """
+    number_of_events: int
+    number_of_joints: int
+    number_of_days: int
+    circuit_length: float
+    rounds: int
+
+
+BENCHMARK_SCALES: Dict[str, BenchmarkScale] = {
+    "small": BenchmarkScale(number_of_events=200_000, number_of_joints=20, number_of_days=365, circuit_length=2_000,
+                            rounds=3),
+    "medium": BenchmarkScale(number_of_events=2_000_000, number_of_joints=100, number_of_days=3 * 365,
+                             circuit_length=5_000, rounds=3),
+    "realistic": BenchmarkScale(number_of_events=20_000_000, number_of_joints=300, number_of_days=5 * 365,
+                                circuit_length=10_000, rounds=1),
+}
+
+
+def get_benchmark_scale() -> BenchmarkScale:
+    """ Get the scale of the benchmark run from the environment, small by default so the suite runs in minutes """
+    return BENCHMARK_SCALES[os.environ.get(BENCHMARK_SCALE_ENVIRONMENT_VARIABLE, "small")]
+
+
+def get_joint_locations(benchmark_scale: BenchmarkScale) -> List[float]:
+    """ Get equally spaced joint locations along the circuit """
+    return list(np.linspace(0, benchmark_scale.circuit_length, benchmark_scale.number_of_joints + 2)[1:-1])
+
+
+def get_time(benchmark_scale: BenchmarkScale) -> pd.DatetimeIndex:
+    """ Get the hours of the benchmark period """
+    return pd.date_range("1/1/2018", periods=24 * benchmark_scale.number_of_days, freq="1H", name="time")
+
+
+def create_partial_discharge_events(benchmark_scale: BenchmarkScale, seed: int = 0) -> pd.DataFrame:
+    """ Create partial discharge events in time order. Most events cluster around the joints, whose activity follows
+    the soil temperature, and the rest is background noise along the whole circuit. """
+    random_generator = np.random.default_rng(seed)
+    number_of_seconds = benchmark_scale.number_of_days * 24 * 3600
+    seconds = np.sort(random_generator.integers(0, number_of_seconds, benchmark_scale.number_of_events))
+    joint_locations = np.array(get_joint_locations(benchmark_scale))
+    locations = np.where(
+        random_generator.uniform(size=benchmark_scale.number_of_events) < 0.8,
+        joint_locations[random_generator.integers(0, len(joint_locations), benchmark_scale.number_of_events)] +
+        random_generator.normal(0, 0.002 * benchmark_scale.circuit_length, benchmark_scale.number_of_events),
+        random_generator.uniform(0, benchmark_scale.circuit_length, benchmark_scale.number_of_events))
+    seasonality = 1 + 0.5 * np.sin(2 * np.pi * seconds / (365 * 24 * 3600))
+    charges = random_generator.lognormal(6, 1, benchmark_scale.number_of_events) * seasonality
+    return pd.DataFrame({
+        ICircuitPartialDischargeReader.DATETIME_COLUMN: pd.Timestamp("1/1/2018") + pd.to_timedelta(seconds, unit="s"),
+        ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN: charges.astype(np.float32),
+        ICircuitPartialDischargeReader.LOCATION_COLUMN: np.clip(locations, 0, benchmark_scale.circuit_length).astype(
+            np.float32),
+    })
+
+
+def create_cds_weather(benchmark_scale: BenchmarkScale, seed: int = 0) -> pd.DataFrame:
+    """ Create hourly CDS weather with a time column, like the weather retrievers return """
+    random_generator = np.random.default_rng(seed)
+    time = get_time(benchmark_scale)
+    day_of_year = np.arange(len(time)) / 24 / 365
+    weather = {"time": time,
+               PartialDischargeForecaster.WEATHER_COLUMNS[0]: 283 + 8 * np.sin(2 * np.pi * day_of_year) +
+               random_generator.normal(0, 0.5, len(time)),
+               PartialDischargeForecaster.WEATHER_COLUMNS[1]: 0.3 + 0.05 * np.cos(2 * np.pi * day_of_year) +
+               random_generator.normal(0, 0.01, len(time))}
+    for column in ["2m_temperature", "total_precipitation", "surface_pressure", "10m_u_component_of_wind",
+                   "10m_v_component_of_wind", "surface_solar_radiation_downwards"]:
+        weather[column] = random_generator.normal(0, 1, len(time)).cumsum() / 100
+    weather.update({"lat": 52.0, "lon": 5.0})
+    return pd.DataFrame(weather)
+
+
+def create_knmi_weather(benchmark_scale: BenchmarkScale, seed: int = 0) -> pd.DataFrame:
+    """ Create daily KNMI weather with a time column """
+    random_generator = np.random.default_rng(seed)
+    days = pd.date_range("1/1/2018", periods=benchmark_scale.number_of_days, freq="1D")
+    weather = {"time": days}
+    for column in ["temperature", "humidity", "precipitation", "wind_speed", "air_pressure", "global_radiation"]:
+        weather[column] = random_generator.normal(0, 1, len(days)).cumsum()
+    return pd.DataFrame(weather)
+
+
+def measure_peak_memory(function: Callable[[], Any]) -> int:
+    """ Run a function once and measure the peak of the memory it allocates, including NumPy arrays
+
+    :param function: function to measure
+    :return: the peak allocated memory in bytes
+    """
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def report(benchmark, function: Callable[[], Any], items: int, item_name: str) -> None:
+    """ Add the throughput and the peak memory of a benchmarked function to the extra info of the benchmark, so they are
+    in the JSON reports that are compared across releases
+
+    :param benchmark: the pytest-benchmark fixture, after running the benchmark
+    :param function: the benchmarked function, run once more to measure its memory
+    :param items: number of items the function processes per run
+    :param item_name: name of the items, like events or joints
+    """
+    benchmark.extra_info[item_name] = items
+    if benchmark.stats is not None:
+        benchmark.extra_info[f"{item_name}_per_second"] = items / benchmark.stats.stats.mean
+    benchmark.extra_info["peak_memory_megabytes"] = measure_peak_memory(function) / 2 ** 20
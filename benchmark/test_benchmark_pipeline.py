@@ -0,0 +1,218 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_partial_discharge_storage import \
+    CsvCircuitPartialDischargeStorage
+from alliander_predictive_maintenance.conversion.data_types.circuit import Circuit
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from alliander_predictive_maintenance.conversion.partial_discharge_correlator.partial_discharge_weather_correlator import \
+    PartialDischargeWeatherCorrelator
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.weather_and_partial_discharge_transformer import \
+    WeatherAndPartialDischargeTransformer
+from benchmark.synthetic_partial_discharge import BenchmarkScale, create_cds_weather, create_knmi_weather, \
+    create_partial_discharge_events, get_benchmark_scale, get_joint_locations, get_time, report
+
+pytest.importorskip("pytest_benchmark")
+
+CIRCUIT_ID = 1
+LAGS = [7, 30]
+
+
+@pytest.fixture(scope="module")
+def benchmark_scale() -> BenchmarkScale:
+    return get_benchmark_scale()
+
+
+@pytest.fixture(scope="module")
+def partial_discharge_events(benchmark_scale) -> pd.DataFrame:
+    return create_partial_discharge_events(benchmark_scale)
+
+
+@pytest.fixture(scope="module")
+def partial_discharge_csv_root(tmp_path_factory, partial_discharge_events) -> Path:
+    partial_discharge_root = tmp_path_factory.mktemp("PartialDischarge")
+    partial_discharge_events.to_csv(partial_discharge_root / f"{CIRCUIT_ID}.csv", index=False)
+    return partial_discharge_root
+
+
+@pytest.fixture(scope="module")
+def cds_weather(benchmark_scale) -> pd.DataFrame:
+    return create_cds_weather(benchmark_scale)
+
+
+@pytest.fixture(scope="module")
+def knmi_weather(benchmark_scale) -> pd.DataFrame:
+    return create_knmi_weather(benchmark_scale)
+
+
+@pytest.fixture(scope="module")
+def time_window(benchmark_scale) -> TimeWindow:
+    time = get_time(benchmark_scale)
+    return TimeWindow(time[0], time[-1])
+
+
+def create_circuit(benchmark_scale: BenchmarkScale, cds_weather: pd.DataFrame, knmi_weather: pd.DataFrame,
+                   partial_discharge_events: pd.DataFrame, time_window: TimeWindow) -> Circuit:
+    return Circuit(CIRCUIT_ID, cds_weather, knmi_weather, CircuitCoordinate(0, 0, CIRCUIT_ID), partial_discharge_events,
+                   time_window, benchmark_scale.circuit_length)
+
+
+@pytest.fixture(scope="module")
+def joint_partial_discharges(benchmark_scale, cds_weather, knmi_weather, partial_discharge_events,
+                             time_window) -> list:
+    circuit = create_circuit(benchmark_scale, cds_weather, knmi_weather, partial_discharge_events, time_window)
+    return [joint.partial_discharge
+            for joint in circuit.create_joints(get_joint_locations(benchmark_scale), time_window)]
+
+
+@pytest.fixture(scope="module")
+def forecaster_joint_data(cds_weather, joint_partial_discharges) -> PredictiveMaintenanceJointData:
+    return PredictiveMaintenanceJointData(
+        cds_weather=cds_weather.set_index("time")[PartialDischargeForecaster.WEATHER_COLUMNS], knmi_weather=None,
+        partial_discharge=joint_partial_discharges[0].rename(PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN),
+        circuit_id=CIRCUIT_ID, location_in_meters=0)
+
+
+@pytest.fixture(scope="module")
+def correlator_joint_datas(benchmark_scale, cds_weather, knmi_weather, joint_partial_discharges) -> list:
+    return [PredictiveMaintenanceJointData(cds_weather=cds_weather, knmi_weather=knmi_weather,
+                                           partial_discharge=partial_discharge, circuit_id=CIRCUIT_ID,
+                                           location_in_meters=location)
+            for location, partial_discharge in zip(get_joint_locations(benchmark_scale), joint_partial_discharges)]
+
+
+class TestBenchmarkPipeline:
+    def test_csv_circuit_partial_discharge_storage__read_circuit(self, benchmark, benchmark_scale,
+                                                                 partial_discharge_csv_root):
+        csv_circuit_partial_discharge_storage = CsvCircuitPartialDischargeStorage(partial_discharge_csv_root)
+
+        def read_circuit():
+            return csv_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit(CIRCUIT_ID)
+
+        benchmark.pedantic(read_circuit, rounds=benchmark_scale.rounds)
+        report(benchmark, read_circuit, benchmark_scale.number_of_events, "events")
+
+    def test_csv_circuit_partial_discharge_storage__stream_circuit(self, benchmark, benchmark_scale,
+                                                                   partial_discharge_csv_root):
+        csv_circuit_partial_discharge_storage = CsvCircuitPartialDischargeStorage(partial_discharge_csv_root)
+
+        def stream_circuit():
+            for _ in csv_circuit_partial_discharge_storage.get_partial_discharge_chunks_for_circuit(CIRCUIT_ID):
+                pass
+
+        benchmark.pedantic(stream_circuit, rounds=benchmark_scale.rounds)
+        report(benchmark, stream_circuit, benchmark_scale.number_of_events, "events")
+
+    def test_circuit__create_joint(self, benchmark, benchmark_scale, cds_weather, knmi_weather,
+                                   partial_discharge_events, time_window):
+        joint_locations = get_joint_locations(benchmark_scale)
+
+        def create_joints():
+            # a new circuit, so building the location index on first use is included
+            circuit = create_circuit(benchmark_scale, cds_weather, knmi_weather, partial_discharge_events, time_window)
+            return [circuit.create_joint(location, time_window) for location in joint_locations]
+
+        benchmark.pedantic(create_joints, rounds=benchmark_scale.rounds)
+        report(benchmark, create_joints, len(joint_locations), "joints")
+
+    @pytest.mark.parametrize("resampling_strategy", ["count", "max", "mean", "percentile", "energy"])
+    def test_circuit__create_joint_with_resampling_strategy(self, benchmark, benchmark_scale, cds_weather,
+                                                            knmi_weather, partial_discharge_events, time_window,
+                                                            resampling_strategy):
+        joint_locations = get_joint_locations(benchmark_scale)
+        circuit = create_circuit(benchmark_scale, cds_weather, knmi_weather, partial_discharge_events, time_window)
+
+        def create_joints():
+            return [circuit.create_joint(location, time_window, resampling_strategy) for location in joint_locations]
+
+        benchmark.pedantic(create_joints, rounds=benchmark_scale.rounds)
+        report(benchmark, create_joints, len(joint_locations), "joints")
+
+    def test_circuit__create_joints(self, benchmark, benchmark_scale, cds_weather, knmi_weather,
+                                    partial_discharge_events, time_window):
+        joint_locations = get_joint_locations(benchmark_scale)
+
+        def create_joints():
+            circuit = create_circuit(benchmark_scale, cds_weather, knmi_weather, partial_discharge_events, time_window)
+            return circuit.create_joints(joint_locations, time_window)
+
+        benchmark.pedantic(create_joints, rounds=benchmark_scale.rounds)
+        report(benchmark, create_joints, len(joint_locations), "joints")
+
+    def test_circuit__create_joints_from_partial_discharge_cubes(self, benchmark, benchmark_scale, cds_weather,
+                                                                 knmi_weather, partial_discharge_events, time_window):
+        joint_locations = get_joint_locations(benchmark_scale)
+        # the cubes are created once and then read by every query, like cubes that are loaded from disk
+        partial_discharge_cubes = create_circuit(benchmark_scale, cds_weather, knmi_weather, partial_discharge_events,
+                                                 time_window).create_partial_discharge_cubes()
+        circuit = Circuit(CIRCUIT_ID, cds_weather, knmi_weather, CircuitCoordinate(0, 0, CIRCUIT_ID),
+                          partial_discharge_events, time_window, benchmark_scale.circuit_length,
+                          partial_discharge_cubes=partial_discharge_cubes)
+
+        def create_joints():
+            return circuit.create_joints(joint_locations, time_window, time_resolution="1D")
+
+        benchmark.pedantic(create_joints, rounds=benchmark_scale.rounds)
+        report(benchmark, create_joints, len(joint_locations), "joints")
+
+    def test_weather_and_partial_discharge_transformer__transform(self, benchmark, benchmark_scale,
+                                                                  forecaster_joint_data):
+        weather_and_partial_discharge_transformer = WeatherAndPartialDischargeTransformer(
+            PartialDischargeForecaster.WEATHER_COLUMNS, PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN)
+
+        def transform():
+            return weather_and_partial_discharge_transformer.transform(forecaster_joint_data, LAGS,
+                                                                       PartialDischargeForecaster.ENRICHMENT_METHODS)
+
+        benchmark.pedantic(transform, rounds=benchmark_scale.rounds)
+        report(benchmark, transform, benchmark_scale.number_of_days, "days")
+
+    @pytest.mark.parametrize("partial_discharge_forecaster_model",
+                             [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
+    def test_partial_discharge_forecaster__fit(self, benchmark, benchmark_scale, partial_discharge_forecaster_model,
+                                               forecaster_joint_data):
+        def fit():
+            return PartialDischargeForecaster(partial_discharge_forecaster_model, LAGS).fit(forecaster_joint_data,
+                                                                                            train_size=0.7)
+
+        benchmark.pedantic(fit, rounds=benchmark_scale.rounds)
+        report(benchmark, fit, benchmark_scale.number_of_days, "days")
+
+    @pytest.mark.parametrize("partial_discharge_forecaster_model",
+                             [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
+    def test_partial_discharge_forecaster__predict(self, benchmark, benchmark_scale,
+                                                   partial_discharge_forecaster_model, forecaster_joint_data):
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, LAGS)
+        partial_discharge_forecaster.fit(forecaster_joint_data, train_size=0.7)
+
+        def predict():
+            return partial_discharge_forecaster.predict(forecaster_joint_data)
+
+        benchmark.pedantic(predict, rounds=benchmark_scale.rounds)
+        report(benchmark, predict, benchmark_scale.number_of_days, "days")
+
+    def test_partial_discharge_weather_correlator__correlate(self, benchmark, benchmark_scale, correlator_joint_datas):
+        def correlate():
+            partial_discharge_weather_correlator = PartialDischargeWeatherCorrelator()
+            return [partial_discharge_weather_correlator.correlate(predictive_maintenance_joint_data, 7)
+                    for predictive_maintenance_joint_data in correlator_joint_datas]
+
+        benchmark.pedantic(correlate, rounds=benchmark_scale.rounds)
+        report(benchmark, correlate, len(correlator_joint_datas), "joints")
+
+    def test_partial_discharge_weather_correlator__correlate_many(self, benchmark, benchmark_scale,
+                                                                  correlator_joint_datas):
+        def correlate_many():
+            return PartialDischargeWeatherCorrelator().correlate_many(correlator_joint_datas, 7)
+
+        benchmark.pedantic(correlate_many, rounds=benchmark_scale.rounds)
+        report(benchmark, correlate_many, len(correlator_joint_datas), "joints")
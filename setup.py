@@ -14,7 +14,10 @@ setup(
                       "numpy~=1.24",
                       "requests~=2.28",
                       "openpyxl~=3.1",
-                      "skforecast~=0.6"
+                      "skforecast~=0.6",
+                      "pyarrow~=14.0",
+                      "httpx~=0.28",
+                      "pytest-benchmark~=4.0"
                       ],
     packages=["alliander_predictive_maintenance"]
 )
@@ -1,14 +1,102 @@
+import gzip
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
 import pandas as pd
 import pytest
 import requests
 
-from alliander_predictive_maintenance.connection.alliander_circuit_weather_retriever import \
-    AllianderCircuitWeatherRetriever, AllianderWeatherSources
-from alliander_predictive_maintenance.connection.circuit_coordinate import CircuitCoordinate
-from alliander_predictive_maintenance.conversion.time_window import TimeWindow
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_circuit_weather_retriever import \
+    AllianderCircuitWeatherRetriever
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_weather_response_formats import \
+    AllianderWeatherResponseFormats
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_weather_sources import \
+    AllianderWeatherSources
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+
+
+class StubWeatherApiHandler(BaseHTTPRequestHandler):
+    """ Serves hourly weather between the begin and end query parameters, as CSV or Parquet """
+    requests = []
+    failures_before_success = 0
+    response_delay = 0
+    active_requests = 0
+    max_active_requests = 0
+    lock = threading.Lock()
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        with StubWeatherApiHandler.lock:
+            StubWeatherApiHandler.active_requests += 1
+            StubWeatherApiHandler.max_active_requests = max(StubWeatherApiHandler.max_active_requests,
+                                                            StubWeatherApiHandler.active_requests)
+        try:
+            time.sleep(StubWeatherApiHandler.response_delay)
+            self.__respond()
+        finally:
+            with StubWeatherApiHandler.lock:
+                StubWeatherApiHandler.active_requests -= 1
+
+    def __respond(self):
+        query = parse_qs(urlparse(self.path).query)
+        self.requests.append({**query, "Accept-Encoding": self.headers.get("Accept-Encoding")})
+        begin, end = pd.Timestamp(query["begin"][0]), pd.Timestamp(query["end"][0])
+        if StubWeatherApiHandler.failures_before_success > 0:
+            StubWeatherApiHandler.failures_before_success -= 1
+            self.__send(503, b"unavailable")
+            return
+        if begin > end:
+            self.__send(400, b"begin is after end")
+            return
+        times = pd.date_range(begin.ceil("1H"), end, freq="1H")
+        weather = pd.DataFrame({"time": times, "lat": float(query["lat"][0]), "lon": float(query["lon"][0]),
+                                "temperature": times.hour.astype(float)})
+        if query["response_format"][0] == AllianderWeatherResponseFormats.PARQUET.value:
+            buffer = io.BytesIO()
+            weather.to_parquet(buffer, index=False)
+            self.__send(200, buffer.getvalue())
+        else:
+            self.__send(200, weather.to_csv(index=False).encode())
+
+    def __send(self, status_code: int, content: bytes):
+        headers = {}
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            content = gzip.compress(content)
+            headers["Content-Encoding"] = "gzip"
+        self.send_response(status_code)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_weather_api():
+    StubWeatherApiHandler.requests = []
+    StubWeatherApiHandler.failures_before_success = 0
+    StubWeatherApiHandler.response_delay = 0
+    StubWeatherApiHandler.max_active_requests = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubWeatherApiHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", StubWeatherApiHandler.requests
+    server.shutdown()
+    server.server_close()
 
 
 class TestAllianderCircuitWeatherRetriever:
+    CIRCUIT_COORDINATE = CircuitCoordinate(52.508969, 4.986738, 23108)
+    TIME_WINDOW = TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/02/2019"))
+
     def test_init__invalid_enum_input__exception_thrown(self):
         with pytest.raises(ValueError):
             AllianderCircuitWeatherRetriever("invalid input")
@@ -33,3 +121,47 @@ class TestAllianderCircuitWeatherRetriever:
 
         with pytest.raises(requests.HTTPError):
             alliander_circuit_weather_retriever.get_weather(circuit_coordinate, time_window)
+
+    @pytest.mark.parametrize("response_format", [AllianderWeatherResponseFormats.CSV,
+                                                 AllianderWeatherResponseFormats.PARQUET])
+    def test_get_weather__stub_api__compressed_weather_data_returned(self, stub_weather_api, response_format):
+        weather_api, requests_received = stub_weather_api
+        alliander_circuit_weather_retriever = AllianderCircuitWeatherRetriever(
+            AllianderWeatherSources.CDS, weather_api=weather_api, response_format=response_format)
+
+        weather_data_frame = alliander_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE,
+                                                                             self.TIME_WINDOW)
+        assert len(weather_data_frame) == 25
+        assert pd.api.types.is_datetime64_any_dtype(weather_data_frame.time)
+        assert weather_data_frame.temperature.dtype == np.float32
+        assert weather_data_frame.lat.dtype == np.float64
+        assert "gzip" in requests_received[0]["Accept-Encoding"]
+
+    def test_get_weather__stub_api_unavailable__request_retried(self, stub_weather_api):
+        weather_api, requests_received = stub_weather_api
+        StubWeatherApiHandler.failures_before_success = 2
+        alliander_circuit_weather_retriever = AllianderCircuitWeatherRetriever(
+            AllianderWeatherSources.CDS, weather_api=weather_api, max_retries=2, backoff_factor=0)
+
+        weather_data_frame = alliander_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE,
+                                                                             self.TIME_WINDOW)
+        assert len(requests_received) == 3
+        assert len(weather_data_frame) == 25
+
+    def test_get_weather__stub_api_unavailable_after_retries__exception_thrown(self, stub_weather_api):
+        weather_api, requests_received = stub_weather_api
+        StubWeatherApiHandler.failures_before_success = 3
+        alliander_circuit_weather_retriever = AllianderCircuitWeatherRetriever(
+            AllianderWeatherSources.CDS, weather_api=weather_api, max_retries=2, backoff_factor=0)
+
+        with pytest.raises(requests.HTTPError):
+            alliander_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE, self.TIME_WINDOW)
+        assert len(requests_received) == 3
+
+    def test_get_weather__stub_api_invalid_input__exception_thrown(self, stub_weather_api):
+        weather_api, _ = stub_weather_api
+        alliander_circuit_weather_retriever = AllianderCircuitWeatherRetriever(AllianderWeatherSources.CDS,
+                                                                               weather_api=weather_api)
+        with pytest.raises(requests.HTTPError):
+            alliander_circuit_weather_retriever.get_weather(
+                self.CIRCUIT_COORDINATE, TimeWindow(self.TIME_WINDOW.end_date, self.TIME_WINDOW.start_date))
@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+import requests
+
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_weather_sources import \
+    AllianderWeatherSources
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.async_alliander_circuit_weather_retriever import \
+    AsyncAllianderCircuitWeatherRetriever
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from unit.test_alliander_circuit_weather_retriever import stub_weather_api, StubWeatherApiHandler
+
+
+class TestAsyncAllianderCircuitWeatherRetriever:
+    CIRCUIT_COORDINATES = [CircuitCoordinate(52.0 + circuit_id / 100, 5.0, circuit_id) for circuit_id in range(8)]
+    TIME_WINDOWS = [TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/01/2019") + pd.Timedelta(days=days))
+                    for days in range(1, 9)]
+
+    def test_get_weather_many__stub_api__weather_data_returned_in_order(self, stub_weather_api):
+        weather_api, _ = stub_weather_api
+        async_alliander_circuit_weather_retriever = AsyncAllianderCircuitWeatherRetriever(
+            AllianderWeatherSources.CDS, weather_api=weather_api)
+
+        weather_data_frames = async_alliander_circuit_weather_retriever.get_weather_many(self.CIRCUIT_COORDINATES,
+                                                                                         self.TIME_WINDOWS)
+        for circuit_coordinate, time_window, weather_data_frame in zip(self.CIRCUIT_COORDINATES, self.TIME_WINDOWS,
+                                                                       weather_data_frames):
+            assert weather_data_frame.lat.iloc[0] == circuit_coordinate.x
+            assert weather_data_frame.time.max() == time_window.end_date
+
+    def test_get_weather_many__max_concurrency__concurrent_requests_limited(self, stub_weather_api):
+        weather_api, requests_received = stub_weather_api
+        StubWeatherApiHandler.response_delay = 0.2
+        async_alliander_circuit_weather_retriever = AsyncAllianderCircuitWeatherRetriever(
+            AllianderWeatherSources.CDS, weather_api=weather_api, max_concurrency=4)
+
+        async_alliander_circuit_weather_retriever.get_weather_many(self.CIRCUIT_COORDINATES, self.TIME_WINDOWS)
+        assert len(requests_received) == len(self.CIRCUIT_COORDINATES)
+        assert StubWeatherApiHandler.max_active_requests == 4
+
+    def test_get_weather_many_for_retrievers__two_sources__weather_data_returned_for_both(self, stub_weather_api):
+        weather_api, requests_received = stub_weather_api
+        weather_retrievers = [AsyncAllianderCircuitWeatherRetriever(alliander_weather_source, weather_api=weather_api)
+                              for alliander_weather_source in [AllianderWeatherSources.KNMI,
+                                                               AllianderWeatherSources.CDS]]
+
+        weather_data_frames = AsyncAllianderCircuitWeatherRetriever.get_weather_many_for_retrievers(
+            weather_retrievers, self.CIRCUIT_COORDINATES, self.TIME_WINDOWS)
+        assert [len(source_weather_data_frames) for source_weather_data_frames in weather_data_frames] == [8, 8]
+        assert len(requests_received) == 16
+
+    def test_get_weather__stub_api_unavailable__request_retried(self, stub_weather_api):
+        weather_api, requests_received = stub_weather_api
+        StubWeatherApiHandler.failures_before_success = 2
+        async_alliander_circuit_weather_retriever = AsyncAllianderCircuitWeatherRetriever(
+            AllianderWeatherSources.CDS, weather_api=weather_api, max_retries=2, backoff_factor=0)
+
+        weather_data_frame = async_alliander_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATES[0],
+                                                                                   self.TIME_WINDOWS[0])
+        assert len(requests_received) == 3
+        assert len(weather_data_frame) == 25
+
+    def test_get_weather_many__invalid_input__exception_thrown(self, stub_weather_api):
+        weather_api, _ = stub_weather_api
+        async_alliander_circuit_weather_retriever = AsyncAllianderCircuitWeatherRetriever(
+            AllianderWeatherSources.CDS, weather_api=weather_api)
+        with pytest.raises(requests.HTTPError):
+            async_alliander_circuit_weather_retriever.get_weather(
+                self.CIRCUIT_COORDINATES[0], TimeWindow(pd.Timestamp("01/02/2019"), pd.Timestamp("01/01/2019")))
+        with pytest.raises(ValueError):
+            async_alliander_circuit_weather_retriever.get_weather_many(self.CIRCUIT_COORDINATES, self.TIME_WINDOWS[:1])
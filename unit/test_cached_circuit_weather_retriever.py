@@ -0,0 +1,83 @@
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_circuit_weather_retriever import \
+    AllianderCircuitWeatherRetriever
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.alliander_weather_sources import \
+    AllianderWeatherSources
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.cached_circuit_weather_retriever import \
+    CachedCircuitWeatherRetriever
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from unit.test_alliander_circuit_weather_retriever import stub_weather_api
+
+
+class TestCachedCircuitWeatherRetriever:
+    CIRCUIT_COORDINATE = CircuitCoordinate(52.508969, 4.986738, 23108)
+
+    def test_init__invalid_folder__exception_thrown(self, tmp_path):
+        with pytest.raises(ValueError):
+            CachedCircuitWeatherRetriever(AllianderCircuitWeatherRetriever(AllianderWeatherSources.KNMI),
+                                          tmp_path / "invalid")
+
+    def test_get_weather__same_time_window_twice__weather_retrieved_once(self, tmp_path, stub_weather_api):
+        weather_api, requests = stub_weather_api
+        cached_circuit_weather_retriever = CachedCircuitWeatherRetriever(
+            AllianderCircuitWeatherRetriever(AllianderWeatherSources.CDS, weather_api=weather_api), tmp_path)
+        time_window = TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/03/2019"))
+
+        weather = cached_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE, time_window)
+        cached_weather = cached_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE, time_window)
+        assert len(requests) == 1
+        assert len(weather) == 3 * 24
+        pd.testing.assert_frame_equal(weather, cached_weather)
+
+    def test_get_weather__time_window_with_timezone__weather_retrieved_once(self, tmp_path, stub_weather_api):
+        weather_api, requests = stub_weather_api
+        cached_circuit_weather_retriever = CachedCircuitWeatherRetriever(
+            AllianderCircuitWeatherRetriever(AllianderWeatherSources.CDS, weather_api=weather_api), tmp_path)
+        time_window = TimeWindow(pd.Timestamp("01/01/2019", tz="UTC"), pd.Timestamp("01/03/2019", tz="UTC"))
+
+        weather = cached_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE, time_window)
+        cached_weather = cached_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE, time_window)
+        assert len(requests) == 1
+        assert len(weather) == 3 * 24
+        pd.testing.assert_frame_equal(weather, cached_weather)
+
+    def test_get_weather__overlapping_time_window__only_missing_days_retrieved(self, tmp_path, stub_weather_api):
+        weather_api, requests = stub_weather_api
+        cached_circuit_weather_retriever = CachedCircuitWeatherRetriever(
+            AllianderCircuitWeatherRetriever(AllianderWeatherSources.CDS, weather_api=weather_api), tmp_path)
+        cached_circuit_weather_retriever.get_weather(
+            self.CIRCUIT_COORDINATE, TimeWindow(pd.Timestamp("01/03/2019"), pd.Timestamp("01/04/2019")))
+
+        weather = cached_circuit_weather_retriever.get_weather(
+            self.CIRCUIT_COORDINATE, TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/06/2019")))
+        assert [(query["begin"][0], query["end"][0]) for query in requests[1:]] == \
+               [("2019-01-01 00:00:00", "2019-01-03 00:00:00"), ("2019-01-05 00:00:00", "2019-01-07 00:00:00")]
+        assert len(weather) == 6 * 24
+        assert weather.time.is_monotonic_increasing and weather.time.is_unique
+
+    def test_get_weather__different_sources__cached_separately(self, tmp_path, stub_weather_api):
+        weather_api, requests = stub_weather_api
+        time_window = TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/02/2019"))
+        for alliander_weather_source in [AllianderWeatherSources.CDS, AllianderWeatherSources.KNMI]:
+            CachedCircuitWeatherRetriever(
+                AllianderCircuitWeatherRetriever(alliander_weather_source, weather_api=weather_api),
+                tmp_path).get_weather(self.CIRCUIT_COORDINATE, time_window)
+        assert len(requests) == 2
+
+    def test_get_weather__max_cached_entries_exceeded__least_recently_used_entry_evicted(self, tmp_path,
+                                                                                         stub_weather_api):
+        weather_api, requests = stub_weather_api
+        cached_circuit_weather_retriever = CachedCircuitWeatherRetriever(
+            AllianderCircuitWeatherRetriever(AllianderWeatherSources.CDS, weather_api=weather_api), tmp_path,
+            max_cached_entries=1)
+        time_window = TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/02/2019"))
+        other_circuit_coordinate = CircuitCoordinate(52.1, 5.1, 1)
+        cached_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE, time_window)
+        cached_circuit_weather_retriever.get_weather(other_circuit_coordinate, time_window)
+        cached_circuit_weather_retriever.get_weather(other_circuit_coordinate, time_window)
+        assert len(requests) == 2
+        cached_circuit_weather_retriever.get_weather(self.CIRCUIT_COORDINATE, time_window)
+        assert len(requests) == 3
@@ -1,11 +1,16 @@
+import dataclasses
+from typing import List, Optional
+
 import numpy as np
 import pandas as pd
 import pytest
 
-from alliander_predictive_maintenance.conversion.circuit import Circuit
-from alliander_predictive_maintenance.connection.circuit_coordinate import CircuitCoordinate
-from alliander_predictive_maintenance.connection.icircuit_partial_discharge_reader import ICircuitPartialDischargeReader
-from alliander_predictive_maintenance.conversion.time_window import TimeWindow
+from alliander_predictive_maintenance.conversion.data_types.circuit import Circuit
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_reader import \
+    ICircuitPartialDischargeReader
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_cube import PartialDischargeCube
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
 
 
 class TestCircuit:
@@ -13,6 +18,7 @@ class TestCircuit:
     CIRCUIT_LENGTH = 1500
     NUMBER_OP_PARTIAL_DISCHARGES_ON_LOCATION = 30
     MARGIN = pd.Timedelta(5, "W")
+    RESAMPLING_STRATEGIES = ["sum", "count", "max", "mean", "percentile", "energy"]
     CIRCUIT_COORDINATE = CircuitCoordinate(52.508969, 4.986738, 23108)
     JOINT_TIME_WINDOW = TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/20/2019"))
     CIRCUIT_TIME_WINDOW = TimeWindow(JOINT_TIME_WINDOW.start_date - MARGIN, JOINT_TIME_WINDOW.end_date + MARGIN)
@@ -32,26 +38,117 @@ class TestCircuit:
         with pytest.raises(ValueError):
             circuit.create_joint(self.CIRCUIT_LENGTH, self.CIRCUIT_TIME_WINDOW)
 
-    def __get_circuit(self):
+    @pytest.mark.parametrize("resampling_strategy", RESAMPLING_STRATEGIES)
+    def test_create_joints__valid_locations__same_joints_as_create_joint_returned(self, resampling_strategy):
+        circuit = self.__get_circuit()
+        locations = [20, self.LOCATION, self.LOCATION + 10, 1000]
+        joints = circuit.create_joints(locations, self.JOINT_TIME_WINDOW, resampling_strategy)
+        assert len(joints) == len(locations)
+        for location, joint in zip(locations, joints):
+            expected_joint = circuit.create_joint(location, self.JOINT_TIME_WINDOW, resampling_strategy)
+            assert joint.location == expected_joint.location
+            pd.testing.assert_series_equal(joint.partial_discharge, expected_joint.partial_discharge)
+
+    def test_create_joint__partial_discharge_not_sorted_by_time__same_joint_as_sorted_returned(self):
+        joint = self.__get_circuit(shuffle_partial_discharge=True).create_joint(self.LOCATION, self.JOINT_TIME_WINDOW)
+        expected_joint = self.__get_circuit().create_joint(self.LOCATION, self.JOINT_TIME_WINDOW)
+        assert joint.partial_discharge.index.is_monotonic_increasing
+        pd.testing.assert_series_equal(joint.partial_discharge, expected_joint.partial_discharge)
+
+    def test_create_joints__invalid_location__exception_thrown(self):
+        circuit = self.__get_circuit()
+        with pytest.raises(ValueError):
+            circuit.create_joints([self.LOCATION, self.CIRCUIT_LENGTH + 15], self.JOINT_TIME_WINDOW)
+
+    @pytest.mark.parametrize("resampling_strategy", RESAMPLING_STRATEGIES)
+    @pytest.mark.parametrize("time_resolution", ["1H", "2H", "1D"])
+    def test_create_joints__partial_discharge_cubes__same_joints_as_without_cubes_returned(self, resampling_strategy,
+                                                                                          time_resolution):
+        circuit = self.__get_circuit(random_locations=True)
+        locations = [20, self.LOCATION, self.LOCATION + 0.75, 712.3, 1000]
+        expected_joints = circuit.create_joints(locations, self.JOINT_TIME_WINDOW, resampling_strategy,
+                                                time_resolution)
+        circuit.create_partial_discharge_cubes(time_resolutions=["1H", "1D"], number_of_location_bins=200)
+        joints = circuit.create_joints(locations, self.JOINT_TIME_WINDOW, resampling_strategy, time_resolution)
+        for location, joint, expected_joint in zip(locations, joints, expected_joints):
+            pd.testing.assert_series_equal(joint.partial_discharge, expected_joint.partial_discharge, rtol=1e-6)
+            pd.testing.assert_series_equal(
+                circuit.create_joint(location, self.JOINT_TIME_WINDOW, resampling_strategy,
+                                     time_resolution).partial_discharge,
+                expected_joint.partial_discharge, rtol=1e-6)
+
+    @pytest.mark.parametrize("resampling_strategy, resample", [
+        ("count", lambda charge: charge.resample("1D").apply(np.count_nonzero)),
+        ("max", lambda charge: charge.resample("1D").max()),
+        ("mean", lambda charge: charge[charge != 0].resample("1D").mean()),
+        ("percentile", lambda charge: charge[charge != 0].resample("1D").quantile(0.9)),
+        ("energy", lambda charge: (charge ** 2).resample("1D").sum())])
+    def test_create_joint__resampling_strategy__same_as_resampling_with_pandas(self, resampling_strategy, resample):
+        circuit = self.__get_circuit(random_locations=True, zero_charges=True)
+        joint = circuit.create_joint(self.LOCATION, self.CIRCUIT_TIME_WINDOW, resampling_strategy, "1D",
+                                     percentile=90)
+        partial_discharge = self.__get_partial_discharge(random_locations=True, zero_charges=True)
+        partial_discharge = partial_discharge[
+            abs(partial_discharge[ICircuitPartialDischargeReader.LOCATION_COLUMN] - self.LOCATION) <= 15]
+        charge = partial_discharge.set_index(ICircuitPartialDischargeReader.DATETIME_COLUMN)[
+            ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN]
+        expected_partial_discharge = resample(charge).reindex(joint.partial_discharge.index).fillna(0)
+        np.testing.assert_allclose(joint.partial_discharge, expected_partial_discharge)
+
+    @pytest.mark.parametrize("resampling_strategy, percentile", [("median", 95), ("percentile", 101)])
+    def test_create_joint__invalid_resampling_strategy__exception_thrown(self, resampling_strategy, percentile):
+        circuit = self.__get_circuit()
+        with pytest.raises(ValueError):
+            circuit.create_joint(self.LOCATION, self.JOINT_TIME_WINDOW, resampling_strategy, percentile=percentile)
+
+    def test_create_joint__partial_discharge_cube_of_other_data__exception_thrown(self):
+        partial_discharge_cubes = [dataclasses.replace(partial_discharge_cube,
+                                                       number_of_events=partial_discharge_cube.number_of_events + 1)
+                                   for partial_discharge_cube in self.__get_circuit().create_partial_discharge_cubes()]
+        circuit = self.__get_circuit(partial_discharge_cubes=partial_discharge_cubes)
+        with pytest.raises(ValueError):
+            circuit.create_joint(self.LOCATION, self.JOINT_TIME_WINDOW)
+
+    def __get_circuit(self, shuffle_partial_discharge: bool = False, random_locations: bool = False,
+                      partial_discharge_cubes: Optional[List[PartialDischargeCube]] = None,
+                      zero_charges: bool = False):
         np.random.seed(42)
         weather_index = pd.date_range(self.CIRCUIT_TIME_WINDOW.start_date,
                                       self.CIRCUIT_TIME_WINDOW.end_date, freq="1H")
         weather_data = np.random.random(len(weather_index))
         weather = pd.DataFrame({"temperature": weather_data, "rain": weather_data}, weather_index)
 
+        partial_discharge = self.__get_partial_discharge(random_locations, zero_charges)
+        if shuffle_partial_discharge:
+            partial_discharge = partial_discharge.sample(frac=1, random_state=0)
+
+        circuit = Circuit(circuit_id=1234, cds_weather=weather, knmi_weather=weather,
+                          circuit_coordinate=self.CIRCUIT_COORDINATE,
+                          partial_discharge=partial_discharge, circuit_length=self.CIRCUIT_LENGTH,
+                          time_window=self.CIRCUIT_TIME_WINDOW, partial_discharge_cubes=partial_discharge_cubes)
+        return circuit
+
+    def __get_partial_discharge(self, random_locations: bool = False, zero_charges: bool = False) -> pd.DataFrame:
+        random_generator = np.random.RandomState(42)
         partial_discharge_datetime = pd.date_range(self.JOINT_TIME_WINDOW.start_date, self.JOINT_TIME_WINDOW.end_date,
                                                    freq="1H")
         partial_discharge_location = np.full(len(partial_discharge_datetime), 20)
-        random_indices = np.random.choice(len(partial_discharge_location),
-                                          size=self.NUMBER_OP_PARTIAL_DISCHARGES_ON_LOCATION)
+        random_indices = random_generator.choice(len(partial_discharge_location),
+                                                 size=self.NUMBER_OP_PARTIAL_DISCHARGES_ON_LOCATION)
         partial_discharge_location[random_indices] = self.LOCATION
-        partial_discharge_data = np.random.random(len(partial_discharge_datetime))
-        partial_discharge = pd.DataFrame(
+        if random_locations:
+            partial_discharge_location = random_generator.uniform(0, self.CIRCUIT_LENGTH,
+                                                                  len(partial_discharge_datetime))
+            # events on the edges of the location bins and of the bandwidth
+            partial_discharge_location[:4] = [self.LOCATION - 15, self.LOCATION + 15, 7.5, 0]
+            # more events near the location, so the time bins of the joint have several events
+            partial_discharge_location[4::3] = random_generator.uniform(self.LOCATION - 15, self.LOCATION + 15,
+                                                                        len(partial_discharge_location[4::3]))
+        partial_discharge_data = random_generator.random(len(partial_discharge_datetime))
+        if zero_charges:
+            # events without a charge are not discharges
+            partial_discharge_data[random_generator.random(len(partial_discharge_data)) < 0.3] = 0
+        return pd.DataFrame(
             {ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN: partial_discharge_data,
              ICircuitPartialDischargeReader.LOCATION_COLUMN: partial_discharge_location,
              ICircuitPartialDischargeReader.DATETIME_COLUMN: partial_discharge_datetime})
-
-        circuit = Circuit(circuit_id=1234, weather=weather, circuit_coordinate=self.CIRCUIT_COORDINATE,
-                          partial_discharge=partial_discharge, circuit_length=self.CIRCUIT_LENGTH,
-                          time_window=self.CIRCUIT_TIME_WINDOW)
-        return circuit
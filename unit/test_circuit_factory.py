@@ -1,55 +1,116 @@
-from alliander_predictive_maintenance.connection.alliander_circuit_weather_retriever import \
-    AllianderCircuitWeatherRetriever
-from alliander_predictive_maintenance.connection.alliander_weather_sources import AllianderWeatherSources
-from alliander_predictive_maintenance.connection.circuit_factory import CircuitFactory
-from alliander_predictive_maintenance.connection.csv_circuit_config_storage import CsvCircuitConfigStorage
-from alliander_predictive_maintenance.connection.csv_circuit_partial_discharge_storage import \
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.connection.circuit_weather_retriever.icircuit_weather_retriever import \
+    ICircuitWeatherRetriever
+from alliander_predictive_maintenance.connection.readers.circuit.circuit_factory import CircuitFactory
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_config_storage import \
+    CsvCircuitConfigStorage
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_partial_discharge_storage import \
     CsvCircuitPartialDischargeStorage
-from alliander_predictive_maintenance.connection.excel_circuit_coordinates_reader import ExcelCircuitCoordinateReader
-from alliander_predictive_maintenance.connection.excel_failed_joints_reader import ExcelFailedJointsReader
-from alliander_predictive_maintenance.connection.excel_joints_with_partial_discharge_seasonality_reader import \
-    ExcelJointsWithPartialDischargeSeasonalityReader
-from alliander_predictive_maintenance.connection.s3_merged_circuit_storage import S3MergedCircuitStorage
+from alliander_predictive_maintenance.connection.readers.circuit.excel_circuit_coordinates_reader import \
+    ExcelCircuitCoordinateReader
+from alliander_predictive_maintenance.connection.readers.circuit.npz_circuit_partial_discharge_cube_storage import \
+    NpzCircuitPartialDischargeCubeStorage
+from alliander_predictive_maintenance.constants import TEST_CIRCUIT_IDS
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
 from unit.test_csv_circuit_config_storage import tmp_circuit_circuit_config_root
 from unit.test_csv_circuit_partial_discharge_storage import tmp_circuit_partial_discharge_data_root
 from unit.test_excel_circuit_coordinate_reader import tmp_circuit_coordinates_path
-from unit.test_excel_failed_joints_reader import tmp_failedjoints_path
-from unit.test_excel_joints_with_partial_discharge_seasonality_reader import \
-    tmp_joints_with_partial_discharge_seasonality_path
-from unit.test_s3_merged_circuit_storage import mocked_get_datadump, MockedMergedCircuit
-from alliander_predictive_maintenance.constants import TEST_CIRCUIT_IDS
+
+
+class StubCircuitWeatherRetriever(ICircuitWeatherRetriever):
+    """Return hourly weather without calling a weather API"""
+    def get_weather(self, circuit_coordinate: CircuitCoordinate, time_window: TimeWindow) -> pd.DataFrame:
+        time = pd.date_range(time_window.start_date, time_window.end_date, freq="1H")
+        return pd.DataFrame({"time": time, "temperature": time.hour.astype(float)})
+
+
+@pytest.fixture
+def circuit_factory(tmp_circuit_circuit_config_root, tmp_circuit_partial_discharge_data_root,
+                    tmp_circuit_coordinates_path) -> CircuitFactory:
+    excel_circuit_coordinate_reader = ExcelCircuitCoordinateReader()
+    excel_circuit_coordinate_reader.load(tmp_circuit_coordinates_path)
+    return CircuitFactory(config={}, circuit_coordinates_reader=excel_circuit_coordinate_reader,
+                          cds_weather_retriever=StubCircuitWeatherRetriever(),
+                          knmi_weather_retriever=StubCircuitWeatherRetriever(),
+                          csv_partial_discharge_storage=CsvCircuitPartialDischargeStorage(
+                              tmp_circuit_partial_discharge_data_root),
+                          csv_circuit_config_reader=CsvCircuitConfigStorage(tmp_circuit_circuit_config_root))
 
 
 class TestCircuitFactory:
-    def test_create_circuit__valid_circuit_id__circuit_returned(self, monkeypatch, tmp_circuit_circuit_config_root,
-                                                                tmp_circuit_partial_discharge_data_root,
-                                                                tmp_failedjoints_path, tmp_circuit_coordinates_path,
-                                                                tmp_joints_with_partial_discharge_seasonality_path):
-        config = {}
-        csv_circuit_config_storage = CsvCircuitConfigStorage(tmp_circuit_circuit_config_root)
-        csv_circuit_partial_discharge_data_storage = CsvCircuitPartialDischargeStorage(
-            tmp_circuit_partial_discharge_data_root)
-        excel_failed_joints_reader = ExcelFailedJointsReader()
-        excel_failed_joints_reader.load(tmp_failedjoints_path)
-        excel_circuit_coordinate_reader = ExcelCircuitCoordinateReader()
-        excel_circuit_coordinate_reader.load(tmp_circuit_coordinates_path)
-        excel_joints_with_partial_discharge_reader = ExcelJointsWithPartialDischargeSeasonalityReader()
-        excel_joints_with_partial_discharge_reader.load(tmp_joints_with_partial_discharge_seasonality_path)
-
-        monkeypatch.setattr("alliander_predictive_maintenance.connection.s3_merged_circuit_storage.get_datadump_s3",
-            mocked_get_datadump)
-        monkeypatch.setattr("alliander_predictive_maintenance.connection.s3_merged_circuit_storage.MergedCircuit",
-            MockedMergedCircuit)
-        s3_merged_circuit_storage = S3MergedCircuitStorage()
-        s3_merged_circuit_storage.load_data_dump()
-        alliander_circuit_weather_retriever = AllianderCircuitWeatherRetriever(AllianderWeatherSources.CDS)
-
-        circuit_factory = CircuitFactory(config=config, circuit_coordinates_reader=excel_circuit_coordinate_reader,
-                                         weather_retriever=alliander_circuit_weather_retriever,
-                                         csv_circuit_config_reader=csv_circuit_config_storage,
-                                         s3_circuit_config_storage=s3_merged_circuit_storage,
-                                         s3_merged_circuit_storage=s3_merged_circuit_storage,
-                                         csv_partial_discharge_storage=csv_circuit_partial_discharge_data_storage)
+    # the coordinates fixture has no coordinate for the last test circuit
+    VALID_CIRCUIT_IDS = TEST_CIRCUIT_IDS[:-1]
+
+    def test_create_circuit__valid_circuit_id__circuit_returned(self, circuit_factory):
         circuit_id = TEST_CIRCUIT_IDS[0]
         circuit = circuit_factory.create_circuit(circuit_id)
         assert circuit.circuit_id == circuit_id
+        assert circuit.time_window == TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/05/2019"))
+
+    @pytest.mark.parametrize("parse_in_processes", [True, False])
+    def test_create_circuits__valid_circuit_ids__same_circuits_as_create_circuit_returned(self, circuit_factory,
+                                                                                          parse_in_processes):
+        circuit_creation_results = list(circuit_factory.create_circuits(self.VALID_CIRCUIT_IDS, max_workers=2,
+                                                                        parse_in_processes=parse_in_processes))
+        assert sorted(result.circuit_id for result in circuit_creation_results) == self.VALID_CIRCUIT_IDS
+        for circuit_creation_result in circuit_creation_results:
+            assert circuit_creation_result.succeeded
+            expected_circuit = circuit_factory.create_circuit(circuit_creation_result.circuit_id)
+            assert circuit_creation_result.circuit.circuit_length == expected_circuit.circuit_length
+            assert circuit_creation_result.circuit.time_window == expected_circuit.time_window
+            pd.testing.assert_series_equal(
+                circuit_creation_result.circuit.create_joint(3, expected_circuit.time_window).partial_discharge,
+                expected_circuit.create_joint(3, expected_circuit.time_window).partial_discharge)
+
+    @pytest.mark.parametrize("parse_in_processes", [True, False])
+    def test_create_circuits__invalid_circuit_ids__failures_reported(self, circuit_factory, parse_in_processes):
+        circuit_ids = TEST_CIRCUIT_IDS + [99]
+        circuit_creation_results = {result.circuit_id: result for result in circuit_factory.create_circuits(
+            circuit_ids, max_workers=2, parse_in_processes=parse_in_processes)}
+        assert [circuit_id for circuit_id in circuit_ids
+                if circuit_creation_results[circuit_id].succeeded] == self.VALID_CIRCUIT_IDS
+        assert isinstance(circuit_creation_results[TEST_CIRCUIT_IDS[-1]].error, ValueError)
+        assert circuit_creation_results[99].circuit is None
+
+    def test_create_circuits__iteration_stopped__remaining_circuits_not_submitted(self, circuit_factory):
+        consumed_circuit_ids = []
+
+        def circuit_ids():
+            for circuit_id in self.VALID_CIRCUIT_IDS * 25:
+                consumed_circuit_ids.append(circuit_id)
+                yield circuit_id
+
+        circuit_creation_results = circuit_factory.create_circuits(circuit_ids(), max_workers=1,
+                                                                   parse_in_processes=False, max_pending_circuits=2)
+        assert next(circuit_creation_results).succeeded
+        circuit_creation_results.close()
+        assert len(consumed_circuit_ids) <= 3
+
+    def test_create_circuit__partial_discharge_cube_reader__circuit_with_cubes_returned(
+            self, circuit_factory, tmp_circuit_circuit_config_root, tmp_circuit_partial_discharge_data_root,
+            tmp_circuit_coordinates_path, tmp_path):
+        circuit_id = TEST_CIRCUIT_IDS[0]
+        circuit = circuit_factory.create_circuit(circuit_id)
+        npz_circuit_partial_discharge_cube_storage = NpzCircuitPartialDischargeCubeStorage(tmp_path)
+        npz_circuit_partial_discharge_cube_storage.write_partial_discharge_cubes_for_circuit(
+            str(circuit_id), circuit.create_partial_discharge_cubes())
+        excel_circuit_coordinate_reader = ExcelCircuitCoordinateReader()
+        excel_circuit_coordinate_reader.load(tmp_circuit_coordinates_path)
+        circuit_factory_with_cubes = CircuitFactory(
+            config={}, circuit_coordinates_reader=excel_circuit_coordinate_reader,
+            cds_weather_retriever=StubCircuitWeatherRetriever(), knmi_weather_retriever=StubCircuitWeatherRetriever(),
+            csv_partial_discharge_storage=CsvCircuitPartialDischargeStorage(tmp_circuit_partial_discharge_data_root),
+            csv_circuit_config_reader=CsvCircuitConfigStorage(tmp_circuit_circuit_config_root),
+            partial_discharge_cube_reader=npz_circuit_partial_discharge_cube_storage)
+
+        circuit_with_cubes = circuit_factory_with_cubes.create_circuit(circuit_id)
+        assert len(circuit_with_cubes.partial_discharge_cubes) == len(circuit.partial_discharge_cubes)
+        # a circuit without cubes creates its joints from the partial discharge events
+        assert circuit_factory_with_cubes.create_circuit(self.VALID_CIRCUIT_IDS[1]).partial_discharge_cubes == []
+        pd.testing.assert_series_equal(
+            circuit_with_cubes.create_joint(3, circuit.time_window, "count", "1D").partial_discharge,
+            circuit_factory.create_circuit(circuit_id).create_joint(3, circuit.time_window, "count",
+                                                                    "1D").partial_discharge)
@@ -3,7 +3,7 @@ from pathlib import Path
 import pandas as pd
 import pytest
 
-from alliander_predictive_maintenance.connection.csv_circuit_config_storage import CsvCircuitConfigStorage
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_config_storage import CsvCircuitConfigStorage
 from alliander_predictive_maintenance.constants import TEST_CIRCUIT_IDS
 
 
@@ -24,12 +24,12 @@ def circuit_config_storage_to_csv(data_path: Path):
 
 def circuit_config_dataframe():
     data = {
-        CsvCircuitConfigStorage.COMPONENT_TYPE: ["RMU", "Termination", "Joint"],
-        CsvCircuitConfigStorage.LENGTH: [1, 2, 3],
-        CsvCircuitConfigStorage.CUMULATIVE_LENGTH: [10, 20, 30],
-        CsvCircuitConfigStorage.COMPONENT_NAME: ["Leeuwarden", "Arnhem", "Apeldoorn"],
-        CsvCircuitConfigStorage.DISTANCE_TO_START: [1, 2, 3],
-        CsvCircuitConfigStorage.DISTANCE_TO_END: [4, 5, 6]
+        CsvCircuitConfigStorage.COMPONENT_TYPE_COLUMN: ["RMU", "Termination", "Joint"],
+        CsvCircuitConfigStorage.LENGTH_COLUMN: [1, 2, 3],
+        CsvCircuitConfigStorage.CUMULATIVE_LENGTH_COLUMN: [10, 20, 30],
+        CsvCircuitConfigStorage.COMPONENT_NAME_COLUMN: ["Leeuwarden", "Arnhem", "Apeldoorn"],
+        CsvCircuitConfigStorage.DISTANCE_TO_START_COLUMN: [1, 2, 3],
+        CsvCircuitConfigStorage.DISTANCE_TO_END_COLUMN: [4, 5, 6]
     }
     return pd.DataFrame(data)
 
@@ -50,6 +50,8 @@ class TestCsvCircuitConfigStorage:
         for circuit_id in TEST_CIRCUIT_IDS:
             circuit_config = csv_circuit_config_storage.get_circuit_config(circuit_id)
             assert len(circuit_config) == 3
+            assert circuit_config[CsvCircuitConfigStorage.COMPONENT_TYPE_COLUMN].dtype == "category"
+            assert circuit_config[CsvCircuitConfigStorage.COMPONENT_NAME_COLUMN].dtype == "category"
 
     def test_get_circuit_config__invalid_circuit_given__exception_thrown(self, tmp_circuit_circuit_config_root):
         csv_circuit_config_storage = CsvCircuitConfigStorage(tmp_circuit_circuit_config_root)
@@ -1,11 +1,13 @@
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from alliander_predictive_maintenance.connection.csv_circuit_partial_discharge_storage import \
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_partial_discharge_storage import \
     CsvCircuitPartialDischargeStorage
 from alliander_predictive_maintenance.constants import TEST_CIRCUIT_IDS
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
 
 
 @pytest.fixture
@@ -54,9 +56,58 @@ class TestCsvCircuitPartialDischargeStorage:
                 circuit_id)
             assert len(partial_discharge_data) == 5
 
+    @pytest.mark.parametrize("datetime_format", ["%Y-%m-%d %H:%M:%S", "%Y/%m/%d %H:%M"])
+    def test_get_partial_discharge_data_for_circuit__datetime_format_given__schema_enforced(
+            self, tmp_path, datetime_format):
+        data_frame = circuit_partial_discharge_dataframe()
+        data_frame.to_csv(tmp_path / f"{TEST_CIRCUIT_IDS[0]}.csv", date_format=datetime_format, index=False)
+        partial_discharge_data = CsvCircuitPartialDischargeStorage(tmp_path).get_partial_discharge_data_for_circuit(
+            TEST_CIRCUIT_IDS[0])
+        assert partial_discharge_data[CsvCircuitPartialDischargeStorage.LOCATION_COLUMN].dtype == np.float32
+        assert partial_discharge_data[CsvCircuitPartialDischargeStorage.PARTIAL_DISCHARGE_DATA_COLUMN].dtype == \
+               np.float32
+        assert partial_discharge_data[CsvCircuitPartialDischargeStorage.DATETIME_COLUMN].equals(
+            data_frame[CsvCircuitPartialDischargeStorage.DATETIME_COLUMN])
+
     def test_get_partial_discharge_data_for_circuit__invalid_circuit_given__exception_thrown(self,
                                                                                              tmp_circuit_partial_discharge_data_root):
         csv_circuit_partial_discharge_storage = CsvCircuitPartialDischargeStorage(
             tmp_circuit_partial_discharge_data_root)
         with pytest.raises(FileNotFoundError):
             csv_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit("invalid_circuit")
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 10])
+    def test_get_partial_discharge_data_for_circuit__chunk_size_given__compact_partial_discharge_data_returned(
+            self, tmp_circuit_partial_discharge_data_root, chunk_size):
+        csv_circuit_partial_discharge_storage = CsvCircuitPartialDischargeStorage(
+            tmp_circuit_partial_discharge_data_root, chunk_size=chunk_size)
+        partial_discharge_data = csv_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit(
+            TEST_CIRCUIT_IDS[0])
+        assert len(partial_discharge_data) == 5
+        assert partial_discharge_data[CsvCircuitPartialDischargeStorage.LOCATION_COLUMN].dtype == np.float32
+        assert partial_discharge_data[CsvCircuitPartialDischargeStorage.PARTIAL_DISCHARGE_DATA_COLUMN].dtype == \
+               np.float32
+        assert partial_discharge_data[CsvCircuitPartialDischargeStorage.DATETIME_COLUMN].equals(
+            circuit_partial_discharge_dataframe()[CsvCircuitPartialDischargeStorage.DATETIME_COLUMN])
+
+    def test_get_partial_discharge_data_for_circuit__filters_given__filtered_partial_discharge_data_returned(
+            self, tmp_circuit_partial_discharge_data_root):
+        csv_circuit_partial_discharge_storage = CsvCircuitPartialDischargeStorage(
+            tmp_circuit_partial_discharge_data_root, chunk_size=2)
+        time_window = TimeWindow(pd.Timestamp("01/02/2019"), pd.Timestamp("01/04/2019"))
+        partial_discharge_data = csv_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit(
+            TEST_CIRCUIT_IDS[0], time_window=time_window, location_range=(3, 10))
+        assert partial_discharge_data[CsvCircuitPartialDischargeStorage.LOCATION_COLUMN].tolist() == [3, 4]
+
+        partial_discharge_data = csv_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit(
+            TEST_CIRCUIT_IDS[0], location_range=(100, 200))
+        assert len(partial_discharge_data) == 0
+        assert list(partial_discharge_data.columns) == CsvCircuitPartialDischargeStorage.MANDATORY_COLUMNS
+
+    def test_get_partial_discharge_chunks_for_circuit__valid_circuit_given__bounded_chunks_returned(
+            self, tmp_circuit_partial_discharge_data_root):
+        csv_circuit_partial_discharge_storage = CsvCircuitPartialDischargeStorage(
+            tmp_circuit_partial_discharge_data_root, chunk_size=2)
+        chunks = list(csv_circuit_partial_discharge_storage.get_partial_discharge_chunks_for_circuit(
+            TEST_CIRCUIT_IDS[0]))
+        assert [len(chunk) for chunk in chunks] == [2, 2, 1]
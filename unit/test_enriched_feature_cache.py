@@ -0,0 +1,148 @@
+import statistics
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.enriched_feature_cache import EnrichedFeatureCache
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.weather_and_partial_discharge_transformer import \
+    WeatherAndPartialDischargeTransformer
+from unit.test_partial_discharge_forecaster import tmp_weather_partial_discharge_data, joint_data
+
+
+class CountingTransformer:
+    """Enrich joint data and count how often it was called"""
+    def __init__(self):
+        self.calls = 0
+        self.__transformer = WeatherAndPartialDischargeTransformer(PartialDischargeForecaster.WEATHER_COLUMNS,
+                                                                   PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN)
+
+    def transform(self, predictive_maintenance_joint_data: PredictiveMaintenanceJointData) -> \
+            PredictiveMaintenanceJointData:
+        self.calls += 1
+        return self.__transformer.transform(predictive_maintenance_joint_data, [7],
+                                            PartialDischargeForecaster.ENRICHMENT_METHODS)
+
+
+class TestEnrichedFeatureCache:
+    LAGS = [7]
+    METHODS = PartialDischargeForecaster.ENRICHMENT_METHODS
+
+    def test_init__invalid_path_given__exception_thrown(self):
+        with pytest.raises(ValueError):
+            EnrichedFeatureCache(cache_absolute_root_folder=Path("some/invalid/path"))
+
+    def test_get_or_enrich__identical_data__enriched_once(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        counting_transformer = CountingTransformer()
+        enriched_feature_cache = EnrichedFeatureCache()
+
+        enriched = enriched_feature_cache.get_or_enrich(joint_data(weather[:500], partial_discharge[:500]), self.LAGS,
+                                                        self.METHODS, counting_transformer.transform)
+        # a copy of the data is another object with the same content
+        cached_enriched = enriched_feature_cache.get_or_enrich(
+            joint_data(weather[:500].copy(), partial_discharge[:500].copy()), self.LAGS, self.METHODS,
+            counting_transformer.transform)
+        assert counting_transformer.calls == 1
+        pd.testing.assert_frame_equal(cached_enriched.cds_weather, enriched.cds_weather)
+        pd.testing.assert_series_equal(cached_enriched.partial_discharge, enriched.partial_discharge)
+
+    def test_get_key__different_input__different_keys(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        enriched_feature_cache = EnrichedFeatureCache()
+        predictive_maintenance_joint_data = joint_data(weather[:500], partial_discharge[:500])
+        changed_partial_discharge = partial_discharge[:500].copy()
+        changed_partial_discharge.iloc[250] += 1
+        keys = [enriched_feature_cache.get_key(predictive_maintenance_joint_data, self.LAGS, self.METHODS),
+                enriched_feature_cache.get_key(joint_data(weather[:500], changed_partial_discharge), self.LAGS,
+                                               self.METHODS),
+                enriched_feature_cache.get_key(joint_data(weather[1:501].set_axis(weather.index[:500]),
+                                                          partial_discharge[:500]), self.LAGS, self.METHODS),
+                enriched_feature_cache.get_key(joint_data(weather[:500].shift(freq="1D"), partial_discharge[:500]),
+                                               self.LAGS, self.METHODS),
+                enriched_feature_cache.get_key(predictive_maintenance_joint_data, [3], self.METHODS),
+                enriched_feature_cache.get_key(predictive_maintenance_joint_data, self.LAGS, [np.mean])]
+        assert len(set(keys)) == len(keys)
+
+    def test_get_key__methods_with_same_name_in_other_modules__different_keys(self,
+                                                                              tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        enriched_feature_cache = EnrichedFeatureCache()
+        predictive_maintenance_joint_data = joint_data(weather[:500], partial_discharge[:500])
+
+        assert enriched_feature_cache.get_key(predictive_maintenance_joint_data, self.LAGS, [np.mean]) != \
+               enriched_feature_cache.get_key(predictive_maintenance_joint_data, self.LAGS, [statistics.mean])
+
+    def test_get_or_enrich__lambda_method__enriched_without_caching(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        counting_transformer = CountingTransformer()
+        enriched_feature_cache = EnrichedFeatureCache()
+        methods = [lambda values: np.mean(values)]
+
+        for _ in range(2):
+            enriched_feature_cache.get_or_enrich(joint_data(weather[:500], partial_discharge[:500]), self.LAGS,
+                                                 methods, counting_transformer.transform)
+        assert enriched_feature_cache.get_key(joint_data(weather[:500], partial_discharge[:500]), self.LAGS,
+                                              methods) is None
+        assert counting_transformer.calls == 2
+        assert len(enriched_feature_cache) == 0
+
+    def test_get_or_enrich__other_joint_with_identical_data__joint_of_request_returned(
+            self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        enriched_feature_cache = EnrichedFeatureCache()
+        counting_transformer = CountingTransformer()
+        enriched_feature_cache.get_or_enrich(joint_data(weather[:500], partial_discharge[:500]), self.LAGS,
+                                             self.METHODS, counting_transformer.transform)
+        other_joint_data = PredictiveMaintenanceJointData(cds_weather=weather[:500], knmi_weather=None,
+                                                          partial_discharge=partial_discharge[:500], circuit_id=4321,
+                                                          location_in_meters=300)
+        enriched = enriched_feature_cache.get_or_enrich(other_joint_data, self.LAGS, self.METHODS,
+                                                        counting_transformer.transform)
+        assert counting_transformer.calls == 1
+        assert (enriched.circuit_id, enriched.location_in_meters) == (4321, 300)
+
+    def test_get_or_enrich__cache_full__least_recently_used_evicted(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        enriched_feature_cache = EnrichedFeatureCache(max_entries=1)
+        counting_transformer = CountingTransformer()
+        for start in [0, 100, 0]:
+            enriched_feature_cache.get_or_enrich(joint_data(weather[start:start + 500],
+                                                            partial_discharge[start:start + 500]),
+                                                 self.LAGS, self.METHODS, counting_transformer.transform)
+        assert counting_transformer.calls == 3
+
+    def test_get_or_enrich__on_disk_tier__enriched_data_read_by_new_cache(self, tmp_path,
+                                                                         tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        counting_transformer = CountingTransformer()
+        enriched = EnrichedFeatureCache(cache_absolute_root_folder=tmp_path).get_or_enrich(
+            joint_data(weather[:500], partial_discharge[:500]), self.LAGS, self.METHODS,
+            counting_transformer.transform)
+        read_enriched = EnrichedFeatureCache(cache_absolute_root_folder=tmp_path).get_or_enrich(
+            joint_data(weather[:500], partial_discharge[:500]), self.LAGS, self.METHODS,
+            counting_transformer.transform)
+        assert counting_transformer.calls == 1
+        assert len(list(tmp_path.iterdir())) == 1
+        pd.testing.assert_frame_equal(read_enriched.cds_weather, enriched.cds_weather)
+        pd.testing.assert_series_equal(read_enriched.partial_discharge, enriched.partial_discharge)
+
+    def test_fit__forecaster_with_cache__same_results_as_without_cache(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        model_results = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, self.LAGS).fit(
+            joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+        enriched_feature_cache = EnrichedFeatureCache()
+        for _ in range(2):
+            cached_model_results = PartialDischargeForecaster(
+                PartialDischargeForecasterModel.LASSO, self.LAGS, enriched_feature_cache=enriched_feature_cache).fit(
+                joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+            for key in ["train", "test"]:
+                assert cached_model_results[key].r2_score == model_results[key].r2_score
+        assert len(enriched_feature_cache) == 1
@@ -1,8 +1,8 @@
 import pandas as pd
 import pytest
 
-from alliander_predictive_maintenance.connection.circuit_coordinate import CircuitCoordinate
-from alliander_predictive_maintenance.connection.excel_circuit_coordinates_reader import ExcelCircuitCoordinateReader
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.connection.readers.circuit.excel_circuit_coordinates_reader import ExcelCircuitCoordinateReader
 
 
 @pytest.fixture
@@ -0,0 +1,84 @@
+import pytest
+
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_partial_discharge_storage import \
+    CsvCircuitPartialDischargeStorage
+from alliander_predictive_maintenance.constants import TEST_CIRCUIT_IDS
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.instrumentation.in_memory_instrumentation_sink import \
+    InMemoryInstrumentationSink
+from alliander_predictive_maintenance.instrumentation.instrumentation import Instrumentation, instrumentation
+from unit.test_csv_circuit_partial_discharge_storage import tmp_circuit_partial_discharge_data_root
+from unit.test_partial_discharge_forecaster import joint_data, tmp_weather_partial_discharge_data
+
+
+@pytest.fixture
+def in_memory_instrumentation_sink() -> InMemoryInstrumentationSink:
+    in_memory_instrumentation_sink = InMemoryInstrumentationSink()
+    instrumentation.add_sink(in_memory_instrumentation_sink)
+    yield in_memory_instrumentation_sink
+    instrumentation.remove_sink(in_memory_instrumentation_sink)
+
+
+class TestInstrumentation:
+    def test_span__no_sinks__shared_no_op_span_returned(self):
+        assert not Instrumentation().enabled
+        assert Instrumentation().span("stage") is Instrumentation.NO_OP_SPAN
+
+    def test_span__sink_added__span_recorded(self):
+        test_instrumentation = Instrumentation()
+        in_memory_instrumentation_sink = InMemoryInstrumentationSink()
+        test_instrumentation.add_sink(in_memory_instrumentation_sink)
+        with test_instrumentation.span("stage", circuit_id="1"):
+            pass
+        spans = in_memory_instrumentation_sink.get_spans()
+        assert [(span.name, span.labels, span.succeeded) for span in spans] == [("stage", {"circuit_id": "1"}, True)]
+        assert spans[0].duration_seconds >= 0
+
+    def test_span__exception_raised__failed_span_recorded_and_exception_raised(self):
+        test_instrumentation = Instrumentation()
+        in_memory_instrumentation_sink = InMemoryInstrumentationSink()
+        test_instrumentation.add_sink(in_memory_instrumentation_sink)
+        with pytest.raises(ValueError):
+            with test_instrumentation.span("stage"):
+                raise ValueError
+        assert not in_memory_instrumentation_sink.get_spans("stage")[0].succeeded
+
+    def test_count__sink_removed__nothing_recorded(self):
+        test_instrumentation = Instrumentation()
+        in_memory_instrumentation_sink = InMemoryInstrumentationSink()
+        test_instrumentation.add_sink(in_memory_instrumentation_sink)
+        test_instrumentation.count("rows_read", 3, format="csv")
+        test_instrumentation.count("rows_read", 2, format="csv")
+        test_instrumentation.remove_sink(in_memory_instrumentation_sink)
+        test_instrumentation.count("rows_read", 5, format="csv")
+        assert not test_instrumentation.enabled
+        assert in_memory_instrumentation_sink.get_counter("rows_read", format="csv") == 5
+        assert in_memory_instrumentation_sink.get_counter("rows_read") == 0
+
+    def test_traced__sink_added__span_per_call_recorded(self):
+        test_instrumentation = Instrumentation()
+
+        @test_instrumentation.traced()
+        def add(a, b):
+            return a + b
+
+        assert add(1, 2) == 3
+        in_memory_instrumentation_sink = InMemoryInstrumentationSink()
+        test_instrumentation.add_sink(in_memory_instrumentation_sink)
+        assert add(1, 2) == 3
+        assert [span.name for span in in_memory_instrumentation_sink.get_spans()] == [add.__qualname__]
+
+    def test_instrumentation__pipeline_stages_run__spans_and_counters_recorded(
+            self, in_memory_instrumentation_sink, tmp_circuit_partial_discharge_data_root,
+            tmp_weather_partial_discharge_data):
+        CsvCircuitPartialDischargeStorage(tmp_circuit_partial_discharge_data_root).\
+            get_partial_discharge_data_for_circuit(TEST_CIRCUIT_IDS[0])
+        PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, [7]).fit(
+            joint_data(*tmp_weather_partial_discharge_data), train_size=0.8)
+        assert in_memory_instrumentation_sink.get_counter("partial_discharge_rows_read", format="csv") == 5
+        assert len(in_memory_instrumentation_sink.get_spans("partial_discharge_csv_read")) == 1
+        assert len(in_memory_instrumentation_sink.get_spans("PartialDischargeForecaster.fit")) == 1
+        assert "PartialDischargeForecaster.fit" in in_memory_instrumentation_sink.get_total_durations()
@@ -0,0 +1,18 @@
+import logging
+
+from alliander_predictive_maintenance.instrumentation.counter_record import CounterRecord
+from alliander_predictive_maintenance.instrumentation.logging_instrumentation_sink import LoggingInstrumentationSink
+from alliander_predictive_maintenance.instrumentation.span_record import SpanRecord
+
+
+class TestLoggingInstrumentationSink:
+    def test_record_span__failed_span__logged(self, caplog):
+        caplog.set_level(logging.INFO)
+        LoggingInstrumentationSink().record_span(SpanRecord("weather_request", 0.0, 0.25, {"weather_source": "cds"},
+                                                            succeeded=False))
+        assert caplog.messages == ["span weather_request took 0.250000 s and failed {'weather_source': 'cds'}"]
+
+    def test_record_counter__counter__logged(self, caplog):
+        caplog.set_level(logging.INFO)
+        LoggingInstrumentationSink().record_counter(CounterRecord("weather_bytes_fetched", 1024))
+        assert caplog.messages == ["counter weather_bytes_fetched increased by 1024"]
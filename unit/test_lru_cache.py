@@ -0,0 +1,17 @@
+from alliander_predictive_maintenance.cyber.simulation_model.lru_cache import LruCache
+
+
+class TestLruCache:
+    def test_put__cache_full__least_recently_used_entry_evicted(self):
+        lru_cache = LruCache(max_entries=2)
+        lru_cache.put("a", 1)
+        lru_cache.put("b", 2)
+        assert lru_cache.get("a") == 1
+        lru_cache.put("c", 3)
+        assert "b" not in lru_cache
+        assert lru_cache.get("a") == 1
+        assert lru_cache.get("c") == 3
+        assert len(lru_cache) == 2
+
+    def test_get__missing_key__none_returned(self):
+        assert LruCache(max_entries=2).get("a") is None
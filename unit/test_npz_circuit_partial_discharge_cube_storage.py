@@ -0,0 +1,95 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_cube_reader import \
+    ICircuitPartialDischargeCubeReader
+from alliander_predictive_maintenance.connection.readers.circuit.npz_circuit_partial_discharge_cube_storage import \
+    NpzCircuitPartialDischargeCubeStorage
+from alliander_predictive_maintenance.connection.readers.circuit.numpy_circuit_partial_discharge_storage import \
+    NumpyCircuitPartialDischargeStorage
+from alliander_predictive_maintenance.constants import TEST_CIRCUIT_IDS
+from alliander_predictive_maintenance.conversion.data_types.circuit import Circuit
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from unit.test_numpy_circuit_partial_discharge_storage import tmp_numpy_partial_discharge_data_root
+
+TIME_WINDOW = TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/05/2019"))
+
+
+def create_circuit(location_index, partial_discharge_cubes=None) -> Circuit:
+    return Circuit(circuit_id=TEST_CIRCUIT_IDS[0], cds_weather=None, knmi_weather=None,
+                   circuit_coordinate=CircuitCoordinate(52.508969, 4.986738, TEST_CIRCUIT_IDS[0]),
+                   partial_discharge=location_index, time_window=TIME_WINDOW, circuit_length=100,
+                   partial_discharge_cubes=partial_discharge_cubes)
+
+
+@pytest.fixture
+def tmp_partial_discharge_cube_root(tmp_path, tmp_numpy_partial_discharge_data_root) -> Path:
+    cube_root = tmp_path / "PartialDischargeCubes"
+    cube_root.mkdir(parents=True, exist_ok=True)
+    location_index = NumpyCircuitPartialDischargeStorage(
+        tmp_numpy_partial_discharge_data_root).get_partial_discharge_location_index_for_circuit(TEST_CIRCUIT_IDS[0])
+    NpzCircuitPartialDischargeCubeStorage(cube_root).write_partial_discharge_cubes_for_circuit(
+        TEST_CIRCUIT_IDS[0], create_circuit(location_index).create_partial_discharge_cubes(
+            number_of_location_bins=10))
+    return cube_root
+
+
+class TestNpzCircuitPartialDischargeCubeStorage:
+    def test_issubclass__storage__a_cube_reader(self):
+        assert issubclass(NpzCircuitPartialDischargeCubeStorage, ICircuitPartialDischargeCubeReader)
+        assert not issubclass(NumpyCircuitPartialDischargeStorage, ICircuitPartialDischargeCubeReader)
+
+    def test_init__invalid_data_path_given__exception_thrown(self):
+        with pytest.raises(ValueError):
+            NpzCircuitPartialDischargeCubeStorage(Path("some/invalid/path"))
+
+    def test_get_partial_discharge_cubes_for_circuit__invalid_circuit_given__exception_thrown(
+            self, tmp_partial_discharge_cube_root):
+        with pytest.raises(FileNotFoundError):
+            NpzCircuitPartialDischargeCubeStorage(
+                tmp_partial_discharge_cube_root).get_partial_discharge_cubes_for_circuit("invalid_circuit")
+
+    def test_get_partial_discharge_cubes_for_circuit__cube_without_squared_sums__exception_thrown(
+            self, tmp_partial_discharge_cube_root):
+        cube_path = tmp_partial_discharge_cube_root / str(TEST_CIRCUIT_IDS[0]) / "1D.npz"
+        with np.load(cube_path) as arrays:
+            arrays_without_squared_sums = {name: arrays[name] for name in arrays.files if name != "squared_sums"}
+        np.savez(cube_path, **arrays_without_squared_sums)
+        with pytest.raises(ValueError, match="create_partial_discharge_cubes"):
+            NpzCircuitPartialDischargeCubeStorage(
+                tmp_partial_discharge_cube_root).get_partial_discharge_cubes_for_circuit(TEST_CIRCUIT_IDS[0])
+
+    def test_get_partial_discharge_cubes_for_circuit__valid_circuit_given__written_cubes_returned(
+            self, tmp_partial_discharge_cube_root, tmp_numpy_partial_discharge_data_root):
+        location_index = NumpyCircuitPartialDischargeStorage(
+            tmp_numpy_partial_discharge_data_root).get_partial_discharge_location_index_for_circuit(TEST_CIRCUIT_IDS[0])
+        expected_partial_discharge_cubes = create_circuit(location_index).create_partial_discharge_cubes(
+            number_of_location_bins=10)
+        partial_discharge_cubes = NpzCircuitPartialDischargeCubeStorage(
+            tmp_partial_discharge_cube_root).get_partial_discharge_cubes_for_circuit(TEST_CIRCUIT_IDS[0])
+        assert sorted(cube.time_resolution for cube in partial_discharge_cubes) == \
+            sorted(cube.time_resolution for cube in expected_partial_discharge_cubes)
+        for partial_discharge_cube in partial_discharge_cubes:
+            expected_partial_discharge_cube = next(cube for cube in expected_partial_discharge_cubes
+                                                   if cube.time_resolution == partial_discharge_cube.time_resolution)
+            assert partial_discharge_cube.time_bins.equals(expected_partial_discharge_cube.time_bins)
+            assert partial_discharge_cube.time_bins.name == expected_partial_discharge_cube.time_bins.name
+            assert partial_discharge_cube.location_bin_width == expected_partial_discharge_cube.location_bin_width
+            assert partial_discharge_cube.number_of_events == expected_partial_discharge_cube.number_of_events
+            for array in ["cell_offsets", "cell_time_bins", "sums", "counts", "maxima"]:
+                assert np.array_equal(getattr(partial_discharge_cube, array),
+                                      getattr(expected_partial_discharge_cube, array))
+
+    def test_create_joint__circuit_with_read_cubes__same_joint_as_without_cubes_returned(
+            self, tmp_partial_discharge_cube_root, tmp_numpy_partial_discharge_data_root):
+        location_index = NumpyCircuitPartialDischargeStorage(
+            tmp_numpy_partial_discharge_data_root).get_partial_discharge_location_index_for_circuit(TEST_CIRCUIT_IDS[0])
+        partial_discharge_cubes = NpzCircuitPartialDischargeCubeStorage(
+            tmp_partial_discharge_cube_root).get_partial_discharge_cubes_for_circuit(TEST_CIRCUIT_IDS[0])
+        joint = create_circuit(location_index, partial_discharge_cubes).create_joint(3, TIME_WINDOW, "count", "1D")
+        expected_joint = create_circuit(location_index).create_joint(3, TIME_WINDOW, "count", "1D")
+        pd.testing.assert_series_equal(joint.partial_discharge, expected_joint.partial_discharge)
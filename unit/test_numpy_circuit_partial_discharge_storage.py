@@ -0,0 +1,101 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_partial_discharge_storage import \
+    CsvCircuitPartialDischargeStorage
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_location_index_reader import \
+    ICircuitPartialDischargeLocationIndexReader
+from alliander_predictive_maintenance.connection.readers.circuit.numpy_circuit_partial_discharge_storage import \
+    NumpyCircuitPartialDischargeStorage
+from alliander_predictive_maintenance.constants import TEST_CIRCUIT_IDS
+from alliander_predictive_maintenance.conversion.data_types.circuit import Circuit
+from alliander_predictive_maintenance.conversion.data_types.circuit_coordinate import CircuitCoordinate
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from unit.test_csv_circuit_partial_discharge_storage import circuit_partial_discharge_dataframe
+
+
+@pytest.fixture
+def tmp_numpy_partial_discharge_data_root(tmp_path) -> Path:
+    numpy_root = tmp_path / "PartialDischargeNumpy"
+    numpy_root.mkdir(parents=True, exist_ok=True)
+    numpy_circuit_partial_discharge_storage = NumpyCircuitPartialDischargeStorage(numpy_root)
+    for circuit_id in TEST_CIRCUIT_IDS:
+        numpy_circuit_partial_discharge_storage.write_partial_discharge_data_for_circuit(
+            circuit_id, circuit_partial_discharge_dataframe())
+    return numpy_root
+
+
+class TestNumpyCircuitPartialDischargeStorage:
+    def test_issubclass__csv_storage__not_a_location_index_reader(self):
+        assert issubclass(NumpyCircuitPartialDischargeStorage, ICircuitPartialDischargeLocationIndexReader)
+        assert not issubclass(CsvCircuitPartialDischargeStorage, ICircuitPartialDischargeLocationIndexReader)
+
+    def test_init__invalid_data_path_given__exception_thrown(self):
+        with pytest.raises(ValueError):
+            NumpyCircuitPartialDischargeStorage(Path("some/invalid/path"))
+
+    def test_get_partial_discharge_data_for_circuit__valid_circuit_given__partial_discharge_data_returned(
+            self, tmp_numpy_partial_discharge_data_root):
+        numpy_circuit_partial_discharge_storage = NumpyCircuitPartialDischargeStorage(
+            tmp_numpy_partial_discharge_data_root)
+        for circuit_id in TEST_CIRCUIT_IDS:
+            partial_discharge_data = numpy_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit(
+                circuit_id)
+            pd.testing.assert_frame_equal(partial_discharge_data, circuit_partial_discharge_dataframe(),
+                                          check_dtype=False, check_like=True)
+
+    def test_get_partial_discharge_location_index_for_circuit__valid_circuit_given__memory_mapped_index_returned(
+            self, tmp_numpy_partial_discharge_data_root):
+        numpy_circuit_partial_discharge_storage = NumpyCircuitPartialDischargeStorage(
+            tmp_numpy_partial_discharge_data_root)
+        location_index = numpy_circuit_partial_discharge_storage.get_partial_discharge_location_index_for_circuit(
+            TEST_CIRCUIT_IDS[0])
+        assert isinstance(location_index.locations, np.memmap)
+        assert location_index.locations.dtype == np.float32
+        assert location_index.charges.dtype == np.float32
+        assert np.all(np.diff(location_index.locations) >= 0)
+
+    def test_get_partial_discharge_location_index_for_circuit__invalid_circuit_given__exception_thrown(
+            self, tmp_numpy_partial_discharge_data_root):
+        numpy_circuit_partial_discharge_storage = NumpyCircuitPartialDischargeStorage(
+            tmp_numpy_partial_discharge_data_root)
+        with pytest.raises(FileNotFoundError):
+            numpy_circuit_partial_discharge_storage.get_partial_discharge_location_index_for_circuit("invalid_circuit")
+
+    def test_create_joint__circuit_with_memory_mapped_index__same_joint_as_dataframe_returned(
+            self, tmp_numpy_partial_discharge_data_root):
+        numpy_circuit_partial_discharge_storage = NumpyCircuitPartialDischargeStorage(
+            tmp_numpy_partial_discharge_data_root)
+        location_index = numpy_circuit_partial_discharge_storage.get_partial_discharge_location_index_for_circuit(
+            TEST_CIRCUIT_IDS[0])
+        time_window = TimeWindow(pd.Timestamp("01/01/2019"), pd.Timestamp("01/05/2019"))
+        circuit_coordinate = CircuitCoordinate(52.508969, 4.986738, TEST_CIRCUIT_IDS[0])
+        circuits = [Circuit(circuit_id=TEST_CIRCUIT_IDS[0], cds_weather=None, knmi_weather=None,
+                            circuit_coordinate=circuit_coordinate, partial_discharge=partial_discharge,
+                            time_window=time_window, circuit_length=100)
+                    for partial_discharge in [location_index, circuit_partial_discharge_dataframe()]]
+        joints = [circuit.create_joint(3, time_window) for circuit in circuits]
+        pd.testing.assert_series_equal(joints[0].partial_discharge, joints[1].partial_discharge, check_dtype=False)
+
+    def test_write_partial_discharge_data_for_circuit__rewritten_circuit__mapped_index_keeps_its_arrays(
+            self, tmp_numpy_partial_discharge_data_root):
+        numpy_circuit_partial_discharge_storage = NumpyCircuitPartialDischargeStorage(
+            tmp_numpy_partial_discharge_data_root)
+        circuit_id = TEST_CIRCUIT_IDS[0]
+        old_location_index = numpy_circuit_partial_discharge_storage.get_partial_discharge_location_index_for_circuit(
+            circuit_id)
+        old_locations = np.array(old_location_index.locations)
+        for _ in range(2):
+            numpy_circuit_partial_discharge_storage.write_partial_discharge_data_for_circuit(
+                circuit_id, circuit_partial_discharge_dataframe().iloc[:-1])
+
+        location_index = numpy_circuit_partial_discharge_storage.get_partial_discharge_location_index_for_circuit(
+            circuit_id)
+        assert len(location_index) == len(old_locations) - 1
+        assert np.array_equal(old_location_index.locations, old_locations)
+        # only the current and the previous version are kept
+        assert len([folder for folder in (tmp_numpy_partial_discharge_data_root / str(circuit_id)).iterdir()
+                    if folder.is_dir()]) == 2
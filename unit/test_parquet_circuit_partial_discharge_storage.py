@@ -0,0 +1,68 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.connection.readers.circuit.csv_circuit_partial_discharge_storage import \
+    CsvCircuitPartialDischargeStorage
+from alliander_predictive_maintenance.connection.readers.circuit.parquet_circuit_partial_discharge_storage import \
+    ParquetCircuitPartialDischargeStorage
+from alliander_predictive_maintenance.constants import TEST_CIRCUIT_IDS
+from alliander_predictive_maintenance.conversion.data_types.time_window import TimeWindow
+from unit.test_csv_circuit_partial_discharge_storage import tmp_circuit_partial_discharge_data_root
+
+
+@pytest.fixture
+def tmp_parquet_partial_discharge_data_root(tmp_path, tmp_circuit_partial_discharge_data_root) -> Path:
+    parquet_root = tmp_path / "PartialDischargeParquet"
+    parquet_root.mkdir(parents=True, exist_ok=True)
+    csv_circuit_partial_discharge_storage = CsvCircuitPartialDischargeStorage(
+        tmp_circuit_partial_discharge_data_root, chunk_size=2)
+    parquet_circuit_partial_discharge_storage = ParquetCircuitPartialDischargeStorage(parquet_root)
+    for circuit_id in TEST_CIRCUIT_IDS:
+        parquet_circuit_partial_discharge_storage.convert_from_csv(csv_circuit_partial_discharge_storage, circuit_id)
+    return parquet_root
+
+
+def multiple_months_partial_discharge_dataframe():
+    return pd.DataFrame({
+        ParquetCircuitPartialDischargeStorage.DATETIME_COLUMN: pd.date_range("01/15/2019", periods=6, freq="15d"),
+        ParquetCircuitPartialDischargeStorage.LOCATION_COLUMN: [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        ParquetCircuitPartialDischargeStorage.PARTIAL_DISCHARGE_DATA_COLUMN: [10.0, 20.0, 30.0, 10.0, 10.0, 5.0],
+    })
+
+
+class TestParquetCircuitPartialDischargeStorage:
+    def test_init__invalid_data_path_given__exception_thrown(self):
+        with pytest.raises(ValueError):
+            ParquetCircuitPartialDischargeStorage(Path("some/invalid/path"))
+
+    def test_convert_from_csv__valid_circuit_given__same_partial_discharge_data_returned(
+            self, tmp_circuit_partial_discharge_data_root, tmp_parquet_partial_discharge_data_root):
+        csv_circuit_partial_discharge_storage = CsvCircuitPartialDischargeStorage(
+            tmp_circuit_partial_discharge_data_root, chunk_size=2)
+        parquet_circuit_partial_discharge_storage = ParquetCircuitPartialDischargeStorage(
+            tmp_parquet_partial_discharge_data_root)
+        for circuit_id in TEST_CIRCUIT_IDS:
+            pd.testing.assert_frame_equal(
+                parquet_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit(circuit_id),
+                csv_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit(circuit_id))
+
+    def test_get_partial_discharge_data_for_circuit__filters_given__filtered_partial_discharge_data_returned(
+            self, tmp_path):
+        parquet_circuit_partial_discharge_storage = ParquetCircuitPartialDischargeStorage(tmp_path)
+        parquet_circuit_partial_discharge_storage.write_partial_discharge_data_for_circuit(
+            "1", multiple_months_partial_discharge_dataframe())
+        assert len(list((tmp_path / "1").iterdir())) == 3
+
+        time_window = TimeWindow(pd.Timestamp("02/01/2019"), pd.Timestamp("03/30/2019"))
+        partial_discharge_data = parquet_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit(
+            "1", time_window=time_window, location_range=(4, 10))
+        assert partial_discharge_data[ParquetCircuitPartialDischargeStorage.LOCATION_COLUMN].tolist() == [4.0, 5.0]
+
+    def test_get_partial_discharge_data_for_circuit__invalid_circuit_given__exception_thrown(
+            self, tmp_parquet_partial_discharge_data_root):
+        parquet_circuit_partial_discharge_storage = ParquetCircuitPartialDischargeStorage(
+            tmp_parquet_partial_discharge_data_root)
+        with pytest.raises(FileNotFoundError):
+            parquet_circuit_partial_discharge_storage.get_partial_discharge_data_for_circuit("invalid_circuit")
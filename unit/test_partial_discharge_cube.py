@@ -0,0 +1,63 @@
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_cube import PartialDischargeCube
+from unit.test_partial_discharge_location_index import partial_discharge_location_index
+
+
+class TestPartialDischargeCube:
+    def test_from_location_index__valid_index__cells_of_events_returned(self):
+        partial_discharge_cube = PartialDischargeCube.from_location_index(partial_discharge_location_index(), "2H",
+                                                                          location_bin_width=20.0)
+        # location bins [0, 20), [20, 40) and [40, 60), time bins of the hours 0-1, 2-3 and 4-5
+        assert partial_discharge_cube.number_of_location_bins == 3
+        assert np.array_equal(partial_discharge_cube.cell_offsets, [0, 2, 4, 6])
+        assert np.array_equal(partial_discharge_cube.cell_time_bins, [0, 1, 1, 2, 0, 2])
+        assert np.array_equal(partial_discharge_cube.sums, [2.0, 4.0, 3.0, 6.0, 1.0, 5.0])
+        assert np.array_equal(partial_discharge_cube.counts, [1, 1, 1, 1, 1, 1])
+        assert np.array_equal(partial_discharge_cube.maxima, [2.0, 4.0, 3.0, 6.0, 1.0, 5.0])
+        assert partial_discharge_cube.number_of_events == 6
+
+    def test_aggregate__all_location_bins__same_as_resampling_all_events(self):
+        location_index = partial_discharge_location_index()
+        partial_discharge_cube = PartialDischargeCube.from_location_index(location_index, "1H", location_bin_width=15.0)
+        time_bins = location_index.time_bins("3H")
+        time_bin_of_cube_time_bin = np.searchsorted(time_bins.asi8, partial_discharge_cube.time_bins.asi8,
+                                                    side="right") - 1
+        aggregated = {statistic: partial_discharge_cube.aggregate(statistic, 0,
+                                                                  partial_discharge_cube.number_of_location_bins,
+                                                                  time_bin_of_cube_time_bin, len(time_bins))
+                      for statistic in PartialDischargeCube.STATISTICS}
+        assert np.array_equal(aggregated["sum"], [1.0 + 2.0 + 3.0, 4.0 + 5.0 + 6.0])
+        assert np.array_equal(aggregated["count"], [3, 3])
+        assert np.array_equal(aggregated["max"], [3.0, 6.0])
+        assert np.array_equal(aggregated["squared_sum"], [1.0 + 4.0 + 9.0, 16.0 + 25.0 + 36.0])
+
+    def test_inner_location_bins__location_range__bins_within_range_returned(self):
+        partial_discharge_cube = PartialDischargeCube.from_location_index(partial_discharge_location_index(), "1H",
+                                                                          location_bin_width=10.0)
+        assert partial_discharge_cube.inner_location_bins(10.0, 40.0) == (0, 3)
+        assert partial_discharge_cube.inner_location_bins(12.0, 39.0) == (1, 2)
+        assert partial_discharge_cube.inner_location_bins(12.0, 18.0) == (1, 1)
+
+    @pytest.mark.parametrize("time_resolution, can_resample", [("1H", True), ("3H", True), ("1D", True),
+                                                               ("30min", False), ("90min", False), ("1M", False)])
+    def test_can_resample_to__time_resolution__multiples_of_the_cube_resolution_accepted(self, time_resolution,
+                                                                                          can_resample):
+        partial_discharge_cube = PartialDischargeCube.from_location_index(partial_discharge_location_index(), "1H",
+                                                                          location_bin_width=10.0)
+        assert partial_discharge_cube.can_resample_to(time_resolution) == can_resample
+
+    def test_from_location_index__no_events__empty_cube_returned(self):
+        location_index = partial_discharge_location_index()
+        location_index = type(location_index)(locations=location_index.locations[:0],
+                                              charges=location_index.charges[:0],
+                                              datetimes=location_index.datetimes[:0],
+                                              time_order=location_index.time_order[:0],
+                                              datetime_name=location_index.datetime_name)
+        partial_discharge_cube = PartialDischargeCube.from_location_index(location_index, "1D",
+                                                                          location_bin_width=10.0)
+        assert partial_discharge_cube.number_of_cells == 0
+        assert isinstance(partial_discharge_cube.time_bins, pd.DatetimeIndex)
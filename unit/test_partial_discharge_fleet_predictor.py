@@ -0,0 +1,81 @@
+import math
+
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_fleet_predictor import \
+    PartialDischargeFleetPredictor
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_model_registry import \
+    PartialDischargeModelRegistry
+from unit.test_partial_discharge_forecaster import tmp_weather_partial_discharge_data
+
+
+class TestPartialDischargeFleetPredictor:
+    # every joint is trained on a different part of the data, so every joint has its own coefficients
+    JOINT_STARTS = {100.0: 0, 150.0: 500, 200.0: 1500, 250.0: 3000}
+
+    @staticmethod
+    def create_joint_data(weather: pd.DataFrame, partial_discharge: pd.Series, location_in_meters: float,
+                          start: int, length: int) -> PredictiveMaintenanceJointData:
+        return PredictiveMaintenanceJointData(cds_weather=weather[start:start + length], knmi_weather=None,
+                                              partial_discharge=partial_discharge[start:start + length],
+                                              circuit_id=1234, location_in_meters=location_in_meters)
+
+    @pytest.mark.parametrize("partial_discharge_forecaster_model",
+                             [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
+    def test_predict__fitted_joints__same_results_as_forecaster_predict_returned(
+            self, partial_discharge_forecaster_model, tmp_path, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_model_registry = PartialDischargeModelRegistry(tmp_path)
+        validation_datas = []
+        for validation_length, (location_in_meters, start) in enumerate(self.JOINT_STARTS.items(), start=1):
+            partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7])
+            partial_discharge_forecaster.fit(self.create_joint_data(weather, partial_discharge, location_in_meters,
+                                                                    start, 500), train_size=0.7)
+            partial_discharge_model_registry.save(1234, location_in_meters, partial_discharge_forecaster)
+            # the joints are predicted for a different number of steps
+            validation_datas.append(self.create_joint_data(weather, partial_discharge, location_in_meters,
+                                                           start + 500, 50 * validation_length))
+
+        fleet_model_results = PartialDischargeFleetPredictor(partial_discharge_model_registry).predict(
+            validation_datas, partial_discharge_forecaster_model)
+        assert len(fleet_model_results) == len(validation_datas)
+        for fleet_model_result, validation_data in zip(fleet_model_results, validation_datas):
+            model_result = partial_discharge_model_registry.load(
+                1234, validation_data.location_in_meters, partial_discharge_forecaster_model).predict(validation_data)
+            pd.testing.assert_series_equal(fleet_model_result.partial_discharge, model_result.partial_discharge,
+                                           rtol=1e-9)
+            pd.testing.assert_series_equal(fleet_model_result.true_partial_discharge,
+                                           model_result.true_partial_discharge)
+            assert math.isclose(fleet_model_result.r2_score, model_result.r2_score, rel_tol=1e-9)
+
+    def test_predict_with_forecasters__different_lags__joints_predicted_per_lags(
+            self, tmp_path, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_forecasters, validation_datas = [], []
+        for lags, (location_in_meters, start) in zip([[7], [3, 14], [7]], self.JOINT_STARTS.items()):
+            partial_discharge_forecaster = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, lags)
+            partial_discharge_forecaster.fit(self.create_joint_data(weather, partial_discharge, location_in_meters,
+                                                                    start, 500), train_size=0.7)
+            partial_discharge_forecasters.append(partial_discharge_forecaster)
+            validation_datas.append(self.create_joint_data(weather, partial_discharge, location_in_meters,
+                                                           start + 500, 100))
+
+        fleet_model_results = PartialDischargeFleetPredictor(PartialDischargeModelRegistry(tmp_path)) \
+            .predict_with_forecasters(partial_discharge_forecasters, validation_datas)
+        for fleet_model_result, partial_discharge_forecaster, validation_data in zip(
+                fleet_model_results, partial_discharge_forecasters, validation_datas):
+            pd.testing.assert_series_equal(fleet_model_result.partial_discharge,
+                                           partial_discharge_forecaster.predict(validation_data).partial_discharge,
+                                           rtol=1e-9)
+
+    def test_predict_with_forecasters__different_number_of_joints__exception_thrown(self, tmp_path):
+        with pytest.raises(ValueError):
+            PartialDischargeFleetPredictor(PartialDischargeModelRegistry(tmp_path)).predict_with_forecasters(
+                [PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, [7])], [])
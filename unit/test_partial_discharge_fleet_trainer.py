@@ -0,0 +1,63 @@
+import math
+from pathlib import Path
+
+import pytest
+
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_fleet_trainer import \
+    PartialDischargeFleetTrainer
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_model_registry import \
+    PartialDischargeModelRegistry
+from unit.test_partial_discharge_forecaster import tmp_weather_partial_discharge_data
+
+
+class TestPartialDischargeFleetTrainer:
+    LOCATIONS = [100.0, 150.0, 200.0, 250.0, 300.0]
+
+    def test_init__invalid_model_folder_given__exception_thrown(self):
+        with pytest.raises(ValueError):
+            PartialDischargeFleetTrainer(PartialDischargeForecasterModel.LASSO, [7],
+                                         model_absolute_root_folder=Path("some/invalid/path"))
+
+    def test_fit__valid_joints__model_results_returned_and_models_saved(self, tmp_path,
+                                                                        tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        predictive_maintenance_joint_datas = (
+            PredictiveMaintenanceJointData(cds_weather=weather[:1000], knmi_weather=None,
+                                           partial_discharge=partial_discharge[:1000], circuit_id=1234,
+                                           location_in_meters=location) for location in self.LOCATIONS)
+        partial_discharge_fleet_trainer = PartialDischargeFleetTrainer(
+            PartialDischargeForecasterModel.LASSO, [7], model_absolute_root_folder=tmp_path, max_workers=2,
+            max_pending_joints=2)
+
+        fleet_training_results = list(partial_discharge_fleet_trainer.fit(predictive_maintenance_joint_datas,
+                                                                          train_size=0.7))
+        assert sorted(result.location_in_meters for result in fleet_training_results) == self.LOCATIONS
+        for fleet_training_result in fleet_training_results:
+            assert fleet_training_result.succeeded
+            assert math.isclose(fleet_training_result.model_results["test"].r2_score, 1, abs_tol=0.001)
+            assert PartialDischargeModelRegistry(tmp_path).contains(fleet_training_result.circuit_id,
+                                                                    fleet_training_result.location_in_meters,
+                                                                    PartialDischargeForecasterModel.LASSO)
+
+    def test_fit__invalid_joint__failure_reported(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        predictive_maintenance_joint_datas = [
+            PredictiveMaintenanceJointData(cds_weather=weather[:1000], knmi_weather=None,
+                                           partial_discharge=partial_discharge[:1000], circuit_id=1234,
+                                           location_in_meters=self.LOCATIONS[0]),
+            PredictiveMaintenanceJointData(cds_weather=weather[:1000].add_suffix("_invalid"), knmi_weather=None,
+                                           partial_discharge=partial_discharge[:1000], circuit_id=1234,
+                                           location_in_meters=self.LOCATIONS[1])]
+        partial_discharge_fleet_trainer = PartialDischargeFleetTrainer(PartialDischargeForecasterModel.LASSO, [7],
+                                                                       max_workers=2)
+
+        fleet_training_results = {result.location_in_meters: result for result in
+                                  partial_discharge_fleet_trainer.fit(predictive_maintenance_joint_datas,
+                                                                      train_size=0.7)}
+        assert fleet_training_results[self.LOCATIONS[0]].succeeded
+        assert isinstance(fleet_training_results[self.LOCATIONS[1]].error, ValueError)
+        assert fleet_training_results[self.LOCATIONS[1]].model_results is None
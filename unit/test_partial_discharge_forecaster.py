@@ -1,14 +1,18 @@
 import math
+import pickle
 
 import numpy as np
 import pandas as pd
 import pytest
 
-from alliander_predictive_maintenance.cognition.visualizer import Visualizer
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
 from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
     PartialDischargeForecaster
 from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
     PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.weather_and_partial_discharge_transformer import \
+    WeatherAndPartialDischargeTransformer
 
 
 @pytest.fixture
@@ -22,38 +26,43 @@ def tmp_weather_partial_discharge_data():
     return weather, partial_discharge
 
 
+def joint_data(weather: pd.DataFrame, partial_discharge: pd.Series) -> PredictiveMaintenanceJointData:
+    return PredictiveMaintenanceJointData(cds_weather=weather, knmi_weather=None, partial_discharge=partial_discharge,
+                                          circuit_id=1234, location_in_meters=150)
+
+
 class TestPartialDischargeForecaster:
     @pytest.mark.parametrize("partial_discharge_forecaster_model",
                              [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
     def test_train__valid_input__trained_model_score_returned(self, partial_discharge_forecaster_model,
                                                               tmp_weather_partial_discharge_data):
-        visualizer = Visualizer()
-        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7], visualizer)
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7])
         weather, partial_discharge = tmp_weather_partial_discharge_data
-        score = partial_discharge_forecaster.train(weather, partial_discharge, train_size=0.7)
-        assert math.isclose(score["r2_train"], 1, abs_tol=0.00001)
-        assert math.isclose(score["r2_test"], 1, abs_tol=0.00001)
+        score = partial_discharge_forecaster.fit(joint_data(weather, partial_discharge), train_size=0.7)
+        assert math.isclose(score["train"].r2_score, 1, abs_tol=0.00001)
+        assert math.isclose(score["test"].r2_score, 1, abs_tol=0.00001)
 
     @pytest.mark.parametrize("partial_discharge_forecaster_model",
                              [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
     def test_train__invalid_input__exception_thrown(self, partial_discharge_forecaster_model,
                                                     tmp_weather_partial_discharge_data):
-        visualizer = Visualizer()
-        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7], visualizer)
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7])
         weather, partial_discharge = tmp_weather_partial_discharge_data
         with pytest.raises(ValueError):
-            partial_discharge_forecaster.train(weather.reset_index(drop=True), partial_discharge, train_size=0.7)
+            partial_discharge_forecaster.fit(joint_data(weather.reset_index(drop=True), partial_discharge),
+                                             train_size=0.7)
         with pytest.raises(ValueError):
-            partial_discharge_forecaster.train(weather, partial_discharge.reset_index(drop=True), train_size=0.7)
+            partial_discharge_forecaster.fit(joint_data(weather, partial_discharge.reset_index(drop=True)),
+                                             train_size=0.7)
         with pytest.raises(ValueError):
-            partial_discharge_forecaster.train(weather.add_suffix("_invalid"), partial_discharge, train_size=0.7)
+            partial_discharge_forecaster.fit(joint_data(weather.add_suffix("_invalid"), partial_discharge),
+                                             train_size=0.7)
 
     @pytest.mark.parametrize("partial_discharge_forecaster_model",
                              [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
     def test_predict__valid_input__predictions_returned(self, partial_discharge_forecaster_model,
                                                         tmp_weather_partial_discharge_data):
-        visualizer = Visualizer()
-        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7], visualizer)
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7])
         weather, partial_discharge = tmp_weather_partial_discharge_data
 
         n_train = 1000
@@ -61,20 +70,20 @@ class TestPartialDischargeForecaster:
         weather_val = weather[n_train:]
         partial_discharge_train = partial_discharge[:n_train]
         partial_discharge_val = partial_discharge[n_train:]
-        partial_discharge_forecaster.train(weather_train, partial_discharge_train, train_size=0.7)
-        _, _, score = partial_discharge_forecaster.predict(weather_val, partial_discharge_val)
+        partial_discharge_forecaster.fit(joint_data(weather_train, partial_discharge_train), train_size=0.7)
+        score = partial_discharge_forecaster.predict(joint_data(weather_val, partial_discharge_val)).r2_score
         assert math.isclose(score, 1, abs_tol=0.03)
 
         intercept = 10
-        _, _, score = partial_discharge_forecaster.predict(weather_val + intercept, partial_discharge_val + intercept)
+        score = partial_discharge_forecaster.predict(
+            joint_data(weather_val + intercept, partial_discharge_val + intercept)).r2_score
         assert math.isclose(score, 1, abs_tol=0.03)
 
     @pytest.mark.parametrize("partial_discharge_forecaster_model",
                              [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
     def test_predict__valid_nonlinear_input__high_error_returned(self, partial_discharge_forecaster_model,
                                                                  tmp_weather_partial_discharge_data):
-        visualizer = Visualizer()
-        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7], visualizer)
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7])
         weather, partial_discharge = tmp_weather_partial_discharge_data
 
         n_train = 1000
@@ -82,28 +91,104 @@ class TestPartialDischargeForecaster:
         weather_val = weather[n_train:]
         partial_discharge_train = partial_discharge[:n_train]
         partial_discharge_val = partial_discharge[n_train:]
-        partial_discharge_forecaster.train(weather_train, partial_discharge_train, train_size=0.7)
-        _, _, score = partial_discharge_forecaster.predict(weather_val, partial_discharge_val)
+        partial_discharge_forecaster.fit(joint_data(weather_train, partial_discharge_train), train_size=0.7)
+        score = partial_discharge_forecaster.predict(joint_data(weather_val, partial_discharge_val)).r2_score
         assert math.isclose(score, 1, abs_tol=0.03)
 
         intercept = 10
         weight = 10
-        _, _, score = partial_discharge_forecaster.predict((weather_val + intercept) ** weight,
-                                                           (partial_discharge_val + intercept) ** weight)
+        score = partial_discharge_forecaster.predict(joint_data((weather_val + intercept) ** weight,
+                                                                (partial_discharge_val + intercept) ** weight)).r2_score
         assert not math.isclose(score, 1, abs_tol=0.03)
 
     @pytest.mark.parametrize("partial_discharge_forecaster_model",
                              [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
     def test_predict__invalid_input__exception_thrown(self, partial_discharge_forecaster_model,
                                                       tmp_weather_partial_discharge_data):
-        visualizer = Visualizer()
-        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7], visualizer)
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7])
         weather, partial_discharge = tmp_weather_partial_discharge_data
-        partial_discharge_forecaster.train(weather, partial_discharge, train_size=0.7)
+        partial_discharge_forecaster.fit(joint_data(weather, partial_discharge), train_size=0.7)
 
         with pytest.raises(ValueError):
-            partial_discharge_forecaster.predict(weather.reset_index(drop=True), partial_discharge)
+            partial_discharge_forecaster.predict(joint_data(weather.reset_index(drop=True), partial_discharge))
+        with pytest.raises(ValueError):
+            partial_discharge_forecaster.predict(joint_data(weather, partial_discharge.reset_index(drop=True)))
         with pytest.raises(ValueError):
-            partial_discharge_forecaster.predict(weather, partial_discharge.reset_index(drop=True))
+            partial_discharge_forecaster.predict(joint_data(weather.add_suffix("_invalid"), partial_discharge))
+
+    @pytest.mark.parametrize("partial_discharge_forecaster_model",
+                             [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
+    def test_predict_streaming__daily_data__one_step_forecasts_returned(self, partial_discharge_forecaster_model,
+                                                                        tmp_path, tmp_weather_partial_discharge_data):
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7])
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_forecaster.fit(joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+
+        partial_discharge_streaming_state = partial_discharge_forecaster.initialize_streaming(
+            joint_data(weather[:1000], partial_discharge[:1000]))
+        forecasts = pd.concat([partial_discharge_forecaster.predict_streaming(
+            partial_discharge_streaming_state, joint_data(weather[day:day + 1], partial_discharge[day:day + 1]))
+            for day in range(1000, 1030)])
+
+        # the expected forecast of a day uses the observed partial discharge of the day before and its features
+        partial_discharge_forecaster.save_weights(tmp_path)
+        with open(tmp_path / f"{partial_discharge_forecaster_model}.pickle", "rb") as file:
+            forecaster = pickle.load(file)
+        enriched = WeatherAndPartialDischargeTransformer(
+            PartialDischargeForecaster.WEATHER_COLUMNS, PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN).transform(
+            joint_data(weather[:1030], partial_discharge[:1030]), [7], PartialDischargeForecaster.ENRICHMENT_METHODS)
+        X, _ = forecaster.create_train_X_y(y=enriched.partial_discharge, exog=enriched.cds_weather)
+        expected_forecasts = pd.Series(forecaster.regressor.predict(X), index=X.index).clip(lower=0)[-30:]
+        assert forecasts.index.equals(expected_forecasts.index)
+        np.testing.assert_allclose(forecasts.to_numpy(), expected_forecasts.to_numpy(), rtol=1e-9)
+
+    def test_predict_streaming__missing_day__missing_day_in_last_window(self, tmp_weather_partial_discharge_data):
+        partial_discharge_forecaster = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, [7])
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_forecaster.fit(joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+        partial_discharge_streaming_state = partial_discharge_forecaster.initialize_streaming(
+            joint_data(weather[:1000], partial_discharge[:1000]))
+
+        # day 1005 has no data
+        forecasts = pd.concat([partial_discharge_forecaster.predict_streaming(
+            partial_discharge_streaming_state, joint_data(weather[day:day + 1], partial_discharge[day:day + 1]))
+            for day in list(range(1000, 1005)) + list(range(1006, 1020))])
+
+        resampled_partial_discharge = partial_discharge_streaming_state.rolling_feature_state.resampled_data_frame[
+            PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN]
+        np.testing.assert_array_equal(
+            partial_discharge_streaming_state.last_window,
+            resampled_partial_discharge.to_numpy()[-len(partial_discharge_streaming_state.last_window):])
+        # the features of the 7 days after the missing day are not known, so these days are not forecast
+        assert forecasts.index.equals(partial_discharge.index[list(range(1000, 1005)) + list(range(1013, 1020))])
+
+    def test_predict_streaming__not_fitted__exception_thrown(self, tmp_weather_partial_discharge_data):
+        partial_discharge_forecaster = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, [7])
+        weather, partial_discharge = tmp_weather_partial_discharge_data
         with pytest.raises(ValueError):
-            partial_discharge_forecaster.predict(weather.add_suffix("_invalid"), partial_discharge)
+            partial_discharge_forecaster.initialize_streaming(joint_data(weather, partial_discharge))
+
+    def test_init__regressor_parameters_and_methods__used_by_fit(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_forecaster = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, [7],
+                                                                  methods=[np.mean],
+                                                                  regressor_parameters={"alpha": 1e6})
+        partial_discharge_forecaster.fit(joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+        linear_parameters = partial_discharge_forecaster.get_linear_parameters()
+        assert all("_mean_7_days" in column for column in linear_parameters.exog_columns)
+        # a very strong regularization shrinks all coefficients to zero
+        assert not linear_parameters.exog_coefficients.any()
+
+    def test_from_parameters__custom_methods__same_predictions_returned(self, tmp_path,
+                                                                        tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_forecaster = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, [3, 7],
+                                                                  methods=[np.max, "skew"])
+        partial_discharge_forecaster.fit(joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+        partial_discharge_forecaster.save_parameters(tmp_path / "parameters.npz")
+
+        loaded_partial_discharge_forecaster = PartialDischargeForecaster.from_parameters(tmp_path / "parameters.npz")
+        assert loaded_partial_discharge_forecaster.methods == [np.max, "skew"]
+        validation_data = joint_data(weather[1000:1100], partial_discharge[1000:1100])
+        pd.testing.assert_series_equal(loaded_partial_discharge_forecaster.predict(validation_data).partial_discharge,
+                                       partial_discharge_forecaster.predict(validation_data).partial_discharge)
@@ -0,0 +1,131 @@
+import math
+
+import numpy as np
+import pytest
+from sklearn.model_selection import TimeSeriesSplit
+
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_tuner import \
+    PartialDischargeForecasterTuner
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_search_strategy import \
+    PartialDischargeSearchStrategy
+from unit.test_partial_discharge_forecaster import tmp_weather_partial_discharge_data, joint_data
+
+
+class TestPartialDischargeForecasterTuner:
+    REGRESSOR_PARAMETER_GRID = {"alpha": [0.1, 1e6]}
+    LAGS_GRID = [[3], [7, 14]]
+    METHODS_GRID = [[np.mean], [np.mean, np.max]]
+
+    def test_init__grid_search__all_candidates_created(self):
+        partial_discharge_forecaster_tuner = PartialDischargeForecasterTuner(
+            PartialDischargeForecasterModel.LASSO, self.REGRESSOR_PARAMETER_GRID, self.LAGS_GRID, self.METHODS_GRID)
+        assert len(partial_discharge_forecaster_tuner.candidates) == 8
+        assert {(tuple(candidate.lags), len(candidate.methods), candidate.regressor_parameters["alpha"])
+                for candidate in partial_discharge_forecaster_tuner.candidates} == \
+               {(tuple(lags), len(methods), alpha) for lags in self.LAGS_GRID for methods in self.METHODS_GRID
+                for alpha in self.REGRESSOR_PARAMETER_GRID["alpha"]}
+
+    def test_init__random_search__sample_of_candidates_created(self):
+        grid_candidates = PartialDischargeForecasterTuner(
+            PartialDischargeForecasterModel.LASSO, self.REGRESSOR_PARAMETER_GRID, self.LAGS_GRID,
+            self.METHODS_GRID).candidates
+        random_candidates = PartialDischargeForecasterTuner(
+            PartialDischargeForecasterModel.LASSO, self.REGRESSOR_PARAMETER_GRID, self.LAGS_GRID, self.METHODS_GRID,
+            search_strategy=PartialDischargeSearchStrategy.RANDOM, n_random_candidates=3).candidates
+        assert len(random_candidates) == 3
+        assert all(candidate in grid_candidates for candidate in random_candidates)
+
+    def test_init__invalid_search_space__exception_thrown(self):
+        with pytest.raises(ValueError):
+            PartialDischargeForecasterTuner(PartialDischargeForecasterModel.LASSO, self.REGRESSOR_PARAMETER_GRID, [])
+        with pytest.raises(ValueError):
+            PartialDischargeForecasterTuner(PartialDischargeForecasterModel.LASSO, self.REGRESSOR_PARAMETER_GRID,
+                                            self.LAGS_GRID, n_folds=1)
+
+    def test_tune__joints__best_candidate_per_joint_returned(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        predictive_maintenance_joint_datas = [
+            PredictiveMaintenanceJointData(cds_weather=weather[start:start + 600], knmi_weather=None,
+                                           partial_discharge=partial_discharge[start:start + 600], circuit_id=1234,
+                                           location_in_meters=location_in_meters)
+            for location_in_meters, start in [(100.0, 0), (150.0, 2000)]]
+        partial_discharge_forecaster_tuner = PartialDischargeForecasterTuner(
+            PartialDischargeForecasterModel.LASSO, self.REGRESSOR_PARAMETER_GRID, self.LAGS_GRID, self.METHODS_GRID,
+            n_folds=3, max_workers=2)
+
+        tuning_results = list(partial_discharge_forecaster_tuner.tune(predictive_maintenance_joint_datas))
+        assert [result.location_in_meters for result in tuning_results] == [100.0, 150.0]
+        for tuning_result in tuning_results:
+            assert tuning_result.best_score == max(tuning_result.candidate_scores)
+            # a very strong regularization cannot fit the linear trend
+            assert tuning_result.best_candidate.regressor_parameters == {"alpha": 0.1}
+
+        # the score of a candidate is the mean test score of fitting on the folds of the rolling origins
+        candidate = tuning_results[0].candidates[-1]
+        partial_discharge_forecaster = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO,
+                                                                  candidate.lags, candidate.methods,
+                                                                  candidate.regressor_parameters)
+        enriched = partial_discharge_forecaster.enrich_input_data(predictive_maintenance_joint_datas[0])
+        fold_scores = []
+        for train_indices, test_indices in TimeSeriesSplit(n_splits=3).split(enriched.cds_weather):
+            fold_scores.append(partial_discharge_forecaster.fit_enriched_data(
+                joint_data(enriched.cds_weather.iloc[train_indices], enriched.partial_discharge.iloc[train_indices]),
+                joint_data(enriched.cds_weather.iloc[test_indices], enriched.partial_discharge.iloc[test_indices]))[
+                "test"].r2_score)
+        assert math.isclose(tuning_results[0].candidate_scores[-1], np.mean(fold_scores))
+
+    def test_tune__candidate_with_failing_folds__candidate_scored_nan(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        predictive_maintenance_joint_data = PredictiveMaintenanceJointData(
+            cds_weather=weather[:600], knmi_weather=None, partial_discharge=partial_discharge[:600], circuit_id=1234,
+            location_in_meters=100.0)
+        # Lasso does not accept a negative alpha
+        partial_discharge_forecaster_tuner = PartialDischargeForecasterTuner(
+            PartialDischargeForecasterModel.LASSO, {"alpha": [-1.0, 0.1]}, [[7]], n_folds=3, max_workers=2)
+
+        tuning_result, = partial_discharge_forecaster_tuner.tune([predictive_maintenance_joint_data])
+        assert math.isnan(tuning_result.candidate_scores[0])
+        assert tuning_result.best_candidate.regressor_parameters == {"alpha": 0.1}
+
+    def test_tune__all_candidates_failing__error_reported_for_every_joint(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        predictive_maintenance_joint_datas = [
+            PredictiveMaintenanceJointData(cds_weather=weather[start:start + 600], knmi_weather=None,
+                                           partial_discharge=partial_discharge[start:start + 600], circuit_id=1234,
+                                           location_in_meters=location_in_meters)
+            for location_in_meters, start in [(100.0, 0), (150.0, 2000)]]
+        partial_discharge_forecaster_tuner = PartialDischargeForecasterTuner(
+            PartialDischargeForecasterModel.LASSO, {"alpha": [-1.0]}, [[7]], n_folds=3, max_workers=2)
+
+        tuning_results = list(partial_discharge_forecaster_tuner.tune(predictive_maintenance_joint_datas))
+        assert [result.location_in_meters for result in tuning_results] == [100.0, 150.0]
+        for tuning_result in tuning_results:
+            assert not tuning_result.succeeded
+            assert isinstance(tuning_result.error, ValueError)
+            assert tuning_result.best_candidate is None
+            assert np.isnan(tuning_result.candidate_scores).all()
+
+    def test_tune__joint_failing__error_reported_and_other_joints_tuned(self, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        predictive_maintenance_joint_datas = [
+            PredictiveMaintenanceJointData(cds_weather=weather[start:start + 600], knmi_weather=None,
+                                           partial_discharge=partial_discharge[start:start + 600], circuit_id=1234,
+                                           location_in_meters=location_in_meters)
+            for location_in_meters, start in [(100.0, 0), (150.0, 2000)]]
+        # the first joint has no partial discharge values, so its features cannot be created
+        predictive_maintenance_joint_datas[0].partial_discharge = partial_discharge[:600] * np.nan
+        partial_discharge_forecaster_tuner = PartialDischargeForecasterTuner(
+            PartialDischargeForecasterModel.LASSO, {"alpha": [0.1]}, [[7]], n_folds=3, max_workers=2)
+
+        failed_result, tuning_result = partial_discharge_forecaster_tuner.tune(predictive_maintenance_joint_datas)
+        assert not failed_result.succeeded
+        assert failed_result.best_candidate is None
+        assert tuning_result.succeeded
+        assert tuning_result.location_in_meters == 150.0
+        assert tuning_result.best_candidate.regressor_parameters == {"alpha": 0.1}
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from alliander_predictive_maintenance.connection.readers.circuit.icircuit_partial_discharge_reader import \
+    ICircuitPartialDischargeReader
+from alliander_predictive_maintenance.conversion.data_types.partial_discharge_location_index import \
+    PartialDischargeLocationIndex
+
+
+def partial_discharge_location_index():
+    data_frame = pd.DataFrame({
+        ICircuitPartialDischargeReader.DATETIME_COLUMN: pd.date_range("01/01/2019", periods=6, freq="1H"),
+        ICircuitPartialDischargeReader.LOCATION_COLUMN: [50.0, 10.0, 30.0, 10.0, 40.0, 20.0],
+        ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN: [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+    })
+    return PartialDischargeLocationIndex.from_data_frame(
+        data_frame, datetime_column=ICircuitPartialDischargeReader.DATETIME_COLUMN,
+        location_column=ICircuitPartialDischargeReader.LOCATION_COLUMN,
+        charge_column=ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN)
+
+
+class TestPartialDischargeLocationIndex:
+    def test_from_data_frame__valid_data_frame__events_sorted_by_location(self):
+        location_index = partial_discharge_location_index()
+        assert np.array_equal(location_index.locations, [10.0, 10.0, 20.0, 30.0, 40.0, 50.0])
+        assert np.array_equal(location_index.charges, [2.0, 4.0, 6.0, 3.0, 5.0, 1.0])
+        assert np.array_equal(location_index.time_order, [1, 3, 5, 2, 4, 0])
+
+    def test_window__valid_location__events_within_window_returned(self):
+        location_index = partial_discharge_location_index()
+        start, end = location_index.window(25.0, 5.0)
+        assert np.array_equal(location_index.locations[start:end], [20.0, 30.0])
+
+    def test_datetimes_in_time_order__valid_index__original_order_returned(self):
+        location_index = partial_discharge_location_index()
+        assert location_index.datetimes_in_time_order().equals(
+            pd.date_range("01/01/2019", periods=6, freq="1H", name=ICircuitPartialDischargeReader.DATETIME_COLUMN))
+
+    def test_from_data_frame__events_not_sorted_by_time__index_sorted_by_time(self):
+        data_frame = pd.DataFrame({
+            ICircuitPartialDischargeReader.DATETIME_COLUMN: pd.to_datetime(["01/03/2019", "01/01/2019", "01/02/2019"]),
+            ICircuitPartialDischargeReader.LOCATION_COLUMN: [10.0, 30.0, 20.0],
+            ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN: [1.0, 2.0, 3.0],
+        })
+        location_index = PartialDischargeLocationIndex.from_data_frame(
+            data_frame, datetime_column=ICircuitPartialDischargeReader.DATETIME_COLUMN,
+            location_column=ICircuitPartialDischargeReader.LOCATION_COLUMN,
+            charge_column=ICircuitPartialDischargeReader.PARTIAL_DISCHARGE_DATA_COLUMN)
+        assert location_index.datetimes_in_time_order().is_monotonic_increasing
+        assert np.array_equal(location_index.time_order, [2, 1, 0])
+
+    def test_sorted_by_time__sorted_by_time__same_index_returned(self):
+        location_index = partial_discharge_location_index()
+        assert location_index.sorted_by_time() is location_index
+
+    def test_sorted_by_time__not_sorted_by_time__arrays_shared_and_time_order_renumbered(self):
+        location_index = partial_discharge_location_index()
+        unsorted_location_index = PartialDischargeLocationIndex(
+            locations=location_index.locations, charges=location_index.charges,
+            datetimes=location_index.datetimes, time_order=(location_index.time_order + 1) % len(location_index),
+            datetime_name=location_index.datetime_name)
+        sorted_location_index = unsorted_location_index.sorted_by_time()
+        assert sorted_location_index.charges is location_index.charges
+        assert np.array_equal(sorted_location_index.time_order, location_index.time_order)
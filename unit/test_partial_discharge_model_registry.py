@@ -0,0 +1,74 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster_model import \
+    PartialDischargeForecasterModel
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_model_registry import \
+    PartialDischargeModelRegistry
+from unit.test_partial_discharge_forecaster import tmp_weather_partial_discharge_data, joint_data
+
+
+class TestPartialDischargeModelRegistry:
+    CIRCUIT_ID = 1234
+    LOCATION = 150.0
+
+    def test_init__invalid_path_given__exception_thrown(self):
+        with pytest.raises(ValueError):
+            PartialDischargeModelRegistry(Path("some/invalid/path"))
+
+    @pytest.mark.parametrize("partial_discharge_forecaster_model",
+                             [PartialDischargeForecasterModel.SVR, PartialDischargeForecasterModel.LASSO])
+    def test_load__saved_model__same_predictions_returned(self, partial_discharge_forecaster_model, tmp_path,
+                                                          tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_forecaster = PartialDischargeForecaster(partial_discharge_forecaster_model, [7])
+        partial_discharge_forecaster.fit(joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+        PartialDischargeModelRegistry(tmp_path).save(self.CIRCUIT_ID, self.LOCATION, partial_discharge_forecaster)
+
+        # a new registry has an empty cache, so the model is loaded from its file
+        loaded_partial_discharge_forecaster = PartialDischargeModelRegistry(tmp_path).load(
+            self.CIRCUIT_ID, self.LOCATION, partial_discharge_forecaster_model)
+        assert loaded_partial_discharge_forecaster is not partial_discharge_forecaster
+        validation_data = joint_data(weather[1000:1100], partial_discharge[1000:1100])
+        pd.testing.assert_series_equal(loaded_partial_discharge_forecaster.predict(validation_data).partial_discharge,
+                                       partial_discharge_forecaster.predict(validation_data).partial_discharge)
+
+    def test_load__model_loaded_twice__cached_model_returned(self, tmp_path, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_forecaster = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, [7])
+        partial_discharge_forecaster.fit(joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+        PartialDischargeModelRegistry(tmp_path).save(self.CIRCUIT_ID, self.LOCATION, partial_discharge_forecaster)
+
+        partial_discharge_model_registry = PartialDischargeModelRegistry(tmp_path)
+        loaded_partial_discharge_forecaster = partial_discharge_model_registry.load(
+            self.CIRCUIT_ID, self.LOCATION, PartialDischargeForecasterModel.LASSO)
+        assert partial_discharge_model_registry.load(self.CIRCUIT_ID, self.LOCATION,
+                                                     PartialDischargeForecasterModel.LASSO) \
+               is loaded_partial_discharge_forecaster
+        assert list(partial_discharge_model_registry.get_model_keys()) == \
+               [(self.CIRCUIT_ID, self.LOCATION, PartialDischargeForecasterModel.LASSO)]
+
+    def test_load__model_saved_with_int_location__model_loaded_with_float_location(
+            self, tmp_path, tmp_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_weather_partial_discharge_data
+        partial_discharge_forecaster = PartialDischargeForecaster(PartialDischargeForecasterModel.LASSO, [7])
+        partial_discharge_forecaster.fit(joint_data(weather[:1000], partial_discharge[:1000]), train_size=0.7)
+        PartialDischargeModelRegistry(tmp_path).save(self.CIRCUIT_ID, int(self.LOCATION), partial_discharge_forecaster)
+
+        partial_discharge_model_registry = PartialDischargeModelRegistry(tmp_path)
+        assert partial_discharge_model_registry.contains(self.CIRCUIT_ID, self.LOCATION,
+                                                         PartialDischargeForecasterModel.LASSO)
+        partial_discharge_model_registry.load(self.CIRCUIT_ID, self.LOCATION, PartialDischargeForecasterModel.LASSO)
+        assert list(partial_discharge_model_registry.get_model_keys()) == \
+               [(self.CIRCUIT_ID, self.LOCATION, PartialDischargeForecasterModel.LASSO)]
+
+    def test_load__model_not_saved__exception_thrown(self, tmp_path):
+        partial_discharge_model_registry = PartialDischargeModelRegistry(tmp_path)
+        assert not partial_discharge_model_registry.contains(self.CIRCUIT_ID, self.LOCATION,
+                                                             PartialDischargeForecasterModel.SVR)
+        with pytest.raises(FileNotFoundError):
+            partial_discharge_model_registry.load(self.CIRCUIT_ID, self.LOCATION, PartialDischargeForecasterModel.SVR)
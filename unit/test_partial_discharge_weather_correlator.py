@@ -0,0 +1,134 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.conversion.partial_discharge_correlator.partial_discharge_weather_correlator import \
+    PartialDischargeWeatherCorrelator
+
+
+@pytest.fixture
+def tmp_circuit_weather():
+    random_generator = np.random.default_rng(0)
+    time = pd.date_range(start="1/1/2019", periods=24 * 120, freq="1H")
+    cds_weather = pd.DataFrame({"time": time,
+                                "soil_temperature_level_3": 280 + np.sin(np.arange(len(time)) / 500) +
+                                random_generator.normal(0, 0.1, len(time)),
+                                "volumetric_soil_water_layer_3": random_generator.uniform(0.2, 0.4, len(time)),
+                                "is_permanent_data": True, "lat": 52.0, "lon": 5.0})
+    days = pd.date_range(start="1/1/2019", periods=120, freq="1D")
+    knmi_weather = pd.DataFrame({"time": days, "temperature": random_generator.normal(10, 3, len(days)),
+                                 "humidity": random_generator.uniform(50, 100, len(days)), "lat": 52.0, "lon": 5.0})
+    # a constant feature has no correlation
+    knmi_weather["sunlight_duration"] = 8.0
+    return cds_weather, knmi_weather
+
+
+def create_partial_discharge(cds_weather: pd.DataFrame, seed: int) -> pd.Series:
+    random_generator = np.random.default_rng(seed)
+    partial_discharge = pd.Series(cds_weather["soil_temperature_level_3"].to_numpy() * seed +
+                                  random_generator.exponential(100, len(cds_weather)), index=cds_weather["time"])
+    # partial discharge is only measured in some hours, and the circuit was not measured for a while
+    partial_discharge[random_generator.uniform(size=len(partial_discharge)) < 0.3] = np.nan
+    partial_discharge["2/1/2019":"2/10/2019"] = np.nan
+    return partial_discharge
+
+
+class TestPartialDischargeWeatherCorrelator:
+    ROLLING_DAYS = 7
+
+    def test_correlate__partial_discharge_only__same_correlations_as_all_features(self, tmp_circuit_weather):
+        cds_weather, knmi_weather = tmp_circuit_weather
+        partial_discharge = create_partial_discharge(cds_weather, seed=1)
+        partial_discharge_weather_correlator = PartialDischargeWeatherCorrelator()
+
+        sorted_correlation_series = partial_discharge_weather_correlator.correlate(
+            PredictiveMaintenanceJointData(cds_weather.copy(), knmi_weather.copy(), partial_discharge, 1, 100),
+            self.ROLLING_DAYS).sorted_correlation_series
+        partial_discharge_only_sorted_correlation_series = partial_discharge_weather_correlator.correlate(
+            PredictiveMaintenanceJointData(cds_weather.copy(), knmi_weather.copy(), partial_discharge, 1, 100),
+            self.ROLLING_DAYS, partial_discharge_only=True).sorted_correlation_series
+        pd.testing.assert_series_equal(partial_discharge_only_sorted_correlation_series.sort_index(),
+                                       sorted_correlation_series.sort_index(), check_names=False, rtol=1e-9)
+
+    def test_correlate_many__joints_of_circuits__correlations_per_joint_returned(self, tmp_circuit_weather):
+        cds_weather, knmi_weather = tmp_circuit_weather
+        other_cds_weather, other_knmi_weather = cds_weather.copy(), knmi_weather.copy()
+        other_cds_weather["volumetric_soil_water_layer_3"] *= 2
+        predictive_maintenance_joint_datas = [
+            PredictiveMaintenanceJointData(cds_weather, knmi_weather, create_partial_discharge(cds_weather, seed=1),
+                                           1, 100),
+            PredictiveMaintenanceJointData(other_cds_weather, other_knmi_weather,
+                                           create_partial_discharge(cds_weather, seed=2), 2, 100),
+            PredictiveMaintenanceJointData(cds_weather, knmi_weather, create_partial_discharge(cds_weather, seed=3),
+                                           1, 200)]
+        partial_discharge_weather_correlator = PartialDischargeWeatherCorrelator()
+
+        correlations = partial_discharge_weather_correlator.correlate_many(predictive_maintenance_joint_datas,
+                                                                           self.ROLLING_DAYS)
+        assert list(correlations.index.names) == PartialDischargeWeatherCorrelator.JOINT_INDEX_NAMES
+        assert list(dict.fromkeys(correlations.index.droplevel(2))) == [(1, 100), (2, 100), (1, 200)]
+        assert (correlations.xs("sunlight_duration", axis=1) == 0).all()
+        for predictive_maintenance_joint_data in predictive_maintenance_joint_datas:
+            expected_correlations = partial_discharge_weather_correlator.correlate(
+                PredictiveMaintenanceJointData(predictive_maintenance_joint_data.cds_weather.copy(),
+                                               predictive_maintenance_joint_data.knmi_weather.copy(),
+                                               predictive_maintenance_joint_data.partial_discharge, 0, 0),
+                self.ROLLING_DAYS).correlations
+            joint_correlations = correlations.loc[(predictive_maintenance_joint_data.circuit_id,
+                                                   predictive_maintenance_joint_data.location_in_meters)]
+            pd.testing.assert_frame_equal(joint_correlations,
+                                          expected_correlations.loc[joint_correlations.index,
+                                                                    joint_correlations.columns],
+                                          check_names=False, rtol=1e-9)
+
+    @pytest.mark.parametrize("partial_discharge_only", [True, False])
+    def test_correlate__inputs__not_modified(self, tmp_circuit_weather, partial_discharge_only):
+        cds_weather, knmi_weather = tmp_circuit_weather
+        expected_cds_weather, expected_knmi_weather = cds_weather.copy(), knmi_weather.copy()
+        partial_discharge = create_partial_discharge(cds_weather, seed=1)
+        PartialDischargeWeatherCorrelator().correlate(
+            PredictiveMaintenanceJointData(cds_weather, knmi_weather, partial_discharge, 1, 100), self.ROLLING_DAYS,
+            partial_discharge_only=partial_discharge_only)
+        pd.testing.assert_frame_equal(cds_weather, expected_cds_weather)
+        pd.testing.assert_frame_equal(knmi_weather, expected_knmi_weather)
+
+    def test_correlate__joints_sharing_weather_in_threads__same_correlations_as_sequential(self,
+                                                                                          tmp_circuit_weather):
+        cds_weather, knmi_weather = tmp_circuit_weather
+        predictive_maintenance_joint_datas = [
+            PredictiveMaintenanceJointData(cds_weather, knmi_weather, create_partial_discharge(cds_weather, seed),
+                                           1, 100 * seed) for seed in range(1, 9)]
+        expected_correlations = [PartialDischargeWeatherCorrelator().correlate(
+            predictive_maintenance_joint_data, self.ROLLING_DAYS).correlations
+            for predictive_maintenance_joint_data in predictive_maintenance_joint_datas]
+
+        partial_discharge_weather_correlator = PartialDischargeWeatherCorrelator()
+        with ThreadPoolExecutor(max_workers=4) as thread_pool:
+            correlations = list(thread_pool.map(
+                lambda predictive_maintenance_joint_data: partial_discharge_weather_correlator.correlate(
+                    predictive_maintenance_joint_data, self.ROLLING_DAYS).correlations,
+                predictive_maintenance_joint_datas))
+        for joint_correlations, expected_joint_correlations in zip(correlations, expected_correlations):
+            pd.testing.assert_frame_equal(joint_correlations, expected_joint_correlations)
+
+    @pytest.mark.parametrize("partial_discharge_only", [True, False])
+    def test_correlate__daily_partial_discharge__same_correlations_as_reindexed_to_weather_times(
+            self, tmp_circuit_weather, partial_discharge_only):
+        cds_weather, knmi_weather = tmp_circuit_weather
+        daily_partial_discharge = create_partial_discharge(cds_weather, seed=1).resample("1D").sum()
+        daily_partial_discharge["2/1/2019":"2/10/2019"] = np.nan
+        # a time that is not a midnight is resampled like before, and the weather has no value at that time
+        partial_discharge = pd.concat([daily_partial_discharge,
+                                       pd.Series([np.nan], index=[pd.Timestamp("1/3/2019 00:30")])]).sort_index()
+        partial_discharge_weather_correlator = PartialDischargeWeatherCorrelator()
+        correlations = partial_discharge_weather_correlator.correlate(
+            PredictiveMaintenanceJointData(cds_weather, knmi_weather, daily_partial_discharge, 1, 100),
+            self.ROLLING_DAYS, partial_discharge_only=partial_discharge_only).correlations
+        expected_correlations = partial_discharge_weather_correlator.correlate(
+            PredictiveMaintenanceJointData(cds_weather, knmi_weather, partial_discharge, 1, 100),
+            self.ROLLING_DAYS, partial_discharge_only=partial_discharge_only).correlations
+        pd.testing.assert_frame_equal(correlations, expected_correlations, rtol=1e-9)
@@ -0,0 +1,49 @@
+import pytest
+
+from alliander_predictive_maintenance.instrumentation.counter_record import CounterRecord
+from alliander_predictive_maintenance.instrumentation.prometheus_text_file_instrumentation_sink import \
+    PrometheusTextFileInstrumentationSink
+from alliander_predictive_maintenance.instrumentation.span_record import SpanRecord
+
+
+class TestPrometheusTextFileInstrumentationSink:
+    def test_init__invalid_folder__value_error_raised(self, tmp_path):
+        with pytest.raises(ValueError):
+            PrometheusTextFileInstrumentationSink(tmp_path / "missing" / "metrics.prom")
+
+    def test_flush__spans_and_counters_recorded__metrics_written(self, tmp_path):
+        absolute_file_path = tmp_path / "metrics.prom"
+        prometheus_sink = PrometheusTextFileInstrumentationSink(absolute_file_path, namespace="test")
+        prometheus_sink.record_span(SpanRecord("Circuit.create_joint", 0.0, 1.5))
+        prometheus_sink.record_span(SpanRecord("Circuit.create_joint", 0.0, 0.5, succeeded=False))
+        prometheus_sink.record_counter(CounterRecord("cache_hits", 2, {"cache": 'weather "days"'}))
+        prometheus_sink.record_counter(CounterRecord("cache_hits", 3, {"cache": 'weather "days"'}))
+        prometheus_sink.flush()
+        assert absolute_file_path.read_text().splitlines() == [
+            "# TYPE test_Circuit_create_joint_seconds summary",
+            "test_Circuit_create_joint_seconds_sum 2.0",
+            "test_Circuit_create_joint_seconds_count 2",
+            "# TYPE test_Circuit_create_joint_failures_total counter",
+            "test_Circuit_create_joint_failures_total 1",
+            "# TYPE test_cache_hits_total counter",
+            'test_cache_hits_total{cache="weather \\"days\\""} 5',
+        ]
+        assert list(tmp_path.iterdir()) == [absolute_file_path]
+
+    def test_flush__two_span_names__lines_of_every_summary_grouped(self, tmp_path):
+        absolute_file_path = tmp_path / "metrics.prom"
+        prometheus_sink = PrometheusTextFileInstrumentationSink(absolute_file_path, namespace="test")
+        prometheus_sink.record_span(SpanRecord("b", 0.0, 2.0))
+        prometheus_sink.record_span(SpanRecord("a", 0.0, 1.0, {"stage": "fit"}))
+        prometheus_sink.record_span(SpanRecord("a", 0.0, 3.0, {"stage": "correlate"}))
+        prometheus_sink.flush()
+        assert absolute_file_path.read_text().splitlines() == [
+            "# TYPE test_a_seconds summary",
+            'test_a_seconds_sum{stage="correlate"} 3.0',
+            'test_a_seconds_count{stage="correlate"} 1',
+            'test_a_seconds_sum{stage="fit"} 1.0',
+            'test_a_seconds_count{stage="fit"} 1',
+            "# TYPE test_b_seconds summary",
+            "test_b_seconds_sum 2.0",
+            "test_b_seconds_count 1",
+        ]
@@ -0,0 +1,56 @@
+from typing import List
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.cyber.simulation_model.rolling_feature_engine import RollingFeatureEngine
+
+COLUMNS = ["soil_temperature_level_3", "volumetric_soil_water_layer_3", "partial_discharge"]
+
+
+@pytest.fixture
+def tmp_daily_weather_and_partial_discharge():
+    np.random.seed(42)
+    n_samples = 400
+    data_frame = pd.DataFrame({COLUMNS[0]: 285 + np.random.random(n_samples),
+                               COLUMNS[1]: np.random.random(n_samples) / 10,
+                               COLUMNS[2]: np.random.poisson(2, n_samples) * 1e4},
+                              index=pd.date_range("01/01/2019", periods=n_samples, freq="1D"))
+    # a gap of missing days and a run of constant partial discharge
+    data_frame.iloc[100:104] = np.nan
+    data_frame.iloc[200:230, 2] = 0
+    return data_frame
+
+
+def pandas_rolling_features(data_frame: pd.DataFrame, lags: List[int], methods: List) -> pd.DataFrame:
+    rolling_methods = {column: methods for column in COLUMNS}
+    lag_data_frames = []
+    for lag in lags:
+        lag_data_frame = data_frame.rolling(window=lag).agg(rolling_methods)
+        diff_data_frame = lag_data_frame.diff()
+        lag_data_frame.columns = ["_".join(map(str, column + (f"{lag}_days",))) for column in lag_data_frame.columns]
+        diff_data_frame.columns = ["_".join(map(str, column + (f"{lag}_days_diff",)))
+                                   for column in diff_data_frame.columns]
+        lag_data_frames.extend([lag_data_frame, diff_data_frame])
+    return pd.concat(lag_data_frames, axis=1)
+
+
+class TestRollingFeatureEngine:
+    @pytest.mark.parametrize("methods", [[np.mean, np.std, np.min, np.max], ["sum", np.median, np.max]])
+    def test_transform__valid_input__same_features_as_pandas_returned(self, methods,
+                                                                      tmp_daily_weather_and_partial_discharge):
+        lags = [1, 7, 30]
+        features = RollingFeatureEngine().transform(tmp_daily_weather_and_partial_discharge, COLUMNS, lags, methods)
+        expected_features = pandas_rolling_features(tmp_daily_weather_and_partial_discharge, lags, methods)
+        pd.testing.assert_frame_equal(features, expected_features, check_exact=False, rtol=1e-9, atol=1e-9)
+
+    def test_transform__lag_longer_than_data__nan_features_returned(self, tmp_daily_weather_and_partial_discharge):
+        data_frame = tmp_daily_weather_and_partial_discharge[:5]
+        features = RollingFeatureEngine().transform(data_frame, COLUMNS, [7], [np.mean, np.std])
+        assert features.shape == (5, 2 * len(COLUMNS) * 2)
+        assert features.isna().all().all()
+
+    def test_transform__invalid_lags__exception_thrown(self, tmp_daily_weather_and_partial_discharge):
+        with pytest.raises(ValueError):
+            RollingFeatureEngine().transform(tmp_daily_weather_and_partial_discharge, COLUMNS, [0], [np.mean])
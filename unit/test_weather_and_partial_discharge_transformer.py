@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from alliander_predictive_maintenance.conversion.data_types.predictive_maintenance_joint_data import \
+    PredictiveMaintenanceJointData
+from alliander_predictive_maintenance.cyber.simulation_model.partial_discharge_forecaster import \
+    PartialDischargeForecaster
+from alliander_predictive_maintenance.cyber.simulation_model.weather_and_partial_discharge_transformer import \
+    WeatherAndPartialDischargeTransformer
+
+
+@pytest.fixture
+def tmp_hourly_weather_partial_discharge_data():
+    np.random.seed(42)
+    datetime = pd.date_range(start="1/1/2019", end="6/30/2019 23:00", freq="1H")
+    weather = pd.DataFrame({PartialDischargeForecaster.WEATHER_COLUMNS[0]: 285 + np.random.random(len(datetime)),
+                            PartialDischargeForecaster.WEATHER_COLUMNS[1]: np.random.random(len(datetime))},
+                           index=datetime)
+    partial_discharge = pd.Series(np.random.poisson(2, len(datetime)) * 100.0,
+                                  name=PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN, index=datetime)
+    return weather, partial_discharge
+
+
+def joint_data(weather: pd.DataFrame, partial_discharge: pd.Series) -> PredictiveMaintenanceJointData:
+    return PredictiveMaintenanceJointData(cds_weather=weather, knmi_weather=None, partial_discharge=partial_discharge,
+                                          circuit_id=1234, location_in_meters=150)
+
+
+class TestWeatherAndPartialDischargeTransformer:
+    LAGS = [3, 7]
+    METHODS = [np.mean, np.std, np.min, np.max]
+
+    def test_transform_incremental__daily_data__same_features_as_transform_returned(
+            self, tmp_hourly_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_hourly_weather_partial_discharge_data
+        transformer = WeatherAndPartialDischargeTransformer(PartialDischargeForecaster.WEATHER_COLUMNS,
+                                                            PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN)
+        expected = transformer.transform(joint_data(weather, partial_discharge), self.LAGS, self.METHODS)
+
+        history_end = pd.Timestamp("5/31/2019 23:00")
+        rolling_feature_state = transformer.initialize_incremental_state(
+            joint_data(weather[:history_end], partial_discharge[:history_end]), self.LAGS, self.METHODS)
+        transformed_days = []
+        for day in pd.date_range("6/1/2019", "6/30/2019", freq="1D"):
+            day_end = day + pd.Timedelta(hours=23)
+            transformed_days.append(transformer.transform_incremental(
+                rolling_feature_state, joint_data(weather[day:day_end], partial_discharge[day:day_end])))
+
+        exog = pd.concat([transformed_day.cds_weather for transformed_day in transformed_days])
+        endog = pd.concat([transformed_day.partial_discharge for transformed_day in transformed_days])
+        pd.testing.assert_frame_equal(exog, expected.cds_weather["6/1/2019":], check_freq=False, rtol=1e-9)
+        pd.testing.assert_series_equal(endog, expected.partial_discharge["6/1/2019":], check_freq=False)
+
+    def test_transform_incremental__gap_in_data__gap_days_missing(self, tmp_hourly_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_hourly_weather_partial_discharge_data
+        transformer = WeatherAndPartialDischargeTransformer(PartialDischargeForecaster.WEATHER_COLUMNS,
+                                                            PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN)
+        history_end = pd.Timestamp("5/31/2019 23:00")
+        rolling_feature_state = transformer.initialize_incremental_state(
+            joint_data(weather[:history_end], partial_discharge[:history_end]), self.LAGS, self.METHODS)
+
+        # two days without data: the 7 day windows with a missing day end on 6/8, and the diff needs the day before
+        transformed = transformer.transform_incremental(
+            rolling_feature_state, joint_data(weather["6/3/2019":], partial_discharge["6/3/2019":]))
+        assert transformed.cds_weather.index[0] == pd.Timestamp("6/10/2019")
+        assert rolling_feature_state.resampled_data_frame.index[-1] == pd.Timestamp("6/30/2019")
+
+    def test_transform_incremental__data_before_state__exception_thrown(self,
+                                                                        tmp_hourly_weather_partial_discharge_data):
+        weather, partial_discharge = tmp_hourly_weather_partial_discharge_data
+        transformer = WeatherAndPartialDischargeTransformer(PartialDischargeForecaster.WEATHER_COLUMNS,
+                                                            PartialDischargeForecaster.PARTIAL_DISCHARGE_COLUMN)
+        rolling_feature_state = transformer.initialize_incremental_state(joint_data(weather, partial_discharge),
+                                                                         self.LAGS, self.METHODS)
+        with pytest.raises(ValueError):
+            transformer.transform_incremental(rolling_feature_state,
+                                              joint_data(weather["6/30/2019":], partial_discharge["6/30/2019":]))